@@ -12,16 +12,67 @@ class Config:
     # Símbolos que vamos monitorar
     SYMBOLS = ['PETR4.SA', 'VALE3.SA']
     
+    # Universo analisado pelas estratégias (analyze_all_symbols)
+    UNIVERSE = [
+        'PETR4.SA', 'VALE3.SA', 'ITUB4.SA', 'BBDC4.SA', 'BBAS3.SA', 'SANB11.SA', 'ABEV3.SA',
+        'WEGE3.SA', 'PRIO3.SA', 'CSNA3.SA', 'GGBR4.SA', 'LREN3.SA', 'MGLU3.SA', 'ELET3.SA',
+        'EGIE3.SA', 'SUZB3.SA', 'KLBN11.SA'
+    ]
+    
     # Configurações de Trading
     INITIAL_CAPITAL = 100000  # R\$ 100 mil (simulação)
     MAX_POSITION_SIZE = 0.05  # 5% máximo por trade
     STOP_LOSS_PERCENT = 0.10  # 10% de stop loss
     TARGET_PERCENT = 0.25     # 25% de alvo
     
+    # Estratégias executadas em analyze_all_symbols (nome -> parâmetros que sobrescrevem os padrões)
+    # 'momentum' fica de fora: exige pregões diários, não os ticks de STRATEGY_LOOKBACK
+    STRATEGIES = {
+        'sma_rsi': {}
+    }
+    STRATEGY_LOOKBACK = 50  # Preços por ativo carregados para as estratégias
+    INDICATOR_CACHE_MB = 64  # Orçamento de memória do cache de indicadores (LRU)
+    
+    # Setores do universo B3 (ranks de momentum neutros por setor; ausentes = 'Outros')
+    SECTORS = {
+        'PETR4': 'Petróleo e Gás', 'PRIO3': 'Petróleo e Gás',
+        'VALE3': 'Mineração', 'CSNA3': 'Siderurgia', 'GGBR4': 'Siderurgia',
+        'ITUB4': 'Bancos', 'BBDC4': 'Bancos', 'BBAS3': 'Bancos', 'SANB11': 'Bancos',
+        'ABEV3': 'Consumo', 'LREN3': 'Varejo', 'MGLU3': 'Varejo',
+        'WEGE3': 'Bens de Capital', 'ELET3': 'Energia Elétrica', 'EGIE3': 'Energia Elétrica',
+        'SUZB3': 'Papel e Celulose', 'KLBN11': 'Papel e Celulose'
+    }
+    MOMENTUM_PANEL_DIR = 'data/momentum_panel'  # Painel memmap ativos x datas
+    EARNINGS_CALENDAR_DIR = 'data/earnings'      # CSVs de resultados (symbol, date, timing, period)
+    
     # Configurações de Risco
     MAX_DAILY_LOSS = 0.02     # 2% perda máxima por dia
     MAX_DRAWDOWN = 0.15       # 15% drawdown máximo
     
+    # Configurações de Opções
+    # Modelo de precificação por ativo ('bsm', 'black76', 'crr', 'leisen_reimer' ou 'baw')
+    PRICING_MODELS = {
+        'PETR4': 'leisen_reimer',
+        'VALE3': 'leisen_reimer',
+        'IBOV': 'black76',   # Opções sobre IBOV futuro
+        'DI1': 'black76'     # Opções sobre DI futuro
+    }
+    DEFAULT_PRICING_MODEL = 'bsm'
+    DEFAULT_AMERICAN_MODEL = 'baw'
+    BINOMIAL_STEPS = 201
+    OPTION_CONTRACT_MULTIPLIER = 100  # Ações por contrato (exposição de Greeks)
+    
+    # Dividend yield contínuo estimado por ativo
+    DIVIDEND_YIELDS = {
+        'PETR4': 0.12,
+        'VALE3': 0.08,
+        'ITUB4': 0.06,
+        'BBDC4': 0.07
+    }
+    
+    # Curva de juros: CSV de contratos DI1 (maturity, rate ou pu); sem arquivo usa curva simulada
+    DI_CURVE_FILE = 'data/di_curve.csv'
+    
     # Configurações de Dados
     DATA_UPDATE_INTERVAL = 60  # Atualiza a cada 60 segundos
     
@@ -0,0 +1,233 @@
+"""
+ProTrading Engine - Precificação de Opções Americanas
+Árvores binomiais vetorizadas (Cox-Ross-Rubinstein / Leisen-Reimer)
+e aproximação analítica de Barone-Adesi-Whaley
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+
+from core.pricing_math import bsm_price, is_call_array, norm_cdf, norm_pdf, MIN_TIME, MIN_VOL
+
+DEFAULT_STEPS = 201  # Ímpar para compatibilidade com Leisen-Reimer
+BAW_MAX_ITERATIONS = 50
+BAW_TOLERANCE = 1e-8
+
+
+def _prepare_inputs(S, K, T, r, sigma, option_type, q):
+    """Converte entradas para arrays 1D com mesmo formato"""
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (S, K, T, r, sigma, q)))
+    S, K, T, r, sigma, q = (a.ravel().copy() for a in arrays)
+    calls = np.broadcast_to(np.atleast_1d(is_call_array(option_type)), arrays[0].shape).ravel()
+    T = np.maximum(T, MIN_TIME)
+    sigma = np.maximum(sigma, MIN_VOL)
+    return S, K, T, r, sigma, q, calls, arrays[0].shape
+
+
+def _peizer_pratt(z, n):
+    """Inversão de Peizer-Pratt (método 2) usada pelo Leisen-Reimer"""
+    term = (z / (n + 1.0 / 3.0 + 0.1 / (n + 1.0))) ** 2 * (n + 1.0 / 6.0)
+    return 0.5 + np.sign(z) * np.sqrt(0.25 - 0.25 * np.exp(-term))
+
+
+def binomial_tree_price(S, K, T, r, sigma, option_type='call', q=0.0,
+                        steps=DEFAULT_STEPS, method='crr', american=True):
+    """
+    Preço por árvore binomial, vetorizado sobre opções e níveis da árvore
+
+    Todas as opções são avaliadas em uma única matriz (opções x nós); a
+    indução reversa percorre os níveis aplicando operações de array sobre
+    a chain inteira de uma vez.
+
+    Args:
+        S, K, T, r, sigma, q (array_like): Parâmetros (broadcast NumPy)
+        option_type (str | array_like): 'call'/'put' ou máscara de calls
+        steps (int): Número de passos da árvore
+        method (str): 'crr' (Cox-Ross-Rubinstein) ou 'leisen_reimer'
+        american (bool): Permite exercício antecipado
+
+    Returns:
+        np.ndarray: Preços no formato das entradas
+    """
+    S, K, T, r, sigma, q, calls, shape = _prepare_inputs(S, K, T, r, sigma, option_type, q)
+    steps = int(steps)
+
+    if method == 'leisen_reimer':
+        if steps % 2 == 0:
+            steps += 1
+        dt = T / steps
+        sqrt_t = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+        d2 = d1 - sigma * sqrt_t
+        p = _peizer_pratt(d2, steps)
+        p_bar = _peizer_pratt(d1, steps)
+        growth = np.exp((r - q) * dt)
+        u = growth * p_bar / p
+        d = (growth - p * u) / (1.0 - p)
+    elif method == 'crr':
+        dt = T / steps
+        u = np.exp(sigma * np.sqrt(dt))
+        d = 1.0 / u
+        p = (np.exp((r - q) * dt) - d) / (u - d)
+    else:
+        raise ValueError(f"Método de árvore desconhecido: {method}")
+
+    p = np.clip(p, 0.0, 1.0)[:, None]
+    disc = np.exp(-r * dt)[:, None]
+    sign = np.where(calls, 1.0, -1.0)[:, None]
+    strikes = K[:, None]
+
+    # Preços terminais: S * u^j * d^(N-j), j = 0..N
+    j = np.arange(steps + 1)
+    log_u = np.log(u)[:, None]
+    log_d = np.log(d)[:, None]
+    spot = S[:, None] * np.exp(j * log_u + (steps - j) * log_d)
+    values = np.maximum(sign * (spot - strikes), 0.0)
+
+    inv_d = (1.0 / d)[:, None]
+    for level in range(steps - 1, -1, -1):
+        values = disc * (p * values[:, 1:level + 2] + (1.0 - p) * values[:, :level + 1])
+        if american:
+            spot = spot[:, :level + 1] * inv_d
+            values = np.maximum(values, sign * (spot - strikes))
+
+    return values[:, 0].reshape(shape)
+
+
+def _baw_critical_price(K, T, r, sigma, q, calls):
+    """Resolve por Newton (vetorizado) o preço crítico de exercício do BAW"""
+    b = r - q
+    sigma2 = sigma ** 2
+    sqrt_t = np.sqrt(T)
+    m = 2.0 * r / sigma2
+    n = 2.0 * b / sigma2
+    k = 1.0 - np.exp(-r * T)
+    carry = np.exp((b - r) * T)
+
+    root = np.sqrt((n - 1.0) ** 2 + 4.0 * m / k)
+    q_exp = np.where(calls, (-(n - 1.0) + root) / 2.0, (-(n - 1.0) - root) / 2.0)
+
+    # Semente de Barone-Adesi-Whaley
+    root_inf = np.sqrt((n - 1.0) ** 2 + 4.0 * m)
+    q_inf = np.where(calls, (-(n - 1.0) + root_inf) / 2.0, (-(n - 1.0) - root_inf) / 2.0)
+    s_inf = K / (1.0 - 1.0 / q_inf)
+    h_call = -(b * T + 2.0 * sigma * sqrt_t) * K / (s_inf - K)
+    h_put = (b * T - 2.0 * sigma * sqrt_t) * K / (K - s_inf)
+    s_star = np.where(
+        calls,
+        K + (s_inf - K) * (1.0 - np.exp(h_call)),
+        s_inf + (K - s_inf) * np.exp(h_put)
+    )
+
+    active = np.ones_like(K, dtype=bool)
+    for _ in range(BAW_MAX_ITERATIONS):
+        d1 = (np.log(s_star / K) + (b + 0.5 * sigma2) * T) / (sigma * sqrt_t)
+        european = bsm_price(s_star, K, T, r, sigma, calls, q)
+        call_rhs = european + (1.0 - carry * norm_cdf(d1)) * s_star / q_exp
+        call_slope = (carry * norm_cdf(d1) * (1.0 - 1.0 / q_exp)
+                      + (1.0 - carry * norm_pdf(d1) / (sigma * sqrt_t)) / q_exp)
+        put_rhs = european - (1.0 - carry * norm_cdf(-d1)) * s_star / q_exp
+        put_slope = (-carry * norm_cdf(-d1) * (1.0 - 1.0 / q_exp)
+                     - (1.0 + carry * norm_pdf(-d1) / (sigma * sqrt_t)) / q_exp)
+
+        new_star = np.where(
+            calls,
+            (K + call_rhs - call_slope * s_star) / (1.0 - call_slope),
+            (K - put_rhs + put_slope * s_star) / (1.0 + put_slope)
+        )
+        new_star = np.where(active, np.maximum(new_star, 1e-8), s_star)
+        converged = np.abs(new_star - s_star) <= BAW_TOLERANCE * K
+        s_star = new_star
+        active &= ~converged
+        if not active.any():
+            break
+
+    return s_star, q_exp, carry
+
+
+def barone_adesi_whaley_price(S, K, T, r, sigma, option_type='call', q=0.0):
+    """
+    Aproximação quadrática de Barone-Adesi-Whaley para opções americanas
+
+    Calls sem dividendos e puts com taxa não positiva não têm exercício
+    antecipado ótimo e recebem o preço europeu.
+
+    Args:
+        S, K, T, r, sigma, q (array_like): Parâmetros (broadcast NumPy)
+        option_type (str | array_like): 'call'/'put' ou máscara de calls
+
+    Returns:
+        np.ndarray: Preços no formato das entradas
+    """
+    S, K, T, r, sigma, q, calls, shape = _prepare_inputs(S, K, T, r, sigma, option_type, q)
+    european = bsm_price(S, K, T, r, sigma, calls, q)
+    early = np.where(calls, q > 0, r > 0)
+    prices = european.copy()
+
+    if early.any():
+        idx = np.flatnonzero(early)
+        s_e, k_e, t_e, r_e, v_e, q_e, c_e = S[idx], K[idx], T[idx], r[idx], sigma[idx], q[idx], calls[idx]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            s_star, q_exp, carry = _baw_critical_price(k_e, t_e, r_e, v_e, q_e, c_e)
+            d1_star = (np.log(s_star / k_e) + (r_e - q_e + 0.5 * v_e ** 2) * t_e) / (v_e * np.sqrt(t_e))
+            call_a = (s_star / q_exp) * (1.0 - carry * norm_cdf(d1_star))
+            put_a = -(s_star / q_exp) * (1.0 - carry * norm_cdf(-d1_star))
+            premium = np.where(c_e, call_a, put_a) * (s_e / s_star) ** q_exp
+
+        exercise_now = np.where(c_e, s_e >= s_star, s_e <= s_star)
+        intrinsic = np.where(c_e, s_e - k_e, k_e - s_e)
+        american = np.where(exercise_now, intrinsic, european[idx] + premium)
+        valid = np.isfinite(american)
+        prices[idx] = np.where(valid, np.maximum(american, european[idx]), european[idx])
+
+    return prices.reshape(shape)
+
+
+def crr_price(S, K, T, r, sigma, option_type='call', q=0.0, steps=DEFAULT_STEPS):
+    """Árvore Cox-Ross-Rubinstein americana"""
+    return binomial_tree_price(S, K, T, r, sigma, option_type, q, steps=steps, method='crr')
+
+
+def leisen_reimer_price(S, K, T, r, sigma, option_type='call', q=0.0, steps=DEFAULT_STEPS):
+    """Árvore Leisen-Reimer americana"""
+    return binomial_tree_price(S, K, T, r, sigma, option_type, q, steps=steps, method='leisen_reimer')
+
+
+def baw_price(S, K, T, r, sigma, option_type='call', q=0.0, steps=None):
+    """Adapta BAW para a mesma assinatura das árvores"""
+    return barone_adesi_whaley_price(S, K, T, r, sigma, option_type, q)
+
+
+AMERICAN_MODELS = {
+    'crr': crr_price,
+    'leisen_reimer': leisen_reimer_price,
+    'baw': baw_price,
+}
+
+
+def price_american_chain(S, K, T, r, sigma, option_type, q=0.0, model='baw', steps=DEFAULT_STEPS):
+    """
+    Precifica uma chain inteira com o modelo americano escolhido
+
+    Args:
+        S, K, T, r, sigma, q (array_like): Parâmetros (broadcast NumPy)
+        option_type (str | array_like): 'call'/'put' ou máscara de calls
+        model (str): 'crr', 'leisen_reimer' ou 'baw'
+        steps (int): Passos da árvore (ignorado pelo BAW)
+
+    Returns:
+        np.ndarray: Preços americanos
+    """
+    if model not in AMERICAN_MODELS:
+        raise ValueError(f"Modelo americano desconhecido: {model}")
+    # Linhas vencidas geram divisões por zero nos modelos; são substituídas abaixo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prices = AMERICAN_MODELS[model](S, K, T, r, sigma, option_type, q, steps=steps)
+
+    # Contratos vencidos (T = 0) valem o intrínseco
+    expired = np.asarray(T, dtype=float) <= 0
+    if expired.any():
+        S, K = np.asarray(S, dtype=float), np.asarray(K, dtype=float)
+        intrinsic = np.where(is_call_array(option_type), np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+        prices = np.where(expired, intrinsic, prices)
+    return prices
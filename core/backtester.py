@@ -0,0 +1,362 @@
+"""
+ProTrading Engine - Backtester Vetorizado
+Sinais da estratégia SMA + RSI (e de qualquer função de sinais) sobre
+arrays de barras (ativos x tempo), simulação de posições com alvo e stop
+de calculate_targets, corretagem e slippage, curva de patrimônio, trades
+e estatísticas
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+
+from core import indicators
+
+TRADING_DAYS = 252
+
+# Parâmetros equivalentes às regras fixas de TradingStrategies
+SMA_RSI_DEFAULTS = {
+    'fast_period': 5,
+    'slow_period': 20,
+    'rsi_period': 14,
+    'rsi_overbought': 70.0,
+    'rsi_oversold': 30.0,
+    'cross_threshold': 2.0,   # % entre SMA rápida e lenta
+    'price_threshold': 1.0,   # % entre preço e SMA rápida
+    'target_pct': 0.05,
+    'stop_pct': 0.03,
+}
+
+TRADE_COLUMNS = ['symbol', 'side', 'entry_index', 'exit_index', 'entry_price', 'exit_price', 'exit_reason',
+                 'return_pct', 'bars_held']
+
+
+def sma_rsi_signals(close, params=None, cache=None):
+    """
+    Sinais da estratégia SMA + RSI em todas as barras de uma vez
+
+    Replica analyze_trend, analyze_rsi e combine_signals de TradingStrategies
+    elemento a elemento.
+
+    Args:
+        close (array_like): Fechamentos (ativos x tempo ou 1D)
+        params (dict, optional): Parâmetros (ver SMA_RSI_DEFAULTS)
+        cache (dict, optional): Cache de indicadores reaproveitável
+            entre chamadas com o mesmo `close` (chave (nome, período))
+
+    Returns:
+        tuple: (sinal, força) - sinal em {-1, 0, 1} (VENDA, NEUTRO, COMPRA)
+    """
+    p = {**SMA_RSI_DEFAULTS, **(params or {})}
+    close = np.asarray(close, dtype=float)
+    cache = cache if cache is not None else {}
+
+    def cached(name, period, fn):
+        key = (name, int(period))
+        if key not in cache:
+            cache[key] = fn(close, int(period))
+        return cache[key]
+
+    fast = cached('sma', p['fast_period'], indicators.sma)
+    slow = cached('sma', p['slow_period'], indicators.sma)
+    rsi = cached('rsi', p['rsi_period'], indicators.rsi)
+
+    # Tendência (SMA ausente ou zero = neutro, como em analyze_trend)
+    has_sma = np.isfinite(fast) & np.isfinite(slow) & (fast != 0) & (slow != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cross = (fast - slow) / slow * 100
+        price_vs_fast = (close - fast) / fast * 100
+    up = has_sma & (cross > p['cross_threshold']) & (price_vs_fast > p['price_threshold'])
+    down = has_sma & (cross < -p['cross_threshold']) & (price_vs_fast < -p['price_threshold'])
+    trend_signal = up.astype(int) - down.astype(int)
+    trend_strength = np.where(trend_signal != 0,
+                              np.minimum(8, np.floor(5 + np.abs(np.nan_to_num(cross)))), 5).astype(int)
+
+    # RSI (neutro = 50 sem dados suficientes, como em calculate_rsi)
+    rsi = np.where(np.isfinite(rsi), rsi, 50.0)
+    overbought = rsi > p['rsi_overbought']
+    oversold = rsi < p['rsi_oversold']
+    rsi_signal = oversold.astype(int) - overbought.astype(int)
+    rsi_strength = np.where(overbought, np.minimum(9, np.floor(5 + (rsi - p['rsi_overbought']) / 5)),
+                            np.where(oversold, np.minimum(9, np.floor(5 + (p['rsi_oversold'] - rsi) / 5)),
+                                     5)).astype(int)
+
+    # Combinação (combine_signals)
+    agree = (trend_signal == rsi_signal) & (trend_signal != 0)
+    conflict = (trend_signal != rsi_signal) & (trend_signal != 0) & (rsi_signal != 0)
+    trend_wins = trend_strength > rsi_strength
+    single_signal = np.where(trend_wins, trend_signal, rsi_signal)
+    single_strength = np.maximum(3, np.where(trend_wins, trend_strength, rsi_strength) - 1)
+
+    signal = np.where(agree, trend_signal, np.where(conflict, 0, single_signal))
+    strength = np.where(agree, np.minimum(10, (trend_strength + rsi_strength) // 2 + 2),
+                        np.where(conflict, 4, single_strength))
+    return signal, strength
+
+
+class BacktestResult:
+    """Resultado de um backtest"""
+
+    def __init__(self, equity, returns, positions, trades, stats, symbols=None, dates=None):
+        self.equity = equity
+        self.returns = returns
+        self.positions = positions
+        self.trades = trades
+        self.stats = stats
+        self.symbols = symbols
+        self.dates = dates
+
+    def equity_curve(self):
+        """Curva de patrimônio como Series (índice = datas, se informadas)"""
+        return pd.Series(self.equity, index=self.dates, name='equity')
+
+    def symbol_stats(self):
+        """Estatísticas dos trades por ativo"""
+        if self.trades.empty:
+            return pd.DataFrame(columns=['symbol', 'trades', 'win_rate', 'avg_return_pct', 'total_return_pct'])
+        grouped = self.trades.groupby('symbol')['return_pct']
+        return pd.DataFrame({
+            'trades': grouped.size(),
+            'win_rate': grouped.apply(lambda r: (r > 0).mean()),
+            'avg_return_pct': grouped.mean(),
+            'total_return_pct': grouped.apply(lambda r: ((1 + r / 100).prod() - 1) * 100),
+        }).reset_index()
+
+
+def performance_stats(equity, returns, trades, exposure, periods_per_year=TRADING_DAYS):
+    """
+    Estatísticas da curva de patrimônio e dos trades
+
+    Args:
+        equity (np.ndarray): Patrimônio por barra
+        returns (np.ndarray): Retorno da carteira por barra
+        trades (pd.DataFrame): Trades (TRADE_COLUMNS)
+        exposure (float): Fração média do capital posicionada
+        periods_per_year (int): Barras por ano
+
+    Returns:
+        dict: Estatísticas
+    """
+    n = len(returns)
+    total_return = float(equity[-1] / equity[0] - 1) if n else 0.0
+    years = n / periods_per_year
+    volatility = float(np.std(returns, ddof=1) * np.sqrt(periods_per_year)) if n > 1 else 0.0
+    mean_return = float(np.mean(returns) * periods_per_year) if n else 0.0
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if n else np.zeros(1)
+
+    trade_returns = trades['return_pct'].to_numpy() if not trades.empty else np.array([])
+    gains = trade_returns[trade_returns > 0].sum()
+    losses = -trade_returns[trade_returns < 0].sum()
+    cagr = (1 + total_return) ** (1 / years) - 1 if years > 0 and total_return > -1 else None
+    return {
+        'total_return_pct': round(total_return * 100, 2),
+        'cagr_pct': round(cagr * 100, 2) if cagr is not None else None,
+        'volatility_pct': round(volatility * 100, 2),
+        'sharpe': round(mean_return / volatility, 2) if volatility > 0 else None,
+        'max_drawdown_pct': round(float(drawdown.min()) * 100, 2),
+        'trades': int(trade_returns.size),
+        'win_rate': round(float((trade_returns > 0).mean()), 3) if trade_returns.size else None,
+        'avg_trade_pct': round(float(trade_returns.mean()), 3) if trade_returns.size else None,
+        'profit_factor': round(float(gains / losses), 2) if losses > 0 else None,
+        'exposure': round(float(exposure), 3),
+    }
+
+
+class VectorizedBacktester:
+    """
+    Backtester de ativos x tempo
+
+    Os sinais vêm vetorizados de uma vez; a simulação percorre só o eixo do
+    tempo e cada passo atualiza todos os ativos juntos (entradas, alvos,
+    stops e reversões são máscaras sobre o universo).
+
+    Convenções:
+        - Entrada no fechamento da barra do sinal, com slippage contra.
+        - Alvo/stop conferidos a partir da barra seguinte pela máxima e
+          mínima; se os dois forem tocados na mesma barra, vale o stop.
+          Gaps além do nível executam na abertura.
+        - Sinal oposto forte fecha a posição no fechamento e inverte.
+        - Cada ativo tem uma fatia igual do capital, sem rebalanceamento.
+    """
+
+    def __init__(self, commission=0.0005, slippage=0.0005, min_strength=7, allow_short=True,
+                 initial_capital=100000.0, periods_per_year=TRADING_DAYS):
+        """
+        Inicializa o backtester
+
+        Args:
+            commission (float): Custo por lado como fração do valor negociado
+            slippage (float): Deslocamento adverso do preço de execução
+            min_strength (int): Força mínima do sinal para operar
+            allow_short (bool): Opera sinais de VENDA vendido
+            initial_capital (float): Capital inicial
+            periods_per_year (int): Barras por ano
+        """
+        self.commission = commission
+        self.slippage = slippage
+        self.min_strength = min_strength
+        self.allow_short = allow_short
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+
+    def run(self, close, high=None, low=None, open_=None, signal_fn=sma_rsi_signals, params=None,
+            symbols=None, dates=None):
+        """
+        Executa o backtest
+
+        Args:
+            close (array_like): Fechamentos (ativos x tempo ou 1D)
+            high, low, open_ (array_like, optional): Demais preços (padrão: close)
+            signal_fn (callable): fn(close, params) -> (sinal, força)
+            params (dict, optional): Parâmetros da estratégia (inclui
+                target_pct e stop_pct)
+            symbols (list, optional): Nomes dos ativos
+            dates (array_like, optional): Datas das barras
+
+        Returns:
+            BacktestResult: Resultado
+        """
+        p = {**SMA_RSI_DEFAULTS, **(params or {})}
+        close = np.atleast_2d(np.asarray(close, dtype=float))
+        signal, strength = signal_fn(close, p)
+        return self.simulate(close, signal, strength, high, low, open_, p['target_pct'], p['stop_pct'],
+                             symbols, dates)
+
+    def simulate(self, close, signal, strength, high=None, low=None, open_=None, target_pct=0.05,
+                 stop_pct=0.03, symbols=None, dates=None):
+        """
+        Simula posições a partir de sinais já calculados
+
+        Args:
+            close (array_like): Fechamentos (ativos x tempo)
+            signal (array_like): Sinais {-1, 0, 1}
+            strength (array_like): Força dos sinais
+            high, low, open_ (array_like, optional): Demais preços
+            target_pct (float): Alvo a partir da entrada
+            stop_pct (float): Stop a partir da entrada
+
+        Returns:
+            BacktestResult: Resultado
+        """
+        raw_close = np.atleast_2d(np.asarray(close, dtype=float))
+        listed = np.isfinite(raw_close)
+        # Barras sem preço mantêm o último fechamento (posição fica parada)
+        close = pd.DataFrame(raw_close.T).ffill().to_numpy().T
+        high = close if high is None else np.where(listed, np.atleast_2d(np.asarray(high, dtype=float)), close)
+        low = close if low is None else np.where(listed, np.atleast_2d(np.asarray(low, dtype=float)), close)
+        open_ = close if open_ is None else np.where(listed, np.atleast_2d(np.asarray(open_, dtype=float)), close)
+
+        n_symbols, n_bars = close.shape
+        wanted = np.where(np.atleast_2d(strength) >= self.min_strength, np.atleast_2d(signal), 0)
+        if not self.allow_short:
+            wanted = np.maximum(wanted, 0)
+        wanted = np.where(listed, wanted, 0).astype(int)
+
+        # Estado do universo
+        position = np.zeros(n_symbols, dtype=int)
+        entry_price = np.full(n_symbols, np.nan)
+        entry_index = np.zeros(n_symbols, dtype=int)
+        returns = np.zeros((n_symbols, n_bars))
+        positions = np.zeros((n_symbols, n_bars), dtype=np.int8)
+        trades = []
+        cost, slip = self.commission, self.slippage
+
+        def close_trades(mask, t, exit_fill, reason):
+            for i in np.flatnonzero(mask):
+                side = position[i]
+                trades.append((i, side, entry_index[i], t, entry_price[i], exit_fill[i], reason[i],
+                               (side * (exit_fill[i] / entry_price[i] - 1) - 2 * cost) * 100, t - entry_index[i]))
+
+        for t in range(n_bars):
+            c = close[:, t]
+            prev = close[:, t - 1] if t else c
+            bar_return = np.zeros(n_symbols)
+            held = position != 0
+
+            # Alvo e stop (a partir da barra seguinte à entrada)
+            if held.any():
+                side = position
+                target = entry_price * (1 + side * target_pct)
+                stop = entry_price * (1 - side * stop_pct)
+                hit_stop = held & np.where(side > 0, low[:, t] <= stop, high[:, t] >= stop)
+                hit_target = held & ~hit_stop & np.where(side > 0, high[:, t] >= target, low[:, t] <= target)
+                # Gap além do nível executa na abertura
+                stop_fill = np.where(side > 0, np.minimum(open_[:, t], stop), np.maximum(open_[:, t], stop))
+                target_fill = np.where(side > 0, np.maximum(open_[:, t], target), np.minimum(open_[:, t], target))
+
+                reverse = held & ~hit_stop & ~hit_target & (wanted[:, t] == -side)
+                exiting = hit_stop | hit_target | reverse
+                level = np.where(hit_stop, stop_fill, np.where(hit_target, target_fill, c))
+                exit_fill = level * (1 - side * slip)
+
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    bar_return = np.where(exiting, side * (exit_fill / prev - 1) - cost,
+                                          np.where(held, side * (c / prev - 1), 0.0))
+                reason = np.where(hit_stop, 'stop', np.where(hit_target, 'target', 'reversal'))
+                close_trades(exiting, t, exit_fill, reason)
+                position = np.where(exiting, 0, position)
+
+            # Entradas nos ativos sem posição
+            entering = (position == 0) & (wanted[:, t] != 0)
+            if entering.any():
+                side = wanted[:, t]
+                fill = c * (1 + side * slip)
+                entry_return = side * (c / fill - 1) - cost
+                bar_return = np.where(entering, (1 + bar_return) * (1 + entry_return) - 1, bar_return)
+                position = np.where(entering, side, position)
+                entry_price = np.where(entering, fill, entry_price)
+                entry_index = np.where(entering, t, entry_index)
+
+            returns[:, t] = bar_return
+            positions[:, t] = position
+
+        # Posições abertas no fim são encerradas no último fechamento
+        still_open = position != 0
+        if still_open.any():
+            final_fill = close[:, -1] * (1 - position * slip)
+            close_trades(still_open, n_bars - 1, final_fill, np.full(n_symbols, 'end'))
+
+        sleeves = np.cumprod(1 + returns, axis=1)
+        equity = self.initial_capital * sleeves.mean(axis=0)
+        previous = np.concatenate([[self.initial_capital], equity[:-1]])
+        portfolio_returns = equity / previous - 1
+
+        names = list(symbols) if symbols is not None else list(range(n_symbols))
+        trades = pd.DataFrame(trades, columns=TRADE_COLUMNS)
+        if not trades.empty:
+            trades['symbol'] = [names[i] for i in trades['symbol']]
+            trades['side'] = np.where(trades['side'] > 0, 'COMPRA', 'VENDA')
+            if dates is not None:
+                dates_index = pd.Index(dates)
+                trades['entry_date'] = dates_index[trades['entry_index'].to_numpy()]
+                trades['exit_date'] = dates_index[trades['exit_index'].to_numpy()]
+
+        exposure = (positions != 0).mean() if positions.size else 0.0
+        stats = performance_stats(np.concatenate([[self.initial_capital], equity]), portfolio_returns, trades,
+                                  exposure, self.periods_per_year)
+        return BacktestResult(equity, portfolio_returns, positions, trades, stats, names, dates)
+
+
+def align_bars(bars_by_symbol):
+    """
+    Alinha barras OHLC de vários ativos em arrays ativos x tempo
+
+    Args:
+        bars_by_symbol (dict): símbolo -> DataFrame com open, high, low, close
+            e índice temporal (ex: realized_volatility.daily_bars)
+
+    Returns:
+        dict: symbols, dates e arrays open, high, low, close (NaN onde o
+            ativo não tem barra)
+    """
+    symbols = [s for s, bars in bars_by_symbol.items() if len(bars)]
+    if not symbols:
+        empty = np.empty((0, 0))
+        return {'symbols': [], 'dates': pd.DatetimeIndex([]), 'open': empty, 'high': empty, 'low': empty,
+                'close': empty}
+    panel = pd.concat({s: bars_by_symbol[s][['open', 'high', 'low', 'close']] for s in symbols}, axis=1)
+    panel = panel.sort_index()
+    result = {'symbols': symbols, 'dates': panel.index}
+    for field in ('open', 'high', 'low', 'close'):
+        result[field] = panel.xs(field, axis=1, level=1)[symbols].to_numpy(dtype=float).T
+    return result
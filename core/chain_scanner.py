@@ -0,0 +1,272 @@
+"""
+ProTrading Engine - Scanner de Arbitragem e Anomalias em Chains
+Verificações vetorizadas sobre a chain inteira: paridade put-call,
+monotonicidade de verticais, convexidade de borboletas, calendários,
+bid/ask cruzado ou travado e outliers de IV contra o smile ajustado
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.pricing_math import is_call_array
+from core.trading_calendar import calendar_for_symbol
+from core.volatility_smile import evaluate_smile, fit_smile, forward_log_moneyness
+
+FINDING_COLUMNS = [
+    'underlying', 'check', 'symbol', 'related_symbol', 'expiry_date',
+    'strike', 'magnitude', 'score', 'detail'
+]
+
+
+class ChainAnomalyScanner:
+    """
+    Scanner de anomalias executado a cada snapshot de chain
+
+    `score` é a medida usada para ranquear: pontos-base do preço do ativo
+    para violações de preço e pontos-base de volatilidade para outliers
+    de IV.
+    """
+
+    def __init__(self, price_tolerance=0.01, iv_zscore_threshold=3.0, calendar=None):
+        """
+        Inicializa o scanner
+
+        Args:
+            price_tolerance (float): Tolerância absoluta em R$ nas checagens de preço
+            iv_zscore_threshold (float): Z-score mínimo para outlier de IV
+            calendar (TradingCalendar, optional): Calendário fixo (padrão: o
+                do mercado de cada ativo)
+        """
+        self.calendar = calendar
+        self.price_tolerance = price_tolerance
+        self.iv_zscore_threshold = iv_zscore_threshold
+        self.findings = {}
+
+    def _prepare(self, chain, r, q, calendar):
+        """Monta arrays colunares ordenados por (tipo, vencimento, strike)"""
+        df = chain.reset_index(drop=True).sort_values(['option_type', 'expiry_date', 'strike'])
+        # Taxas por opção seguem a mesma ordenação da chain
+        order = df.index.to_numpy()
+        r, q = (np.asarray(v, dtype=float) for v in (r, q))
+        r = r[order] if r.ndim else r
+        q = q[order] if q.ndim else q
+        df = df.reset_index(drop=True)
+        bid = df['bid'].to_numpy(dtype=float)
+        ask = df['ask'].to_numpy(dtype=float)
+        price = df['price'].to_numpy(dtype=float)
+        quoted = (bid > 0) & (ask > 0)
+        return {
+            'df': df,
+            'symbol': df['symbol'].to_numpy(),
+            'expiry': df['expiry_date'].to_numpy(),
+            'strike': df['strike'].to_numpy(dtype=float),
+            'calls': is_call_array(df['option_type'].to_numpy()),
+            'bid': np.where(quoted, bid, price),
+            'ask': np.where(quoted, ask, price),
+            'mid': np.where(quoted, (bid + ask) / 2.0, price),
+            'iv': df['implied_volatility'].to_numpy(dtype=float),
+            'T': calendar.time_to_expiry(calendar.expiry_ids(df['expiry_date'].to_numpy())),
+            'r': np.broadcast_to(np.asarray(r, dtype=float), (len(df),)),
+            'q': np.broadcast_to(np.asarray(q, dtype=float), (len(df),)),
+        }
+
+    @staticmethod
+    def _findings(check, mask, data, magnitude, score, detail, related=None, rows=None):
+        """Converte uma máscara de violações em registros"""
+        idx = np.flatnonzero(mask) if rows is None else rows[mask]
+        if idx.size == 0:
+            return []
+        mag = magnitude[mask] if rows is not None else magnitude[idx]
+        sc = score[mask] if rows is not None else score[idx]
+        rel = (related[mask] if rows is not None else related[idx]) if related is not None else [None] * idx.size
+        return [{
+            'check': check,
+            'symbol': data['symbol'][i],
+            'related_symbol': rel[n],
+            'expiry_date': data['expiry'][i],
+            'strike': float(data['strike'][i]),
+            'magnitude': float(mag[n]),
+            'score': float(sc[n]),
+            'detail': detail
+        } for n, i in enumerate(idx)]
+
+    def check_crossed_quotes(self, data, spot):
+        """Bid acima do ask (cruzado) ou igual (travado)"""
+        bid, ask = data['bid'], data['ask']
+        crossed = bid > ask
+        locked = (bid == ask) & (bid > 0) & ~crossed
+        gap = bid - ask
+        score = np.abs(gap) / spot * 1e4 + 1.0
+        return (self._findings('crossed_quote', crossed, data, gap, score, 'bid > ask')
+                + self._findings('locked_quote', locked, data, gap, score, 'bid == ask'))
+
+    def check_put_call_parity(self, data, spot):
+        """Paridade put-call com bid/ask: C - P deve conter S·e^(-qT) - K·e^(-rT)"""
+        df = pd.DataFrame({
+            'row': np.arange(len(data['strike'])),
+            'expiry': data['expiry'],
+            'strike': data['strike'],
+            'calls': data['calls']
+        })
+        pairs = df[df['calls']].merge(df[~df['calls']], on=['expiry', 'strike'], suffixes=('_c', '_p'))
+        if pairs.empty:
+            return []
+        c = pairs['row_c'].to_numpy()
+        p = pairs['row_p'].to_numpy()
+
+        T, r, q, K = data['T'][c], data['r'][c], data['q'][c], data['strike'][c]
+        parity = spot * np.exp(-q * T) - K * np.exp(-r * T)
+        lower = data['bid'][c] - data['ask'][p]  # vender sintético
+        upper = data['ask'][c] - data['bid'][p]  # comprar sintético
+        excess = np.maximum(lower - parity, parity - upper)
+        mask = excess > self.price_tolerance
+        return self._findings(
+            'put_call_parity', mask, data, excess, excess / spot * 1e4,
+            'C - P fora da paridade', related=data['symbol'][p], rows=c
+        )
+
+    def _adjacent(self, data, by_expiry=True):
+        """Índices de vizinhos consecutivos no mesmo grupo (tipo, vencimento)"""
+        n = len(data['strike'])
+        if n < 2:
+            return np.array([], dtype=int), np.array([], dtype=int)
+        left = np.arange(n - 1)
+        right = left + 1
+        same = data['calls'][left] == data['calls'][right]
+        if by_expiry:
+            same &= data['expiry'][left] == data['expiry'][right]
+        return left[same], right[same]
+
+    def check_vertical_spreads(self, data, spot):
+        """Calls não crescentes e puts não decrescentes no strike, com inclinação limitada"""
+        lo, hi = self._adjacent(data)
+        if lo.size == 0:
+            return []
+        calls = data['calls'][lo]
+        width = (data['strike'][hi] - data['strike'][lo]) * np.exp(-data['r'][lo] * data['T'][lo])
+
+        # Comprar a mais valiosa pelo ask e vender a outra pelo bid
+        monotonic = np.where(calls, data['bid'][hi] - data['ask'][lo], data['bid'][lo] - data['ask'][hi])
+        slope = np.where(calls, data['bid'][lo] - data['ask'][hi], data['bid'][hi] - data['ask'][lo]) - width
+
+        findings = []
+        mask = monotonic > self.price_tolerance
+        findings += self._findings('vertical_monotonicity', mask, data, monotonic, monotonic / spot * 1e4,
+                                   'preço não monotônico no strike', related=data['symbol'][hi], rows=lo)
+        mask = slope > self.price_tolerance
+        findings += self._findings('vertical_slope', mask, data, slope, slope / spot * 1e4,
+                                   'vertical acima da largura descontada', related=data['symbol'][hi], rows=lo)
+        return findings
+
+    def check_butterflies(self, data, spot):
+        """Convexidade: borboletas com strikes adjacentes não podem ter preço negativo"""
+        lo, mid = self._adjacent(data)
+        if lo.size < 2:
+            return []
+        # Triplas consecutivas: (lo[i], mid[i]) seguida de (mid[i], mid[i] + 1) no mesmo grupo
+        chained = mid[:-1] == lo[1:]
+        k1, k2, k3 = lo[:-1][chained], mid[:-1][chained], mid[1:][chained]
+        if k1.size == 0:
+            return []
+        K = data['strike']
+        w = (K[k3] - K[k2]) / (K[k3] - K[k1])
+        # Comprar asas pelo ask, vender corpo pelo bid
+        cost = w * data['ask'][k1] + (1.0 - w) * data['ask'][k3] - data['bid'][k2]
+        violation = -cost
+        mask = violation > self.price_tolerance
+        return self._findings('butterfly_convexity', mask, data, violation, violation / spot * 1e4,
+                              'borboleta com custo negativo', related=data['symbol'][k2], rows=k1)
+
+    def check_calendars(self, data, spot):
+        """Mesma opção (tipo, strike) deve valer mais no vencimento mais longo"""
+        n = len(data['strike'])
+        order = np.lexsort((data['T'], data['strike'], data['calls']))
+        near, far = order[:-1], order[1:]
+        same = (data['calls'][near] == data['calls'][far]) & (data['strike'][near] == data['strike'][far]) \
+            & (data['T'][far] > data['T'][near])
+        if n < 2 or not same.any():
+            return []
+        near, far = near[same], far[same]
+        violation = data['bid'][near] - data['ask'][far]
+        mask = violation > self.price_tolerance
+        return self._findings('calendar_spread', mask, data, violation, violation / spot * 1e4,
+                              'vencimento curto mais caro que o longo', related=data['symbol'][far], rows=near)
+
+    def check_iv_outliers(self, data, spot):
+        """Resíduos da IV contra o smile quadrático de cada vencimento"""
+        iv = data['iv']
+        valid = np.isfinite(iv) & (iv > 0)
+        if valid.sum() < 4:
+            return []
+        expiry_ids = np.unique(data['expiry'], return_inverse=True)[1].ravel()
+        n_groups = int(expiry_ids.max()) + 1
+        x = forward_log_moneyness(data['strike'], spot, data['T'], data['r'], data['q'])
+
+        coefs = fit_smile(x[valid], iv[valid], expiry_ids[valid], n_groups)
+        residual = iv - evaluate_smile(coefs, expiry_ids, x)
+        residual = np.where(valid, residual, 0.0)
+
+        counts = np.bincount(expiry_ids, weights=valid.astype(float), minlength=n_groups)
+        var = np.bincount(expiry_ids, weights=residual ** 2, minlength=n_groups) / np.maximum(counts - 3, 1.0)
+        std = np.sqrt(var)[expiry_ids]
+        floor = 0.005  # resíduo mínimo de 0.5 ponto de vol
+        zscore = np.abs(residual) / np.maximum(std, floor)
+        mask = valid & (zscore > self.iv_zscore_threshold) & (np.abs(residual) > floor)
+        return self._findings('iv_outlier', mask, data, residual, np.abs(residual) * 1e4,
+                              'IV fora do smile ajustado')
+
+    def scan(self, underlying, chain, spot, r, q=0.0):
+        """
+        Executa todas as checagens sobre uma chain
+
+        Args:
+            underlying (str): Símbolo ativo
+            chain (pd.DataFrame): Chain com symbol, option_type, strike,
+                expiry_date, price, bid, ask e implied_volatility
+            spot (float): Preço do ativo
+            r (float | array_like): Taxa livre de risco por opção
+            q (float | array_like): Dividend yield
+
+        Returns:
+            pd.DataFrame: Achados ordenados por score (maior primeiro)
+        """
+        chain = chain if isinstance(chain, pd.DataFrame) else pd.DataFrame(chain)
+        if chain.empty or not spot:
+            self.findings[underlying] = pd.DataFrame(columns=FINDING_COLUMNS)
+            return self.findings[underlying]
+
+        data = self._prepare(chain, r, q, self.calendar or calendar_for_symbol(underlying))
+        findings = []
+        for check in (self.check_crossed_quotes, self.check_put_call_parity, self.check_vertical_spreads,
+                      self.check_butterflies, self.check_calendars, self.check_iv_outliers):
+            try:
+                findings.extend(check(data, spot))
+            except Exception as e:
+                print(f"❌ Erro na checagem {check.__name__} ({underlying}): {e}")
+
+        result = pd.DataFrame(findings, columns=FINDING_COLUMNS[1:])
+        result.insert(0, 'underlying', underlying)
+        result = result.sort_values('score', ascending=False, ignore_index=True)
+        self.findings[underlying] = result
+        return result
+
+    def get_findings(self, underlying=None, limit=None):
+        """
+        Achados do último scan
+
+        Args:
+            underlying (str, optional): Ativo (None = todos, ranqueados juntos)
+            limit (int, optional): Limite de registros
+
+        Returns:
+            pd.DataFrame: Achados ranqueados
+        """
+        if underlying is not None:
+            result = self.findings.get(underlying, pd.DataFrame(columns=FINDING_COLUMNS))
+        elif self.findings:
+            result = pd.concat(self.findings.values(), ignore_index=True)
+            result = result.sort_values('score', ascending=False, ignore_index=True)
+        else:
+            result = pd.DataFrame(columns=FINDING_COLUMNS)
+        return result.head(limit) if limit else result
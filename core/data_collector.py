@@ -15,6 +15,7 @@ class DataCollector:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.price_listeners = []
         print("🔄 DataCollector inicializado!")
     
     def get_current_price(self, symbol):
@@ -46,6 +47,18 @@ class DataCollector:
             print(f"❌ Erro ao coletar {symbol}: {e}")
             return None
     
+    def add_price_listener(self, callback):
+        """Registra callback(symbol, price, timestamp) chamado a cada preço coletado"""
+        self.price_listeners.append(callback)
+    
+    def notify_price(self, symbol, price, timestamp=None):
+        """Repassa um preço novo aos listeners (ex: reprecificação de opções)"""
+        for callback in self.price_listeners:
+            try:
+                callback(symbol, price, timestamp)
+            except Exception as e:
+                print(f"❌ Erro em listener de preço {symbol}: {e}")
+    
     def collect_all_current_prices(self):
         """Coleta preços atuais de todos os símbolos"""
         print("📊 Coletando preços atuais...")
@@ -60,6 +73,7 @@ class DataCollector:
             if price_data and price_data['price']:
                 # Salva no banco
                 db.save_price(symbol, price_data['price'])
+                self.notify_price(symbol, price_data['price'], price_data['timestamp'])
                 
                 # Armazena para retorno
                 collected_data[symbol] = price_data
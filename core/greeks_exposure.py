@@ -0,0 +1,208 @@
+"""
+ProTrading Engine - Exposição Líquida de Greeks
+Exposição de gamma, delta e vanna no estilo dealer por strike e por
+vencimento, nível de gamma zero e paredes de calls/puts, atualizadas a
+cada snapshot de chain
+Desenvolvido por: Deverson
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.pricing_math import bsm_greeks, is_call_array
+from core.trading_calendar import calendar_for_symbol
+
+PROFILE_COLUMNS = ['call_gex', 'put_gex', 'net_gex', 'dex', 'vex', 'open_interest']
+
+SUMMARY_FIELDS = [
+    'underlying', 'snapshot_id', 'spot', 'total_gex', 'total_dex', 'total_vex',
+    'zero_gamma', 'call_wall', 'put_wall', 'updated_at'
+]
+
+
+class GreeksExposureEngine:
+    """
+    Motor de exposição por ativo
+
+    Convenção dealer: o mercado está comprado em calls e vendido em puts,
+    então gamma, delta e vanna das calls entram com sinal + e das puts com
+    sinal -.
+    Unidades (R$, por contrato = OI x multiplicador):
+    - GEX: gamma x S² x 1% - variação do delta em R$ para 1% no ativo
+    - DEX: delta x S - delta líquido dos dealers em R$
+    - VEX: vanna x S x 1 ponto de vol - variação do delta em R$ para +1 vol
+
+    Cada snapshot recalcula só o próprio ativo (operações colunares sobre a
+    chain) e ajusta os totais do universo pela diferença.
+    """
+
+    def __init__(self, multiplier=100, grid_width=0.20, grid_points=81, calendar=None):
+        """
+        Inicializa o motor
+
+        Args:
+            multiplier (int): Ações por contrato
+            grid_width (float): Meia largura (fração do spot) da grade do gamma zero
+            grid_points (int): Pontos da grade do gamma zero
+            calendar (TradingCalendar, optional): Calendário fixo (padrão: o
+                do mercado de cada ativo)
+        """
+        self.multiplier = multiplier
+        self.grid = np.linspace(1.0 - grid_width, 1.0 + grid_width, grid_points)
+        self.calendar = calendar
+        self.summaries = {}   # underlying -> resumo
+        self.profiles = {}    # underlying -> {'strike': df, 'expiry': df}
+        self.universe = dict.fromkeys(('total_gex', 'total_dex', 'total_vex'), 0.0)
+
+    def update(self, underlying, chain, spot, r, q=0.0, snapshot_id=None):
+        """
+        Recalcula a exposição de um ativo a partir de uma chain
+
+        Args:
+            underlying (str): Símbolo ativo
+            chain (pd.DataFrame): Chain com option_type, strike, expiry_date,
+                implied_volatility e open_interest
+            spot (float): Preço do ativo
+            r (float | array_like): Taxa livre de risco por opção
+            q (float): Dividend yield
+            snapshot_id (int, optional): Snapshot de origem
+
+        Returns:
+            dict: Resumo do ativo
+        """
+        chain = chain if isinstance(chain, pd.DataFrame) else pd.DataFrame(chain)
+        if chain.empty or not spot:
+            self._replace(underlying, None)
+            return {}
+
+        expiry = chain['expiry_date'].to_numpy()
+        K = chain['strike'].to_numpy(dtype=float)
+        calendar = self.calendar or calendar_for_symbol(underlying)
+        T = calendar.time_to_expiry(calendar.expiry_ids(expiry))
+        iv = chain['implied_volatility'].to_numpy(dtype=float)
+        oi = np.nan_to_num(chain['open_interest'].to_numpy(dtype=float))
+        calls = is_call_array(chain['option_type'].to_numpy())
+        valid = np.isfinite(iv) & (iv > 0) & (oi > 0)
+
+        weight = np.where(valid, oi * self.multiplier, 0.0)
+        dealer = np.where(calls, 1.0, -1.0) * weight
+        iv = np.where(valid, iv, 0.2)
+
+        greeks = bsm_greeks(spot, K, T, r, iv, calls, q)
+        gex = dealer * greeks['gamma'] * spot * spot * 0.01
+        dex = dealer * greeks['delta'] * spot
+        vex = dealer * greeks['vanna'] * spot * 0.01
+
+        profiles = {
+            'strike': self._profile(K, calls, gex, dex, vex, weight, 'strike'),
+            'expiry': self._profile(expiry, calls, gex, dex, vex, weight, 'expiry_date'),
+        }
+        by_strike = profiles['strike']
+
+        summary = {
+            'underlying': underlying,
+            'snapshot_id': snapshot_id,
+            'spot': float(spot),
+            'total_gex': float(gex.sum()),
+            'total_dex': float(dex.sum()),
+            'total_vex': float(vex.sum()),
+            'zero_gamma': self._zero_gamma(spot, K, T, r, iv, calls, q, dealer),
+            'call_wall': float(by_strike['strike'][by_strike['call_gex'].idxmax()]),
+            'put_wall': float(by_strike['strike'][by_strike['put_gex'].idxmin()]),
+            'updated_at': datetime.now().isoformat(),
+        }
+        self._replace(underlying, summary, profiles)
+        return summary
+
+    @staticmethod
+    def _profile(keys, calls, gex, dex, vex, weight, name):
+        """Agrega exposições por chave (strike ou vencimento) com bincount"""
+        unique, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.ravel()
+        n = len(unique)
+
+        def total(values):
+            return np.bincount(inverse, weights=values, minlength=n)
+
+        call_gex = total(np.where(calls, gex, 0.0))
+        put_gex = total(np.where(calls, 0.0, gex))
+        return pd.DataFrame({
+            name: unique,
+            'call_gex': call_gex,
+            'put_gex': put_gex,
+            'net_gex': call_gex + put_gex,
+            'dex': total(dex),
+            'vex': total(vex),
+            'open_interest': total(weight),
+        })
+
+    def _zero_gamma(self, spot, K, T, r, iv, calls, q, dealer):
+        """
+        Spot hipotético onde o GEX total troca de sinal
+
+        Recalcula o gamma da chain inteira sobre uma grade de spots em uma
+        única operação (grade x opções) e interpola o cruzamento mais
+        próximo do spot atual. None se não houver troca de sinal na grade.
+        """
+        spots = spot * self.grid[:, None]
+        rates = np.broadcast_to(np.asarray(r, dtype=float), K.shape)
+        gamma = bsm_greeks(spots, K[None, :], T[None, :], rates[None, :], iv[None, :], calls[None, :], q)['gamma']
+        curve = (dealer[None, :] * gamma).sum(axis=1) * spots[:, 0] ** 2 * 0.01
+
+        flips = np.flatnonzero(np.sign(curve[:-1]) * np.sign(curve[1:]) < 0)
+        if flips.size == 0:
+            return None
+        i = flips[np.argmin(np.abs(spots[flips, 0] - spot))]
+        s0, s1 = spots[i, 0], spots[i + 1, 0]
+        g0, g1 = curve[i], curve[i + 1]
+        return float(s0 - g0 * (s1 - s0) / (g1 - g0))
+
+    def _replace(self, underlying, summary, profiles=None):
+        """Troca o estado de um ativo ajustando os totais do universo pela diferença"""
+        old = self.summaries.pop(underlying, None)
+        self.profiles.pop(underlying, None)
+        for key in self.universe:
+            if old:
+                self.universe[key] -= old[key]
+            if summary:
+                self.universe[key] += summary[key]
+        if summary:
+            self.summaries[underlying] = summary
+            self.profiles[underlying] = profiles
+
+    def get_profile(self, underlying, by='strike'):
+        """
+        Perfil de exposição de um ativo
+
+        Args:
+            underlying (str): Símbolo ativo
+            by (str): 'strike' ou 'expiry'
+
+        Returns:
+            pd.DataFrame: Exposições agregadas
+        """
+        if by not in ('strike', 'expiry'):
+            raise ValueError(f"Agregação desconhecida: {by}")
+        profiles = self.profiles.get(underlying)
+        if profiles is None:
+            return pd.DataFrame(columns=['strike' if by == 'strike' else 'expiry_date'] + PROFILE_COLUMNS)
+        return profiles[by]
+
+    def get_summary(self, underlying=None):
+        """
+        Resumo de exposição
+
+        Args:
+            underlying (str, optional): Ativo (None = universo inteiro)
+
+        Returns:
+            dict | pd.DataFrame: Resumo do ativo ou tabela do universo
+                ordenada pelo módulo do GEX
+        """
+        if underlying is not None:
+            return self.summaries.get(underlying, {})
+        table = pd.DataFrame(list(self.summaries.values()), columns=SUMMARY_FIELDS)
+        order = table['total_gex'].abs().sort_values(ascending=False).index
+        return table.loc[order].reset_index(drop=True)
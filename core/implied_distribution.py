@@ -0,0 +1,163 @@
+"""
+ProTrading Engine - Distribuição Neutra ao Risco Implícita
+Breeden-Litzenberger sobre a curva de preços de calls gerada pelo smile
+ajustado, em grades finas de strikes para todos os vencimentos de uma
+vez, com probabilidades de toque/término e cones de probabilidade
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.pricing_math import bsm_price
+from core.trading_calendar import get_calendar
+from core.volatility_smile import evaluate_smile, fit_smile, forward_log_moneyness
+
+CONE_QUANTILES = (0.05, 0.16, 0.50, 0.84, 0.95)
+
+MIN_SMILE_VOL = 0.01
+
+
+class ImpliedDistribution:
+    """
+    Densidades implícitas de um snapshot (vencimentos x pontos da grade)
+
+    A densidade de S_T é e^(rT) · ∂²C/∂K² sobre a curva de calls do smile;
+    valores negativos (ruído de convexidade) são zerados e a densidade é
+    renormalizada. Probabilidades de toque usam o princípio da reflexão
+    (≈ 2x a probabilidade de terminar além do nível, limitada a 1).
+    """
+
+    def __init__(self, expiries, T, forwards, strikes, density):
+        self.expiries = np.asarray(expiries)
+        self.T = np.asarray(T, dtype=float)
+        self.forwards = np.asarray(forwards, dtype=float)
+        self.strikes = strikes
+        self.density = density
+
+        # CDF por trapézios acumulados ao longo da grade de cada vencimento
+        steps = 0.5 * (density[:, 1:] + density[:, :-1]) * np.diff(strikes, axis=1)
+        self.cdf = np.concatenate([np.zeros((len(density), 1)), np.cumsum(steps, axis=1)], axis=1)
+        self.cdf /= np.maximum(self.cdf[:, -1:], 1e-12)
+
+    def _cdf_at(self, thresholds):
+        """CDF de cada vencimento em cada nível (vencimentos x níveis)"""
+        levels = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        return np.stack([np.interp(levels, k, c, left=0.0, right=1.0)
+                         for k, c in zip(self.strikes, self.cdf)])
+
+    def probability_above(self, thresholds):
+        """P(S_T > nível) por vencimento x nível"""
+        return 1.0 - self._cdf_at(thresholds)
+
+    def probability_below(self, thresholds):
+        """P(S_T < nível) por vencimento x nível"""
+        return self._cdf_at(thresholds)
+
+    def probability_touch(self, thresholds, spot):
+        """
+        Probabilidade de tocar o nível até o vencimento
+
+        Args:
+            thresholds (array_like): Níveis
+            spot (float): Preço atual (define se o toque é por cima ou por baixo)
+
+        Returns:
+            np.ndarray: vencimentos x níveis
+        """
+        levels = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        beyond = np.where(levels[None, :] >= spot, self.probability_above(levels), self.probability_below(levels))
+        return np.minimum(2.0 * beyond, 1.0)
+
+    def quantiles(self, probabilities=CONE_QUANTILES):
+        """
+        Cone de probabilidade: quantis de S_T por vencimento
+
+        Returns:
+            pd.DataFrame: expiry_date, T e uma coluna por quantil
+        """
+        rows = {'expiry_date': self.expiries, 'T': self.T}
+        for p in probabilities:
+            rows[f'q{int(round(p * 100))}'] = [float(np.interp(p, c, k)) for k, c in zip(self.strikes, self.cdf)]
+        return pd.DataFrame(rows)
+
+    def to_frame(self, expiry_date):
+        """Grade de um vencimento: strike, density e cdf"""
+        i = int(np.flatnonzero(self.expiries == expiry_date)[0])
+        return pd.DataFrame({'strike': self.strikes[i], 'density': self.density[i], 'cdf': self.cdf[i]})
+
+
+def build_implied_distribution(chain, spot, r, q=0.0, calendar=None, n_points=401, width=5.0):
+    """
+    Extrai a distribuição implícita de todos os vencimentos de uma chain
+
+    Args:
+        chain (pd.DataFrame): Chain com strike, expiry_date e implied_volatility
+        spot (float): Preço do ativo
+        r (float | array_like): Taxa livre de risco por opção
+        q (float): Dividend yield
+        calendar (TradingCalendar, optional): Calendário (padrão: B3)
+        n_points (int): Pontos da grade de strikes por vencimento
+        width (float): Meia largura da grade em desvios-padrão ATM
+
+    Returns:
+        ImpliedDistribution | None: None sem IVs válidas
+    """
+    calendar = calendar or get_calendar('B3')
+    expiry_dates = chain['expiry_date'].to_numpy()
+    T = calendar.time_to_expiry(calendar.expiry_ids(expiry_dates))
+    iv = chain['implied_volatility'].to_numpy(dtype=float)
+    valid = np.isfinite(iv) & (iv > 0) & (T > 0)  # vencidas não têm densidade
+    if not valid.any() or not spot:
+        return None
+
+    rates = np.broadcast_to(np.asarray(r, dtype=float), T.shape)
+    x = forward_log_moneyness(chain['strike'].to_numpy(dtype=float), spot, T, rates, q)
+
+    expiries, first, group_ids = np.unique(expiry_dates[valid], return_index=True, return_inverse=True)
+    coefs = fit_smile(x[valid], iv[valid], group_ids.ravel(), len(expiries))
+    T_e = T[valid][first][:, None]
+    r_e = rates[valid][first][:, None]
+    forwards = spot * np.exp((r_e - q) * T_e)
+
+    # Grade em log-moneyness proporcional ao desvio ATM de cada vencimento
+    atm_std = np.maximum(coefs[:, :1], MIN_SMILE_VOL) * np.sqrt(T_e)
+    grid = np.linspace(-width, width, n_points)[None, :] * atm_std
+    strikes = forwards * np.exp(grid)
+    groups = np.broadcast_to(np.arange(len(expiries))[:, None], grid.shape)
+    vols = np.maximum(evaluate_smile(coefs, groups, grid), MIN_SMILE_VOL)
+
+    calls = bsm_price(spot, strikes, T_e, r_e, vols, True, q)
+    first_derivative = np.gradient(calls, axis=1) / np.gradient(strikes, axis=1)
+    second_derivative = np.gradient(first_derivative, axis=1) / np.gradient(strikes, axis=1)
+    density = np.maximum(np.exp(r_e * T_e) * second_derivative, 0.0)
+
+    area = (0.5 * (density[:, 1:] + density[:, :-1]) * np.diff(strikes, axis=1)).sum(axis=1, keepdims=True)
+    density = density / np.maximum(area, 1e-12)
+    return ImpliedDistribution(expiries, T_e[:, 0], forwards[:, 0], strikes, density)
+
+
+class ImpliedDistributionCache:
+    """Distribuições por ativo cacheadas pelo snapshot da chain"""
+
+    def __init__(self):
+        self.cache = {}  # underlying -> (snapshot_id, ImpliedDistribution)
+
+    def get(self, underlying, snapshot_id, builder):
+        """
+        Distribuição do snapshot (calculada só no primeiro acesso)
+
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot vigente
+            builder (callable): Função que constrói a distribuição
+
+        Returns:
+            ImpliedDistribution | None: Distribuição
+        """
+        cached = self.cache.get(underlying)
+        if cached is not None and snapshot_id is not None and cached[0] == snapshot_id:
+            return cached[1]
+        distribution = builder()
+        self.cache[underlying] = (snapshot_id, distribution)
+        return distribution
@@ -0,0 +1,213 @@
+"""
+ProTrading Engine - Cache de Indicadores
+Resultados de indicadores por (símbolo, indicador, parâmetros, timestamp
+da última barra): sem preço novo a análise custa uma consulta ao
+dicionário, com barras novas as séries de janela fixa são estendidas pelos
+indicadores incrementais e o conjunto é limitado por LRU com orçamento de
+memória
+Desenvolvido por: Deverson
+"""
+
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from config.settings import config
+from core.streaming_indicators import StreamingIndicator
+
+
+def _watermark(timestamp):
+    """Normaliza timestamps (ISO, datetime ou pd.Timestamp) para comparação"""
+    return np.datetime64(timestamp, 'us')
+
+
+def _sizeof(value):
+    """Estimativa de memória de um valor em cache (arrays, dicts e listas)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class CacheEntry:
+    """Valor em cache com a marca d'água da última barra usada"""
+
+    __slots__ = ('watermark', 'value', 'state', 'last_price', 'nbytes')
+
+    def __init__(self, watermark, value, state=None, last_price=None):
+        self.watermark = watermark
+        self.value = value
+        self.state = state
+        self.last_price = last_price
+        self.nbytes = _sizeof(value) + (_sizeof(state.__dict__) if state is not None else 0)
+
+
+class IndicatorCache:
+    """
+    Cache LRU de indicadores com orçamento de memória
+
+    Cada chave (símbolo, indicador, parâmetros) guarda um único resultado e
+    a marca d'água (timestamp da última barra) com que foi calculado; a
+    consulta só acerta se a marca d'água pedida for a mesma. O cache só
+    barateia chamadas repetidas: uma série é sempre igual à calculada do
+    zero sobre o histórico devolvido por `load`. Indicadores de janela fixa
+    (SMA, variância, extremos) guardam o estado incremental e consomem
+    barras novas em O(1) cada; EMA e RSI dependem de todo o histórico
+    consumido e são recalculados sobre a janela carregada.
+    """
+
+    def __init__(self, max_bytes=None, max_points=1000):
+        """
+        Args:
+            max_bytes (int, optional): Orçamento de memória (padrão: config.INDICATOR_CACHE_MB)
+            max_points (int): Pontos mantidos por série (os mais antigos são descartados)
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else config.INDICATOR_CACHE_MB * 1024 * 1024
+        self.max_points = max_points
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(symbol, indicator, params):
+        return symbol, indicator, tuple(sorted((params or {}).items()))
+
+    def get(self, symbol, indicator, params, last_timestamp):
+        """
+        Resultado em cache para a marca d'água informada
+
+        Args:
+            symbol (str): Símbolo
+            indicator (str): Nome do indicador (ou da estratégia)
+            params (dict): Parâmetros
+            last_timestamp: Timestamp da última barra do símbolo
+
+        Returns:
+            Valor guardado, ou None se ausente ou calculado com outra barra
+        """
+        key = self.make_key(symbol, indicator, params)
+        entry = self.entries.get(key)
+        if entry is None or last_timestamp is None or entry.watermark != _watermark(last_timestamp):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, symbol, indicator, params, last_timestamp, value):
+        """Guarda um resultado calculado até `last_timestamp`"""
+        self._store(self.make_key(symbol, indicator, params), CacheEntry(_watermark(last_timestamp), value))
+
+    def series(self, symbol, indicator, params, last_timestamp, load):
+        """
+        Série de um indicador incremental (ver StreamingIndicator.registry)
+
+        Com a mesma marca d'água devolve a série guardada sem chamar `load`.
+        Caso contrário carrega o histórico; se o indicador é de janela fixa e
+        a última barra em cache está nele com o mesmo preço, só as barras
+        posteriores passam pelo estado incremental, senão a série é
+        recalculada a partir do histórico.
+
+        Args:
+            symbol (str): Símbolo
+            indicator (str): Tipo do indicador ('sma', 'ema', 'rsi', 'variance', 'extreme')
+            params (dict): Parâmetros do construtor (ex: {'period': 20})
+            last_timestamp: Timestamp da última barra do símbolo
+            load (callable): Devolve (timestamps, preços) em ordem cronológica
+
+        Returns:
+            np.ndarray: Valores do indicador alinhados às barras carregadas
+                (as últimas `max_points`), NaN até haver dados suficientes
+        """
+        key = self.make_key(symbol, indicator, params)
+        entry = self.entries.get(key)
+        if entry is not None and last_timestamp is not None and entry.watermark == _watermark(last_timestamp):
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+        self.misses += 1
+        timestamps, prices = load()
+        timestamps = np.asarray(timestamps, dtype='datetime64[us]')
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) == 0:
+            return np.array([])
+
+        points = min(len(prices), self.max_points)
+        start = None
+        if entry is not None and entry.state is not None and entry.state.warmup is not None:
+            position = int(np.searchsorted(timestamps, entry.watermark, side='right'))
+            if position > 0 and timestamps[position - 1] == entry.watermark \
+                    and prices[position - 1] == entry.last_price \
+                    and len(entry.value) + len(prices) - position >= points:
+                start = position
+
+        if start is None:
+            state = StreamingIndicator.registry[indicator](**(params or {}))
+            values = np.array([state.update(price) for price in prices], dtype=float)[-points:]
+        else:
+            self.extensions += 1
+            state = entry.state
+            new_values = np.array([state.update(price) for price in prices[start:]], dtype=float)
+            values = np.concatenate([entry.value, new_values])[-points:]
+            # Mesmo aquecimento do cálculo do zero sobre as barras carregadas
+            values[:max(0, state.warmup - (len(prices) - points))] = np.nan
+
+        self._store(key, CacheEntry(timestamps[-1], values, state, prices[-1]))
+        return values
+
+    def last_price(self, symbol, indicator, params):
+        """
+        Último preço consumido por uma série em cache
+
+        Args:
+            symbol (str): Símbolo
+            indicator (str): Tipo do indicador
+            params (dict): Parâmetros
+
+        Returns:
+            float | None: Preço da barra mais recente da série (None se ausente)
+        """
+        entry = self.entries.get(self.make_key(symbol, indicator, params))
+        return None if entry is None or entry.last_price is None else float(entry.last_price)
+
+    def _store(self, key, entry):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self.entries[key] = entry
+        self.nbytes += entry.nbytes
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def invalidate(self, symbol=None):
+        """Remove as entradas de um símbolo (ou todas)"""
+        for key in [k for k in self.entries if symbol is None or k[0] == symbol]:
+            self.nbytes -= self.entries.pop(key).nbytes
+
+    def stats(self):
+        """Métricas de uso do cache"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.nbytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'extensions': self.extensions,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+# Instância global
+indicator_cache = IndicatorCache()
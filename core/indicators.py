@@ -0,0 +1,249 @@
+"""
+ProTrading Engine - Indicadores Técnicos Vetorizados
+SMA, EMA, RSI de Wilder, MACD, Bandas de Bollinger, ATR, estocástico,
+OBV e VWAP sobre arrays NumPy. Séries completas em uma chamada; entradas
+1D (uma série) ou 2D (ativos x tempo), com o tempo sempre no último eixo
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=float)
+
+
+def _nan_like(x):
+    return np.full(x.shape, np.nan)
+
+
+def _window_diff(c, period):
+    """Diferença de somas acumuladas = soma de cada janela completa"""
+    out = np.full(c.shape, np.nan)
+    out[..., period - 1:] = c[..., period - 1:]
+    out[..., period:] -= c[..., :-period]
+    return out
+
+
+def rolling_sum(values, period):
+    """
+    Soma móvel por cumsum
+
+    NaN até a primeira janela completa e em toda janela que contém NaN;
+    um NaN não contamina as janelas seguintes, então séries mais curtas
+    preenchidas com NaN à esquerda têm valores assim que juntam `period`
+    observações.
+    """
+    x = _as_array(values)
+    if x.shape[-1] < period:
+        return _nan_like(x)
+    missing = np.isnan(x)
+    out = _window_diff(np.cumsum(np.where(missing, 0.0, x), axis=-1), period)
+    if missing.any():
+        out[_window_diff(np.cumsum(missing, axis=-1), period) > 0] = np.nan
+    return out
+
+
+def sma(values, period):
+    """Média móvel simples"""
+    return rolling_sum(values, period) / period
+
+
+def rolling_std(values, period, ddof=0):
+    """Desvio-padrão móvel (somas de x e x²)"""
+    x = _as_array(values)
+    mean = sma(x, period)
+    mean_sq = sma(x * x, period)
+    var = np.maximum(mean_sq - mean * mean, 0.0) * period / (period - ddof)
+    return np.sqrt(var)
+
+
+def _smooth(values, alpha, period):
+    """
+    Suavização exponencial recursiva semeada pela média dos `period`
+    primeiros valores (padrão de EMA e das médias de Wilder)
+
+    O laço percorre só o eixo do tempo; cada passo atualiza todos os
+    ativos de uma vez. Cada ativo é semeado a partir do seu primeiro valor
+    válido, então NaN à esquerda (históricos mais curtos) só atrasa o início.
+    """
+    x = _as_array(values)
+    out = _nan_like(x)
+    n = x.shape[-1]
+    if n < period:
+        return out
+    # Tempo no primeiro eixo e contíguo: cada passo lê uma linha inteira
+    series = np.ascontiguousarray(np.moveaxis(x, -1, 0)).reshape(n, -1)
+    seed_at = np.argmax(~np.isnan(series), axis=0) + period - 1
+    smoothed = np.full(series.shape, np.nan)
+    state = np.full(series.shape[1], np.nan)
+    decay = 1.0 - alpha
+    for t in range(int(seed_at.min()), n):
+        state = alpha * series[t] + decay * state
+        seeding = np.flatnonzero(seed_at == t)
+        if seeding.size:
+            state[seeding] = series[t - period + 1:t + 1, seeding].mean(axis=0)
+        smoothed[t] = state
+    out[...] = np.moveaxis(smoothed.reshape((n,) + x.shape[:-1]), 0, -1)
+    return out
+
+
+def ema(values, period):
+    """Média móvel exponencial (alpha = 2 / (period + 1), semeada pela SMA)"""
+    return _smooth(values, 2.0 / (period + 1.0), period)
+
+
+def wilder_smooth(values, period):
+    """Média de Wilder (alpha = 1 / period, semeada pela SMA)"""
+    return _smooth(values, 1.0 / period, period)
+
+
+def rsi(close, period=14):
+    """
+    RSI com suavização de Wilder
+
+    Args:
+        close (array_like): Fechamentos
+        period (int): Período
+
+    Returns:
+        np.ndarray: RSI (0-100), NaN nas primeiras `period` barras
+    """
+    c = _as_array(close)
+    out = _nan_like(c)
+    if c.shape[-1] <= period:
+        return out
+    delta = np.diff(c, axis=-1)
+    avg_gain = wilder_smooth(np.maximum(delta, 0.0), period)
+    avg_loss = wilder_smooth(np.maximum(-delta, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    out[..., 1:] = np.where(avg_loss == 0, np.where(np.isnan(avg_gain), np.nan, 100.0), value)
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD
+
+    Returns:
+        tuple: (linha MACD, linha de sinal, histograma)
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = _nan_like(line)
+    start = slow - 1
+    if line.shape[-1] > start:
+        signal_line[..., start:] = ema(line[..., start:], signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger_bands(close, period=20, num_std=2.0):
+    """
+    Bandas de Bollinger
+
+    Returns:
+        tuple: (média, banda superior, banda inferior)
+    """
+    middle = sma(close, period)
+    width = num_std * rolling_std(close, period)
+    return middle, middle + width, middle - width
+
+
+def true_range(high, low, close):
+    """True range (primeira barra usa máxima - mínima)"""
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    prev = np.concatenate([c[..., :1], c[..., :-1]], axis=-1)
+    return np.maximum(h, prev) - np.minimum(l, prev)
+
+
+def atr(high, low, close, period=14):
+    """Average True Range (Wilder)"""
+    return wilder_smooth(true_range(high, low, close), period)
+
+
+def _rolling_extreme(values, period, ufunc, fill):
+    """
+    Máximo/mínimo móvel em O(n) (van Herk/Gil-Werman)
+
+    Divide o tempo em blocos de `period`; o extremo de cada janela combina
+    o acumulado do fim do bloco onde a janela começa com o acumulado do
+    início do bloco onde ela termina.
+    """
+    x = _as_array(values)
+    out = _nan_like(x)
+    n = x.shape[-1]
+    if n < period:
+        return out
+    pad = (-n) % period
+    padded = np.concatenate([x, np.full(x.shape[:-1] + (pad,), fill)], axis=-1)
+    blocks = padded.reshape(x.shape[:-1] + (-1, period))
+    prefix = ufunc.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = ufunc.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    out[..., period - 1:] = ufunc(suffix[..., :n - period + 1], prefix[..., period - 1:n])
+    return out
+
+
+def rolling_max(values, period):
+    """Máximo móvel"""
+    return _rolling_extreme(values, period, np.maximum, -np.inf)
+
+
+def rolling_min(values, period):
+    """Mínimo móvel"""
+    return _rolling_extreme(values, period, np.minimum, np.inf)
+
+
+def stochastic(high, low, close, k_period=14, d_period=3):
+    """
+    Oscilador estocástico
+
+    Returns:
+        tuple: (%K, %D)
+    """
+    highest = rolling_max(high, k_period)
+    lowest = rolling_min(low, k_period)
+    span = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(span > 0, (_as_array(close) - lowest) / span * 100.0, 50.0)
+    k = np.where(np.isnan(span), np.nan, k)
+
+    d = _nan_like(k)
+    start = k_period - 1
+    if k.shape[-1] > start:
+        d[..., start:] = sma(k[..., start:], d_period)
+    return k, d
+
+
+def obv(close, volume):
+    """On-Balance Volume"""
+    c, v = _as_array(close), _as_array(volume)
+    direction = np.zeros_like(c)
+    direction[..., 1:] = np.sign(np.diff(c, axis=-1))
+    return np.cumsum(direction * v, axis=-1)
+
+
+def vwap(high, low, close, volume, period=None):
+    """
+    VWAP pelo preço típico
+
+    Args:
+        period (int, optional): Janela móvel; None = acumulado desde o início
+
+    Returns:
+        np.ndarray: VWAP
+    """
+    typical = (_as_array(high) + _as_array(low) + _as_array(close)) / 3.0
+    v = _as_array(volume)
+    if period is None:
+        pv, vol = np.cumsum(typical * v, axis=-1), np.cumsum(v, axis=-1)
+    else:
+        pv, vol = rolling_sum(typical * v, period), rolling_sum(v, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(vol > 0, pv / vol, np.nan)
+
+
+def last_valid(series):
+    """Último valor de uma série 1D (None se NaN ou vazia)"""
+    if len(series) == 0 or np.isnan(series[-1]):
+        return None
+    return float(series[-1])
@@ -0,0 +1,360 @@
+"""
+ProTrading Engine - Histórico de Volatilidade Implícita
+IV ATM e estrutura a termo de maturidade constante (30/60/90 dias)
+gravadas a cada snapshot, com IV rank e IV percentil mantidos
+incrementalmente em janelas deslizantes (árvore de Fenwick)
+Desenvolvido por: Deverson
+"""
+
+import sqlite3
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR, calendar_for_symbol, get_calendar
+from core.volatility_smile import fit_smile, forward_log_moneyness
+from data.database import db
+
+# Maturidades constantes na mesma base de T do calendário (dias úteis / 252):
+# 30, 60 e 90 dias corridos correspondem a 21, 42 e 63 pregões
+CONSTANT_MATURITIES = {
+    'iv_30d': 21 / BUSINESS_DAYS_PER_YEAR,
+    'iv_60d': 42 / BUSINESS_DAYS_PER_YEAR,
+    'iv_90d': 63 / BUSINESS_DAYS_PER_YEAR,
+}
+
+IV_SERIES = ('atm_iv',) + tuple(CONSTANT_MATURITIES)
+
+MIN_FRONT_TIME = 5 / BUSINESS_DAYS_PER_YEAR  # Vencimentos com menos de 5 pregões ficam fora do ATM
+
+
+def iv_term_structure(chain, spot, r, q=0.0, calendar=None):
+    """
+    IV ATM por vencimento e IVs de maturidade constante de uma chain
+
+    A IV ATM de cada vencimento é o nível do smile quadrático ajustado em
+    log-moneyness forward zero; as maturidades constantes interpolam a
+    variância total (σ²T) linearmente em T, com vol constante fora da
+    faixa de vencimentos listados.
+
+    Args:
+        chain (pd.DataFrame): Chain com strike, expiry_date e implied_volatility
+        spot (float): Preço do ativo
+        r (float | array_like): Taxa livre de risco por opção
+        q (float): Dividend yield
+        calendar (TradingCalendar, optional): Calendário (padrão: B3)
+
+    Returns:
+        dict: atm_iv, iv_30d, iv_60d, iv_90d (None quando não há IV válida)
+    """
+    calendar = calendar or get_calendar('B3')
+    expiry_ids = calendar.expiry_ids(chain['expiry_date'].to_numpy())
+    T = calendar.time_to_expiry(expiry_ids)
+    iv = chain['implied_volatility'].to_numpy(dtype=float)
+    valid = np.isfinite(iv) & (iv > 0) & (T > 0)
+    if not valid.any() or not spot:
+        return dict.fromkeys(IV_SERIES)
+
+    x = forward_log_moneyness(chain['strike'].to_numpy(dtype=float), spot, T, r, q)
+
+    groups, group_ids = np.unique(expiry_ids[valid], return_inverse=True)
+    coefs = fit_smile(x[valid], iv[valid], group_ids.ravel(), len(groups))
+    atm = np.clip(coefs[:, 0], 1e-4, None)
+    T_expiry = calendar.time_to_expiry(groups)
+
+    order = np.argsort(T_expiry)
+    T_expiry, atm = T_expiry[order], atm[order]
+    usable = T_expiry >= MIN_FRONT_TIME
+    if usable.any():
+        T_expiry, atm = T_expiry[usable], atm[usable]
+
+    variance = atm * atm * T_expiry
+    targets = np.clip(np.array(list(CONSTANT_MATURITIES.values())), T_expiry[0], T_expiry[-1])
+    term = np.sqrt(np.interp(targets, T_expiry, variance) / targets)
+
+    result = {'atm_iv': float(atm[0])}
+    result.update({name: float(v) for name, v in zip(CONSTANT_MATURITIES, term)})
+    return result
+
+
+class RollingRankWindow:
+    """
+    Janela deslizante no tempo com estatísticas de ordem em O(log n)
+
+    Valores são discretizados em baldes (resolução de 0.1 ponto de vol por
+    padrão) e contados numa árvore de Fenwick: inserir, expirar, contar
+    valores abaixo de x e achar o k-ésimo menor (mínimo e máximo da janela)
+    custam O(log baldes), sem reler o histórico.
+    """
+
+    def __init__(self, lookback, resolution=0.001, max_value=3.0):
+        """
+        Inicializa a janela
+
+        Args:
+            lookback (timedelta): Tamanho da janela
+            resolution (float): Largura de cada balde
+            max_value (float): Maior valor representável (acima é truncado)
+        """
+        self.lookback = lookback
+        self.resolution = resolution
+        self.size = int(round(max_value / resolution)) + 1
+        self.tree = [0] * (self.size + 1)
+        self.entries = deque()  # (timestamp, balde) em ordem de chegada
+        self._top_bit = 1 << (self.size.bit_length() - 1)
+
+    def _bucket(self, value):
+        return min(max(int(round(value / self.resolution)), 0), self.size - 1)
+
+    def _update(self, bucket, delta):
+        i = bucket + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def _count_below(self, bucket):
+        """Quantidade de valores em baldes < bucket"""
+        total, i = 0, bucket
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _kth(self, k):
+        """Balde do k-ésimo menor valor (k a partir de 1)"""
+        pos, step = 0, self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, timestamp, value):
+        """Insere uma observação e expira as que saíram da janela"""
+        bucket = self._bucket(value)
+        self.entries.append((timestamp, bucket))
+        self._update(bucket, 1)
+        self.expire(timestamp)
+
+    def expire(self, now):
+        """Remove observações mais antigas que a janela"""
+        cutoff = now - self.lookback
+        while self.entries and self.entries[0][0] < cutoff:
+            _, bucket = self.entries.popleft()
+            self._update(bucket, -1)
+
+    def min(self):
+        return self._kth(1) * self.resolution if self.entries else None
+
+    def max(self):
+        return self._kth(len(self.entries)) * self.resolution if self.entries else None
+
+    def percentile(self, value):
+        """Fração das observações da janela abaixo de `value` (0 a 1)"""
+        if not self.entries:
+            return None
+        return self._count_below(self._bucket(value)) / len(self.entries)
+
+    def rank(self, value):
+        """IV rank: posição de `value` entre o mínimo e o máximo da janela (0 a 1)"""
+        if not self.entries:
+            return None
+        low, high = self.min(), self.max()
+        if high <= low:
+            return 0.5
+        return min(max((value - low) / (high - low), 0.0), 1.0)
+
+
+class IVHistory:
+    """
+    Série histórica de IV por ativo
+
+    Cada snapshot grava uma linha em `iv_history` e alimenta as janelas
+    de cada série (ATM e maturidades constantes). As janelas são
+    carregadas do banco uma única vez na inicialização.
+    """
+
+    def __init__(self, db_path=None, lookback_days=365, calendar=None):
+        """
+        Inicializa o histórico
+
+        Args:
+            db_path (str, optional): Banco SQLite (padrão: banco principal)
+            lookback_days (int): Janela do IV rank/percentil em dias corridos
+            calendar (TradingCalendar, optional): Calendário fixo (padrão: o
+                do mercado de cada ativo)
+        """
+        self.db_path = db_path or db.db_path
+        self.lookback = timedelta(days=lookback_days)
+        self.calendar = calendar
+        self.windows = {}  # (underlying, série) -> RollingRankWindow
+        self.latest = {}   # underlying -> última linha gravada
+        self.init_iv_tables()
+        self.warm_up()
+
+    def init_iv_tables(self):
+        """Cria tabela e índice do histórico de IV"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS iv_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                underlying TEXT NOT NULL,
+                snapshot_id INTEGER,
+                taken_at TEXT NOT NULL,
+                spot REAL,
+                atm_iv REAL,
+                iv_30d REAL,
+                iv_60d REAL,
+                iv_90d REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_iv_history_underlying_time
+            ON iv_history (underlying, taken_at)
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _window(self, underlying, series):
+        key = (underlying, series)
+        if key not in self.windows:
+            self.windows[key] = RollingRankWindow(self.lookback)
+        return self.windows[key]
+
+    def _observe(self, row):
+        """Alimenta as janelas com uma linha do histórico"""
+        taken_at = datetime.fromisoformat(row['taken_at'])
+        for series in IV_SERIES:
+            value = row.get(series)
+            if value is not None and not pd.isna(value):
+                self._window(row['underlying'], series).add(taken_at, value)
+        self.latest[row['underlying']] = row
+
+    def warm_up(self):
+        """Carrega a janela de lookback do banco (uma consulta)"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            rows = pd.read_sql_query(f'''
+                SELECT underlying, snapshot_id, taken_at, spot, {', '.join(IV_SERIES)}
+                FROM iv_history
+                WHERE taken_at >= ?
+                ORDER BY taken_at, id
+            ''', conn, params=((datetime.now() - self.lookback).isoformat(),))
+            conn.close()
+        except Exception as e:
+            print(f"❌ Erro ao carregar histórico de IV: {e}")
+            return
+
+        for row in rows.to_dict('records'):
+            self._observe(row)
+
+    def record(self, underlying, snapshot_id, chain, spot, r, q=0.0, taken_at=None):
+        """
+        Calcula e grava a estrutura a termo de um snapshot
+
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot de origem
+            chain (pd.DataFrame): Chain completa
+            spot (float): Preço do ativo
+            r (float | array_like): Taxa livre de risco por opção
+            q (float): Dividend yield
+            taken_at (datetime, optional): Momento do snapshot (padrão: agora)
+
+        Returns:
+            dict: Linha gravada
+        """
+        term = iv_term_structure(chain, spot, r, q, self.calendar or calendar_for_symbol(underlying))
+        if term['atm_iv'] is None:
+            return {}
+
+        row = {
+            'underlying': underlying,
+            'snapshot_id': snapshot_id,
+            'taken_at': (taken_at or datetime.now()).isoformat(),
+            'spot': float(spot),
+            **term
+        }
+        columns = list(row)
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute(
+                f"INSERT INTO iv_history ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                tuple(row[c] for c in columns)
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"❌ Erro ao gravar histórico de IV {underlying}: {e}")
+            return {}
+
+        self._observe(row)
+        return row
+
+    def get_stats(self, underlying):
+        """
+        IV atual com rank e percentil de cada série
+
+        Args:
+            underlying (str): Símbolo ativo
+
+        Returns:
+            dict: série -> {value, rank, percentile, low, high, observations}
+        """
+        latest = self.latest.get(underlying)
+        if latest is None:
+            return {}
+
+        stats = {}
+        for series in IV_SERIES:
+            value = latest.get(series)
+            window = self.windows.get((underlying, series))
+            if value is None or pd.isna(value) or window is None:
+                continue
+            window.expire(datetime.now())
+            stats[series] = {
+                'value': value,
+                'rank': window.rank(value),
+                'percentile': window.percentile(value),
+                'low': window.min(),
+                'high': window.max(),
+                'observations': len(window)
+            }
+        return stats
+
+    def get_history(self, underlying, start=None, end=None):
+        """
+        Série histórica de IV de um ativo
+
+        Args:
+            underlying (str): Símbolo ativo
+            start, end (str | datetime, optional): Intervalo
+
+        Returns:
+            pd.DataFrame: taken_at, spot e séries de IV
+        """
+        start = start.isoformat() if isinstance(start, datetime) else (start or '')
+        end = end.isoformat() if isinstance(end, datetime) else (end or '9999')
+        try:
+            conn = sqlite3.connect(self.db_path)
+            result = pd.read_sql_query(f'''
+                SELECT snapshot_id, taken_at, spot, {', '.join(IV_SERIES)}
+                FROM iv_history
+                WHERE underlying = ? AND taken_at >= ? AND taken_at <= ?
+                ORDER BY taken_at
+            ''', conn, params=(underlying, start, end))
+            conn.close()
+            return result
+        except Exception as e:
+            print(f"❌ Erro ao buscar histórico de IV {underlying}: {e}")
+            return pd.DataFrame()
@@ -0,0 +1,266 @@
+"""
+ProTrading Engine - Reprecificação Incremental de Opções
+Atualiza marcações das chains a cada tick do ativo objeto usando
+aproximação de Taylor (delta/gamma/vanna/theta) e reprecificação completa
+vetorizada, pelo modelo configurado do ativo, apenas quando o movimento ou
+o tempo decorrido exigem
+Desenvolvido por: Deverson
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config.settings import config
+from core.pricing_math import is_call_array
+from core.pricing_models import get_model, price_chain
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR, calendar_for_symbol
+
+
+def _to_epoch(timestamp):
+    """Converte datetime/str/float para segundos epoch"""
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp).timestamp()
+    return float(timestamp)
+
+
+def normalize_underlying(symbol):
+    """Remove sufixo de bolsa (PETR4.SA -> PETR4)"""
+    return symbol.split('.')[0].upper()
+
+
+class _ChainState:
+    """Estado colunar de uma chain registrada no motor"""
+
+    def __init__(self, model, calendar, symbols, strikes, expiry_ids, vols, calls, r, q):
+        self.model = model
+        self.calendar = calendar
+        self.symbols = symbols
+        self.strikes = strikes
+        self.expiry_ids = expiry_ids  # ids no calendário de pregões
+        self.vols = vols
+        self.calls = calls
+        self.r = r
+        self.q = q
+
+        # Base da última reprecificação completa
+        self.base_spot = 0.0
+        self.base_time = 0.0
+        self.base_T = None
+        self.base_prices = None
+        self.base_vol_shift = 0.0
+        self.delta = None
+        self.gamma = None
+        self.vanna = None
+        self.vega = None
+        self.theta = None
+
+        # Marcação corrente
+        self.spot = 0.0
+        self.vol_shift = 0.0
+        self.marks = None
+        self.updated_at = 0.0
+
+
+class LiveRepricingEngine:
+    """
+    Motor de reprecificação de opções dirigido por ticks
+
+    Cada tick do ativo objeto atualiza apenas as chains daquele ativo:
+    - movimentos pequenos: P + delta*dS + 0.5*gamma*dS² + vanna*dS*dσ + vega*dσ
+      + theta*dt (dt em dias úteis de pregão decorridos desde a base)
+    - movimento acima do limite ou tempo decorrido acima do máximo:
+      reprecificação vetorizada da chain inteira pelo modelo do ativo
+      (config.PRICING_MODELS), de onde vêm também as sensibilidades
+    """
+
+    def __init__(self, reprice_threshold=0.01, max_staleness_seconds=60.0, calendar=None):
+        """
+        Inicializa o motor
+
+        Args:
+            reprice_threshold (float): Movimento relativo do ativo que força
+                reprecificação completa (0.01 = 1%)
+            max_staleness_seconds (float): Tempo máximo desde a última
+                reprecificação completa
+            calendar (TradingCalendar, optional): Calendário fixo (padrão: o
+                do mercado de cada ativo, NYSE para ADRs)
+        """
+        self.calendar = calendar
+        self.reprice_threshold = reprice_threshold
+        self.max_staleness_seconds = max_staleness_seconds
+        self.chains = {}
+        self.listeners = []
+        self.stats = {'ticks': 0, 'taylor_updates': 0, 'full_reprices': 0}
+        print("⚡ Motor de reprecificação incremental inicializado!")
+
+    def subscribe(self, callback):
+        """
+        Registra callback chamado a cada atualização de marcação
+
+        Args:
+            callback (callable): callback(underlying, marks_array, full_reprice)
+        """
+        self.listeners.append(callback)
+
+    def register_chain(self, underlying, options, spot, r, q=0.0, timestamp=None, model=None):
+        """
+        Registra (ou substitui) a chain de um ativo e faz a precificação base
+
+        Args:
+            underlying (str): Símbolo ativo
+            options (list | pd.DataFrame): Opções com symbol, strike,
+                option_type, implied_volatility e expiry_date
+            spot (float): Preço atual do ativo
+            r (float | array_like): Taxa livre de risco
+            q (float | array_like): Dividend yield contínuo (ignorado pelo
+                Black-76, que usa q = r)
+            timestamp (float | datetime, optional): Momento do registro
+            model (str, optional): Força um modelo do registro (padrão: o
+                configurado para o ativo)
+
+        Returns:
+            int: Número de opções registradas
+        """
+        chain = options if isinstance(options, pd.DataFrame) else pd.DataFrame(options)
+        if chain.empty:
+            self.chains.pop(normalize_underlying(underlying), None)
+            return 0
+
+        calendar = self.calendar or calendar_for_symbol(underlying)
+        name = model or config.PRICING_MODELS.get(normalize_underlying(underlying), config.DEFAULT_PRICING_MODEL)
+        state = _ChainState(
+            model=get_model(name),
+            calendar=calendar,
+            symbols=chain['symbol'].to_numpy(),
+            strikes=chain['strike'].to_numpy(dtype=float),
+            expiry_ids=calendar.expiry_ids(chain['expiry_date'].to_numpy()),
+            vols=chain['implied_volatility'].to_numpy(dtype=float),
+            calls=is_call_array(chain['option_type'].to_numpy()),
+            r=np.broadcast_to(np.asarray(r, dtype=float), (len(chain),)).copy(),
+            q=np.broadcast_to(np.asarray(q, dtype=float), (len(chain),)).copy()
+        )
+        now = _to_epoch(timestamp)
+        self.chains[normalize_underlying(underlying)] = state
+        self._full_reprice(state, float(spot), now, 0.0)
+        return len(chain)
+
+    def _time_to_expiry(self, state, now):
+        """Tempo útil até vencimento no momento da reprecificação"""
+        return state.calendar.time_to_expiry(state.expiry_ids, datetime.fromtimestamp(now))
+
+    def _full_reprice(self, state, spot, now, vol_shift):
+        """Reprecificação completa vetorizada e recálculo das sensibilidades"""
+        T = self._time_to_expiry(state, now)
+        vols = state.vols + vol_shift
+        greeks = price_chain(state.model, spot, state.strikes, T, state.r, vols, state.calls, state.q,
+                             with_greeks=True)
+        prices = greeks['price']
+
+        state.base_spot = spot
+        state.base_time = now
+        state.base_T = T
+        state.base_prices = prices
+        state.delta = greeks['delta']
+        state.gamma = greeks['gamma']
+        state.vanna = greeks['vanna']
+        state.vega = greeks['vega'] * 100.0  # por unidade de vol
+        state.theta = greeks['theta']  # por dia útil
+        state.base_vol_shift = vol_shift
+
+        state.spot = spot
+        state.vol_shift = vol_shift
+        state.marks = prices
+        state.updated_at = now
+
+    def _taylor_update(self, state, spot, now, vol_shift):
+        """Atualização de segunda ordem em torno da última base"""
+        dS = spot - state.base_spot
+        dvol = vol_shift - state.base_vol_shift
+        # Decaimento pelo tempo de pregão decorrido (zero fora do horário)
+        elapsed_days = (state.base_T - self._time_to_expiry(state, now)) * BUSINESS_DAYS_PER_YEAR
+        marks = (state.base_prices
+                 + state.delta * dS
+                 + 0.5 * state.gamma * dS * dS
+                 + state.vanna * dS * dvol
+                 + state.vega * dvol
+                 + state.theta * elapsed_days)
+        state.spot = spot
+        state.vol_shift = vol_shift
+        state.marks = np.maximum(marks, 0.0)
+        state.updated_at = now
+
+    def on_price_update(self, symbol, price, timestamp=None, vol_shift=None):
+        """
+        Processa um tick do ativo objeto
+
+        Args:
+            symbol (str): Símbolo do ativo (PETR4 ou PETR4.SA)
+            price (float): Novo preço
+            timestamp (float | datetime, optional): Momento do tick
+            vol_shift (float, optional): Choque paralelo de vol (ex: 0.01 = +1 ponto)
+
+        Returns:
+            np.ndarray | None: Marcações atualizadas ou None se não há chain
+        """
+        state = self.chains.get(normalize_underlying(symbol))
+        if state is None or price is None or price <= 0:
+            return None
+
+        self.stats['ticks'] += 1
+        now = _to_epoch(timestamp)
+        price = float(price)
+        shift = state.vol_shift if vol_shift is None else float(vol_shift)
+
+        move = abs(price / state.base_spot - 1.0)
+        stale = (now - state.base_time) >= self.max_staleness_seconds
+        full = move > self.reprice_threshold or stale
+
+        if full:
+            self._full_reprice(state, price, now, shift)
+            self.stats['full_reprices'] += 1
+        else:
+            self._taylor_update(state, price, now, shift)
+            self.stats['taylor_updates'] += 1
+
+        for callback in self.listeners:
+            try:
+                callback(normalize_underlying(symbol), state.marks, full)
+            except Exception as e:
+                print(f"❌ Erro em listener de reprecificação: {e}")
+
+        return state.marks
+
+    def get_marks(self, underlying):
+        """
+        Marcações correntes de uma chain
+
+        Args:
+            underlying (str): Símbolo ativo
+
+        Returns:
+            pd.DataFrame: symbol, mark, delta, gamma, spot, updated_at
+        """
+        state = self.chains.get(normalize_underlying(underlying))
+        if state is None:
+            return pd.DataFrame()
+
+        dS = state.spot - state.base_spot
+        return pd.DataFrame({
+            'symbol': state.symbols,
+            'mark': state.marks,
+            'delta': state.delta + state.gamma * dS,
+            'gamma': state.gamma,
+            'spot': state.spot,
+            'updated_at': datetime.fromtimestamp(state.updated_at).isoformat()
+        })
+
+    def get_stats(self):
+        """Estatísticas de ticks processados"""
+        return dict(self.stats, chains=len(self.chains))
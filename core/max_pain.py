@@ -0,0 +1,183 @@
+"""
+ProTrading Engine - Max Pain e Perfis de Open Interest
+Matriz de payoff no vencimento (preços de liquidação candidatos x opções)
+calculada em uma única operação vetorizada para todos os vencimentos e
+perfis de OI/volume por strike, cacheados por snapshot
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.pricing_math import is_call_array
+
+MAX_PAIN_COLUMNS = ['expiry_date', 'max_pain', 'total_payout', 'call_oi', 'put_oi', 'put_call_oi_ratio']
+
+PROFILE_COLUMNS = [
+    'expiry_date', 'strike', 'call_oi', 'put_oi', 'call_volume', 'put_volume',
+    'net_oi', 'put_call_oi_ratio'
+]
+
+
+def payoff_matrix(settlements, strikes, calls, weights=None):
+    """
+    Payoff no vencimento de cada opção para cada preço de liquidação
+
+    Args:
+        settlements (array_like): Preços candidatos (m,)
+        strikes (array_like): Strikes das opções (n,)
+        calls (array_like): Máscara de calls (n,)
+        weights (array_like, optional): Pesos por opção (ex: open interest)
+
+    Returns:
+        np.ndarray: Matriz (m, n) de payoffs ponderados
+    """
+    S = np.asarray(settlements, dtype=float)[:, None]
+    K = np.asarray(strikes, dtype=float)[None, :]
+    sign = np.where(np.asarray(calls, dtype=bool), 1.0, -1.0)[None, :]
+    payoff = np.maximum(sign * (S - K), 0.0)
+    if weights is not None:
+        payoff *= np.asarray(weights, dtype=float)[None, :]
+    return payoff
+
+
+def max_pain(chain, multiplier=1):
+    """
+    Max pain de todos os vencimentos de uma chain
+
+    Os candidatos são a união dos strikes da chain; a matriz candidatos x
+    opções é multiplicada pela matriz indicadora opções x vencimentos,
+    dando o pagamento total de cada candidato em cada vencimento. Só os
+    strikes listados em cada vencimento concorrem ao seu max pain.
+
+    Args:
+        chain (pd.DataFrame): Chain com option_type, strike, expiry_date e open_interest
+        multiplier (int): Ações por contrato (escala do pagamento)
+
+    Returns:
+        tuple: (resumo por vencimento, curva de pagamento candidatos x vencimentos)
+    """
+    if chain.empty:
+        return pd.DataFrame(columns=MAX_PAIN_COLUMNS), pd.DataFrame()
+
+    strikes = chain['strike'].to_numpy(dtype=float)
+    calls = is_call_array(chain['option_type'].to_numpy())
+    oi = np.nan_to_num(chain['open_interest'].to_numpy(dtype=float))
+    expiries, expiry_ids = np.unique(chain['expiry_date'].to_numpy(), return_inverse=True)
+    expiry_ids = expiry_ids.ravel()
+    candidates, candidate_ids = np.unique(strikes, return_inverse=True)
+    candidate_ids = candidate_ids.ravel()
+    n_exp, n_cand = len(expiries), len(candidates)
+
+    indicator = np.zeros((len(strikes), n_exp))
+    indicator[np.arange(len(strikes)), expiry_ids] = 1.0
+    payout = payoff_matrix(candidates, strikes, calls, oi * multiplier) @ indicator  # (candidatos, vencimentos)
+
+    listed = np.zeros((n_cand, n_exp), dtype=bool)
+    listed[candidate_ids, expiry_ids] = True
+    masked = np.where(listed, payout, np.inf)
+    best = masked.argmin(axis=0)
+
+    call_oi = np.bincount(expiry_ids, weights=np.where(calls, oi, 0.0), minlength=n_exp)
+    put_oi = np.bincount(expiry_ids, weights=np.where(calls, 0.0, oi), minlength=n_exp)
+    summary = pd.DataFrame({
+        'expiry_date': expiries,
+        'max_pain': candidates[best],
+        'total_payout': masked[best, np.arange(n_exp)],
+        'call_oi': call_oi,
+        'put_oi': put_oi,
+        'put_call_oi_ratio': np.where(call_oi > 0, put_oi / np.maximum(call_oi, 1.0), np.nan),
+    })
+    curve = pd.DataFrame(np.where(listed, payout, np.nan), index=pd.Index(candidates, name='settlement'),
+                         columns=expiries)
+    return summary, curve
+
+
+def open_interest_profile(chain):
+    """
+    OI e volume por (vencimento, strike), calls e puts lado a lado
+
+    Args:
+        chain (pd.DataFrame): Chain com option_type, strike, expiry_date,
+            open_interest e volume
+
+    Returns:
+        pd.DataFrame: Perfil ordenado por vencimento e strike
+    """
+    if chain.empty:
+        return pd.DataFrame(columns=PROFILE_COLUMNS)
+
+    calls = is_call_array(chain['option_type'].to_numpy())
+    expiries, expiry_ids = np.unique(chain['expiry_date'].to_numpy(), return_inverse=True)
+    strikes, strike_ids = np.unique(chain['strike'].to_numpy(dtype=float), return_inverse=True)
+    keys, ids = np.unique(expiry_ids.ravel() * len(strikes) + strike_ids.ravel(), return_inverse=True)
+    ids = ids.ravel()
+    n = len(keys)
+    oi = np.nan_to_num(chain['open_interest'].to_numpy(dtype=float))
+    volume = np.nan_to_num(chain['volume'].to_numpy(dtype=float))
+
+    def total(values, mask):
+        return np.bincount(ids, weights=np.where(mask, values, 0.0), minlength=n)
+
+    call_oi, put_oi = total(oi, calls), total(oi, ~calls)
+    return pd.DataFrame({
+        'expiry_date': expiries[keys // len(strikes)],
+        'strike': strikes[keys % len(strikes)],
+        'call_oi': call_oi,
+        'put_oi': put_oi,
+        'call_volume': total(volume, calls),
+        'put_volume': total(volume, ~calls),
+        'net_oi': call_oi - put_oi,
+        'put_call_oi_ratio': np.where(call_oi > 0, put_oi / np.maximum(call_oi, 1.0), np.nan),
+    })
+
+
+class OpenInterestProfiler:
+    """
+    Max pain e perfis de OI cacheados por snapshot
+
+    O resultado de um ativo só é recalculado quando chega um snapshot
+    novo; leituras repetidas do dashboard no mesmo snapshot são um acesso
+    a dicionário.
+    """
+
+    def __init__(self, multiplier=1):
+        """
+        Inicializa o calculador
+
+        Args:
+            multiplier (int): Ações por contrato (escala do pagamento)
+        """
+        self.multiplier = multiplier
+        self.cache = {}  # underlying -> (snapshot_id, resultado)
+        self.hits = 0
+        self.misses = 0
+
+    def compute(self, underlying, snapshot_id, chain):
+        """
+        Calcula (ou devolve do cache) max pain e perfis de um snapshot
+
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot da chain
+            chain (pd.DataFrame | callable): Chain ou função que a carrega
+                (só chamada em caso de cache miss)
+
+        Returns:
+            dict: 'max_pain', 'payout_curve' e 'profile'
+        """
+        cached = self.cache.get(underlying)
+        if cached is not None and snapshot_id is not None and cached[0] == snapshot_id:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        chain = chain() if callable(chain) else chain
+        summary, curve = max_pain(chain, self.multiplier)
+        result = {'max_pain': summary, 'payout_curve': curve, 'profile': open_interest_profile(chain)}
+        self.cache[underlying] = (snapshot_id, result)
+        return result
+
+    def on_snapshot(self, underlying, snapshot_id, chain):
+        """Listener do arquivo de snapshots: pré-calcula o snapshot novo"""
+        self.compute(underlying, snapshot_id, chain)
@@ -0,0 +1,289 @@
+"""
+ProTrading Engine - Motor Monte Carlo para Estruturas Path-Dependent
+Barreiras, asiáticas e autocalláveis sobre GBM ou vol local, com
+variáveis antitéticas e de controle, blocos de trajetórias em streaming
+e paralelismo por processos com sementes reprodutíveis
+Desenvolvido por: Deverson
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# ========== PAYOFFS ==========
+# Payoffs são classes (e não closures) para poderem ir aos processos do pool.
+# Cada um recebe o bloco de trajetórias (caminhos x (passos + 1)), os tempos
+# de cada passo e a taxa r, e devolve o valor presente por trajetória.
+
+class EuropeanPayoff:
+    """Call/put europeia (útil para validação contra Black-Scholes)"""
+
+    def __init__(self, strike, option_type='call'):
+        self.strike = strike
+        self.sign = 1.0 if option_type.lower() == 'call' else -1.0
+
+    def __call__(self, paths, times, r):
+        payoff = np.maximum(self.sign * (paths[:, -1] - self.strike), 0.0)
+        return payoff * np.exp(-r * times[-1])
+
+
+class BarrierPayoff:
+    """
+    Opção com barreira monitorada nos passos da simulação
+
+    kind: 'up-and-out', 'up-and-in', 'down-and-out' ou 'down-and-in'
+    """
+
+    def __init__(self, strike, barrier, option_type='call', kind='up-and-out', rebate=0.0):
+        if kind not in ('up-and-out', 'up-and-in', 'down-and-out', 'down-and-in'):
+            raise ValueError(f"Tipo de barreira desconhecido: {kind}")
+        self.strike = strike
+        self.barrier = barrier
+        self.sign = 1.0 if option_type.lower() == 'call' else -1.0
+        self.kind = kind
+        self.rebate = rebate
+
+    def __call__(self, paths, times, r):
+        if self.kind.startswith('up'):
+            touched = paths.max(axis=1) >= self.barrier
+        else:
+            touched = paths.min(axis=1) <= self.barrier
+        alive = ~touched if self.kind.endswith('out') else touched
+        vanilla = np.maximum(self.sign * (paths[:, -1] - self.strike), 0.0)
+        payoff = np.where(alive, vanilla, self.rebate)
+        return payoff * np.exp(-r * times[-1])
+
+
+class AsianPayoff:
+    """Asiática de média aritmética (ou geométrica) dos passos monitorados"""
+
+    def __init__(self, strike, option_type='call', averaging='arithmetic', average_strike=False):
+        self.strike = strike
+        self.sign = 1.0 if option_type.lower() == 'call' else -1.0
+        self.averaging = averaging
+        self.average_strike = average_strike
+
+    def __call__(self, paths, times, r):
+        monitored = paths[:, 1:]
+        if self.averaging == 'geometric':
+            average = np.exp(np.log(monitored).mean(axis=1))
+        else:
+            average = monitored.mean(axis=1)
+        if self.average_strike:
+            payoff = np.maximum(self.sign * (paths[:, -1] - average), 0.0)
+        else:
+            payoff = np.maximum(self.sign * (average - self.strike), 0.0)
+        return payoff * np.exp(-r * times[-1])
+
+
+class AutocallablePayoff:
+    """
+    Nota estruturada autocallable (estilo COE)
+
+    Em cada observação, se S >= autocall_level * S0 a nota é resgatada com
+    notional * (1 + coupon * n_observações). Sem resgate antecipado, no
+    vencimento paga o notional se S_T >= protection_level * S0, senão
+    notional * S_T / S0.
+    """
+
+    def __init__(self, observation_steps, autocall_level=1.0, coupon=0.05,
+                 protection_level=0.7, notional=1000.0):
+        self.observation_steps = np.asarray(observation_steps, dtype=int)
+        self.autocall_level = autocall_level
+        self.coupon = coupon
+        self.protection_level = protection_level
+        self.notional = notional
+
+    def __call__(self, paths, times, r):
+        s0 = paths[:, :1]
+        observed = paths[:, self.observation_steps] / s0
+        called = observed >= self.autocall_level
+        any_call = called.any(axis=1)
+        first = np.argmax(called, axis=1)
+
+        call_times = times[self.observation_steps][first]
+        call_value = self.notional * (1.0 + self.coupon * (first + 1)) * np.exp(-r * call_times)
+
+        final = paths[:, -1] / s0[:, 0]
+        maturity = np.where(final >= self.protection_level, self.notional, self.notional * final)
+        maturity_value = maturity * np.exp(-r * times[-1])
+        return np.where(any_call, call_value, maturity_value)
+
+
+# ========== SIMULAÇÃO ==========
+
+def simulate_paths(spot, r, q, sigma, T, n_steps, normals, local_vol=None):
+    """
+    Gera trajetórias log-normais a partir de choques normais
+
+    Args:
+        spot (float): Preço inicial
+        r, q (float): Taxa livre de risco e dividend yield contínuos
+        sigma (float): Volatilidade (ignorada com vol local)
+        T (float): Horizonte em anos
+        n_steps (int): Número de passos
+        normals (np.ndarray): Choques (caminhos x passos)
+        local_vol (callable, optional): sigma(S_array, t) vetorizado
+
+    Returns:
+        tuple: (trajetórias caminhos x (passos + 1), tempos)
+    """
+    dt = T / n_steps
+    times = np.linspace(0.0, T, n_steps + 1)
+    sqrt_dt = np.sqrt(dt)
+    n_paths = normals.shape[0]
+
+    log_paths = np.empty((n_paths, n_steps + 1))
+    log_paths[:, 0] = np.log(spot)
+
+    if local_vol is None:
+        increments = (r - q - 0.5 * sigma ** 2) * dt + sigma * sqrt_dt * normals
+        np.cumsum(increments, axis=1, out=log_paths[:, 1:])
+        log_paths[:, 1:] += log_paths[:, :1]
+    else:
+        for step in range(n_steps):
+            current = np.exp(log_paths[:, step])
+            vol = np.asarray(local_vol(current, times[step]), dtype=float)
+            log_paths[:, step + 1] = (log_paths[:, step] + (r - q - 0.5 * vol ** 2) * dt
+                                      + vol * sqrt_dt * normals[:, step])
+
+    return np.exp(log_paths), times
+
+
+def _simulate_chunk(task):
+    """Simula um bloco e devolve apenas somas (memória constante)"""
+    (seed, n_paths, spot, r, q, sigma, T, n_steps, payoff, local_vol, antithetic) = task
+    rng = np.random.default_rng(seed)
+
+    if antithetic:
+        half = (n_paths + 1) // 2
+        z = rng.standard_normal((half, n_steps))
+        paths_up, times = simulate_paths(spot, r, q, sigma, T, n_steps, z, local_vol)
+        paths_down, _ = simulate_paths(spot, r, q, sigma, T, n_steps, -z, local_vol)
+        y = 0.5 * (payoff(paths_up, times, r) + payoff(paths_down, times, r))
+        c = 0.5 * (paths_up[:, -1] + paths_down[:, -1]) * np.exp(-r * T)
+        simulated = 2 * half
+    else:
+        z = rng.standard_normal((n_paths, n_steps))
+        paths, times = simulate_paths(spot, r, q, sigma, T, n_steps, z, local_vol)
+        y = payoff(paths, times, r)
+        c = paths[:, -1] * np.exp(-r * T)
+        simulated = n_paths
+
+    return {
+        'n': y.size,
+        'paths': simulated,
+        'sum_y': y.sum(), 'sum_yy': (y * y).sum(),
+        'sum_c': c.sum(), 'sum_cc': (c * c).sum(),
+        'sum_yc': (y * c).sum()
+    }
+
+
+class MonteCarloEngine:
+    """
+    Motor Monte Carlo em blocos
+
+    Cada bloco recebe uma semente filha de `np.random.SeedSequence(seed)`,
+    então o resultado é o mesmo com 1 ou N processos. Blocos devolvem só
+    somas suficientes, mantendo a memória limitada a um bloco por processo.
+    A variável de controle é o valor descontado de S_T, cuja média exata é
+    S0·e^(-qT).
+    """
+
+    def __init__(self, n_paths=100000, n_steps=252, chunk_size=10000, antithetic=True,
+                 control_variate=True, workers=1, seed=None):
+        """
+        Inicializa o motor
+
+        Args:
+            n_paths (int): Total de trajetórias
+            n_steps (int): Passos por trajetória
+            chunk_size (int): Trajetórias por bloco
+            antithetic (bool): Usa pares antitéticos
+            control_variate (bool): Aplica variável de controle em S_T
+            workers (int): Processos (1 = execução no processo atual)
+            seed (int, optional): Semente para reprodutibilidade
+        """
+        self.n_paths = int(n_paths)
+        self.n_steps = int(n_steps)
+        self.chunk_size = int(chunk_size)
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.workers = max(1, int(workers))
+        self.seed = seed
+
+    def _tasks(self, spot, r, q, sigma, T, payoff, local_vol):
+        """Divide o total de trajetórias em blocos com sementes independentes"""
+        n_chunks = max(1, -(-self.n_paths // self.chunk_size))
+        seeds = np.random.SeedSequence(self.seed).spawn(n_chunks)
+        remaining = self.n_paths
+        for child in seeds:
+            size = min(self.chunk_size, remaining)
+            remaining -= size
+            yield (child, size, spot, r, q, sigma, T, self.n_steps, payoff, local_vol, self.antithetic)
+
+    def price(self, payoff, spot, T, r, sigma=None, q=0.0, local_vol=None):
+        """
+        Precifica um payoff
+
+        Args:
+            payoff (callable): Payoff(paths, times, r) -> valor presente por trajetória
+            spot (float): Preço do ativo
+            T (float): Vencimento (anos)
+            r (float): Taxa livre de risco contínua
+            sigma (float, optional): Volatilidade do GBM
+            q (float): Dividend yield contínuo
+            local_vol (callable, optional): sigma(S, t) vetorizado (precisa ser
+                picklable quando workers > 1)
+
+        Returns:
+            dict: price, std_error, paths, elapsed, paths_per_second, beta
+        """
+        if sigma is None and local_vol is None:
+            raise ValueError("Informe sigma (GBM) ou local_vol")
+
+        start = time.perf_counter()
+        tasks = self._tasks(spot, r, q, sigma or 0.0, T, payoff, local_vol)
+
+        totals = dict.fromkeys(['n', 'paths', 'sum_y', 'sum_yy', 'sum_c', 'sum_cc', 'sum_yc'], 0.0)
+        if self.workers == 1:
+            results = map(_simulate_chunk, tasks)
+            self._accumulate(totals, results)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                self._accumulate(totals, pool.map(_simulate_chunk, tasks))
+
+        n = totals['n']
+        mean_y = totals['sum_y'] / n
+        var_y = max(totals['sum_yy'] / n - mean_y ** 2, 0.0) * n / max(n - 1, 1)
+
+        beta = 0.0
+        estimate, variance = mean_y, var_y
+        if self.control_variate:
+            mean_c = totals['sum_c'] / n
+            var_c = max(totals['sum_cc'] / n - mean_c ** 2, 0.0) * n / max(n - 1, 1)
+            cov = (totals['sum_yc'] / n - mean_y * mean_c) * n / max(n - 1, 1)
+            if var_c > 0:
+                beta = cov / var_c
+                expected_c = spot * np.exp(-q * T)
+                estimate = mean_y - beta * (mean_c - expected_c)
+                variance = max(var_y - cov ** 2 / var_c, 0.0)
+
+        elapsed = time.perf_counter() - start
+        return {
+            'price': float(estimate),
+            'std_error': float(np.sqrt(variance / n)),
+            'paths': int(totals['paths']),
+            'elapsed': elapsed,
+            'paths_per_second': totals['paths'] / elapsed if elapsed > 0 else float('inf'),
+            'beta': float(beta)
+        }
+
+    @staticmethod
+    def _accumulate(totals, results):
+        """Soma os resultados dos blocos conforme chegam"""
+        for chunk in results:
+            for key in totals:
+                totals[key] += chunk[key]
@@ -0,0 +1,162 @@
+"""
+ProTrading Engine - Consulta Indexada de Chains de Opções
+Filtros por vencimento, strike, delta e tipo sobre a chain vigente,
+com cache LRU em memória invalidado a cada novo snapshot
+Desenvolvido por: Deverson
+"""
+
+import sqlite3
+from collections import OrderedDict
+
+import pandas as pd
+
+# Colunas devolvidas pelas consultas (todas presentes no índice de cobertura)
+QUERY_COLUMNS = [
+    'symbol', 'underlying', 'option_type', 'strike', 'expiry_date',
+    'price', 'bid', 'ask', 'volume', 'open_interest', 'implied_volatility',
+    'delta', 'gamma', 'days_to_expiry'
+]
+
+
+class OptionChainStore:
+    """
+    Camada de consulta sobre o `OptionsSnapshotArchive`
+
+    - Índice de cobertura em (underlying, valid_to, expiry_date, option_type,
+      strike, delta, ...) responde às consultas sem acessar a tabela
+    - Fatias consultadas ficam em um LRU em memória; um novo snapshot do
+      ativo invalida todas as fatias dele
+    - Nenhuma consulta é truncada: chains grandes voltam inteiras
+    """
+
+    def __init__(self, archive, max_entries=256):
+        """
+        Inicializa a camada de consulta
+
+        Args:
+            archive (OptionsSnapshotArchive): Arquivo de snapshots
+            max_entries (int): Máximo de fatias no LRU
+        """
+        self.archive = archive
+        self.db_path = archive.db_path
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self.init_indexes()
+        archive.add_listener(self._on_snapshot)
+
+    def init_indexes(self):
+        """Cria o índice de cobertura das consultas de chain"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_quote_versions_chain_query
+            ON option_quote_versions (
+                underlying, valid_to, expiry_date, option_type, strike, delta,
+                {', '.join(c for c in QUERY_COLUMNS if c not in ('underlying', 'expiry_date', 'option_type', 'strike', 'delta'))}
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _on_snapshot(self, underlying, snapshot_id, chain):
+        """Listener do arquivo: invalida fatias do ativo atualizado"""
+        self.invalidate(underlying)
+
+    def invalidate(self, underlying=None):
+        """
+        Remove fatias do cache
+
+        Args:
+            underlying (str, optional): Ativo a invalidar (None = todos)
+        """
+        if underlying is None:
+            self.cache.clear()
+        else:
+            for key in [k for k in self.cache if k[0] == underlying]:
+                del self.cache[key]
+        self.stats['invalidations'] += 1
+
+    @staticmethod
+    def _normalize_key(underlying, expiries, strike_range, delta_range, types):
+        """Chave hashable e canônica para o LRU"""
+        return (
+            underlying,
+            tuple(sorted(expiries)) if expiries else None,
+            tuple(strike_range) if strike_range else None,
+            tuple(delta_range) if delta_range else None,
+            tuple(sorted(t.upper() for t in types)) if types else None
+        )
+
+    def query(self, underlying, expiries=None, strike_range=None, delta_range=None, types=None):
+        """
+        Consulta uma fatia da chain vigente
+
+        O DataFrame devolvido é compartilhado com o cache; trate-o como
+        somente leitura.
+
+        Args:
+            underlying (str): Símbolo ativo
+            expiries (list, optional): Vencimentos 'YYYY-MM-DD'
+            strike_range (tuple, optional): (strike_min, strike_max)
+            delta_range (tuple, optional): (delta_min, delta_max)
+            types (list, optional): ['CALL'], ['PUT'] ou ambos
+
+        Returns:
+            pd.DataFrame: Opções ordenadas por vencimento, tipo e strike
+        """
+        key = self._normalize_key(underlying, expiries, strike_range, delta_range, types)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return cached
+
+        self.stats['misses'] += 1
+        result = self._query_db(*key)
+        if result is None:
+            return pd.DataFrame(columns=QUERY_COLUMNS)
+
+        self.cache[key] = result
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return result
+
+    def _query_db(self, underlying, expiries, strike_range, delta_range, types):
+        """Executa a consulta no SQLite usando o índice de cobertura"""
+        clauses = ['underlying = ?', 'valid_to IS NULL']
+        params = [underlying]
+
+        if expiries:
+            clauses.append(f"expiry_date IN ({', '.join(['?'] * len(expiries))})")
+            params.extend(expiries)
+        if types:
+            clauses.append(f"option_type IN ({', '.join(['?'] * len(types))})")
+            params.extend(types)
+        if strike_range:
+            clauses.append('strike BETWEEN ? AND ?')
+            params.extend(strike_range)
+        if delta_range:
+            clauses.append('delta BETWEEN ? AND ?')
+            params.extend(delta_range)
+
+        query = f'''
+            SELECT {', '.join(QUERY_COLUMNS)}
+            FROM option_quote_versions INDEXED BY idx_quote_versions_chain_query
+            WHERE {' AND '.join(clauses)}
+            ORDER BY expiry_date, option_type, strike
+        '''
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            result = pd.read_sql_query(query, conn, params=params)
+            conn.close()
+            return result
+        except Exception as e:
+            print(f"❌ Erro na consulta de chain {underlying}: {e}")
+            return None
+
+    def get_stats(self):
+        """Estatísticas do cache de fatias"""
+        return dict(self.stats, entries=len(self.cache))
@@ -0,0 +1,132 @@
+"""
+ProTrading Engine - Rankings de Opções Mantidos Incrementalmente
+Top volume, open interest, variação de IV e volume/OI incomum por ativo
+e para o mercado, atualizados a cada snapshot persistido
+Desenvolvido por: Deverson
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+LEADERBOARD_METRICS = ('volume', 'open_interest', 'iv_change', 'volume_oi_ratio')
+
+ENTRY_FIELDS = [
+    'symbol', 'underlying', 'option_type', 'strike', 'expiry_date',
+    'price', 'volume', 'open_interest', 'implied_volatility'
+]
+
+
+class OptionLeaderboards:
+    """
+    Rankings top-N mantidos em heaps limitados
+
+    Cada snapshot substitui o ranking do próprio ativo (heap de tamanho N
+    sobre a chain nova) e o ranking de mercado é refeito a partir dos N
+    melhores de cada ativo. A leitura é O(N) e independe do tamanho das
+    tabelas de opções.
+    """
+
+    def __init__(self, top_n=50):
+        """
+        Inicializa os rankings
+
+        Args:
+            top_n (int): Tamanho de cada ranking
+        """
+        self.top_n = top_n
+        self.boards = {}   # underlying -> metric -> [(score, symbol, entry)]
+        self.market = {metric: [] for metric in LEADERBOARD_METRICS}
+        self.last_iv = {}  # underlying -> {symbol: IV} da chain anterior
+
+    def on_snapshot(self, underlying, snapshot_id, chain):
+        """
+        Atualiza rankings com um snapshot (listener do arquivo de snapshots)
+
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot persistido
+            chain (pd.DataFrame): Chain completa do snapshot
+        """
+        if chain is None or len(chain) == 0:
+            self.boards.pop(underlying, None)
+            self.last_iv.pop(underlying, None)
+            self._rebuild_market()
+            return
+
+        symbols = chain['symbol'].to_numpy()
+        volume = chain['volume'].to_numpy(dtype=float)
+        oi = chain['open_interest'].to_numpy(dtype=float)
+        iv = chain['implied_volatility'].to_numpy(dtype=float)
+
+        # Contratos sem IV anterior ou com IV inalterada ficam fora do ranking
+        last_iv = self.last_iv.get(underlying, {})
+        previous_iv = np.array([last_iv.get(s, np.nan) for s in symbols], dtype=float)
+        iv_change = iv - previous_iv
+        iv_change[iv_change == 0] = np.nan
+        ratio = np.where(volume > 0, volume / np.maximum(oi, 1.0), np.nan)
+
+        scores = {
+            'volume': np.where(volume > 0, volume, np.nan),
+            'open_interest': np.where(oi > 0, oi, np.nan),
+            'iv_change': iv_change,
+            'volume_oi_ratio': ratio,
+        }
+        # Variação de IV é ranqueada pelo módulo, mas guarda o sinal
+        rank_keys = dict(scores, iv_change=np.abs(iv_change))
+
+        entries = chain[ENTRY_FIELDS].to_dict('records')
+        board = {}
+        for metric in LEADERBOARD_METRICS:
+            keys = rank_keys[metric]
+            values = scores[metric]
+            valid = np.flatnonzero(~np.isnan(keys))
+            top = heapq.nlargest(self.top_n, valid, key=keys.__getitem__)
+            board[metric] = [(float(keys[i]), symbols[i], dict(entries[i], value=float(values[i]))) for i in top]
+
+        self.boards[underlying] = board
+        # Guarda só a chain atual: contratos que saíram da chain não acumulam
+        self.last_iv[underlying] = dict(zip(symbols, iv))
+        self._rebuild_market()
+
+    def _rebuild_market(self):
+        """Combina os N melhores de cada ativo no ranking de mercado"""
+        for metric in LEADERBOARD_METRICS:
+            candidates = (item for board in self.boards.values() for item in board[metric])
+            self.market[metric] = heapq.nlargest(self.top_n, candidates, key=lambda item: item[0])
+
+    def get_top(self, metric, underlying=None, n=None):
+        """
+        Lê um ranking
+
+        Args:
+            metric (str): 'volume', 'open_interest', 'iv_change' ou 'volume_oi_ratio'
+            underlying (str, optional): Ativo (None = mercado)
+            n (int, optional): Quantidade (máximo top_n)
+
+        Returns:
+            pd.DataFrame: Opções ranqueadas com coluna 'value'
+        """
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Métrica de ranking desconhecida: {metric}")
+
+        if underlying is None:
+            items = self.market[metric]
+        else:
+            items = self.boards.get(underlying, {}).get(metric, [])
+
+        items = items[:n] if n else items
+        return pd.DataFrame([entry for _, _, entry in items], columns=ENTRY_FIELDS + ['value'])
+
+    def warm_up(self, archive):
+        """
+        Reconstrói os rankings a partir das chains vigentes do arquivo
+
+        Args:
+            archive (OptionsSnapshotArchive): Arquivo de snapshots
+        """
+        for underlying in archive.get_underlyings():
+            chain = archive.get_latest_chain(underlying)
+            if not chain.empty:
+                self.on_snapshot(underlying, None, chain)
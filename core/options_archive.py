@@ -0,0 +1,376 @@
+"""
+ProTrading Engine - Arquivo Histórico de Snapshots de Opções
+Cada coleta vira um snapshot; cotações inalteradas não são copiadas,
+apenas continuam válidas (intervalos de validade por snapshot)
+Desenvolvido por: Deverson
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from data.database import db
+
+# Campos que identificam uma mudança de cotação
+QUOTE_FIELDS = [
+    'price', 'bid', 'ask', 'volume', 'open_interest', 'implied_volatility',
+    'delta', 'gamma', 'theta', 'vega', 'rho', 'intrinsic_value', 'time_value',
+    'moneyness', 'days_to_expiry', 'bid_ask_spread', 'mid_price'
+]
+
+CONTRACT_FIELDS = ['symbol', 'underlying', 'option_type', 'strike', 'expiry_date']
+
+QUOTE_COLUMNS = ', '.join(CONTRACT_FIELDS + QUOTE_FIELDS)
+
+
+class OptionsSnapshotArchive:
+    """
+    Arquivo de snapshots de chains de opções
+
+    Modelo de armazenamento (versionamento por intervalo):
+    - chain_snapshots: um registro por coleta (snapshot_id, underlying, taken_at)
+    - option_quote_versions: uma linha por versão de cotação, válida do
+      snapshot `valid_from` até `valid_to` (exclusivo, NULL = vigente)
+    - latest_chain_snapshot: ponteiro do último snapshot por ativo
+
+    Uma cotação idêntica à versão vigente apenas continua válida, então o
+    armazenamento cresce com as mudanças e não com tamanho da chain x coletas.
+    """
+
+    def __init__(self, db_path=None):
+        """Inicializa o arquivo de snapshots"""
+        self.db_path = db_path or db.db_path
+        self.listeners = []
+        self.init_archive_tables()
+
+    def init_archive_tables(self):
+        """Cria tabelas e índices do arquivo"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS chain_snapshots (
+                snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                underlying TEXT NOT NULL,
+                taken_at TEXT NOT NULL,
+                total_quotes INTEGER DEFAULT 0,
+                changed_quotes INTEGER DEFAULT 0,
+                data_source TEXT
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS option_quote_versions (
+                version_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                underlying TEXT NOT NULL,
+                option_type TEXT NOT NULL,
+                strike REAL NOT NULL,
+                expiry_date TEXT NOT NULL,
+                price REAL NOT NULL,
+                bid REAL,
+                ask REAL,
+                volume INTEGER DEFAULT 0,
+                open_interest INTEGER DEFAULT 0,
+                implied_volatility REAL,
+                delta REAL,
+                gamma REAL,
+                theta REAL,
+                vega REAL,
+                rho REAL,
+                intrinsic_value REAL,
+                time_value REAL,
+                moneyness REAL,
+                days_to_expiry INTEGER,
+                bid_ask_spread REAL,
+                mid_price REAL,
+                valid_from INTEGER NOT NULL,
+                valid_to INTEGER
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS latest_chain_snapshot (
+                underlying TEXT PRIMARY KEY,
+                snapshot_id INTEGER NOT NULL,
+                taken_at TEXT NOT NULL
+            )
+        ''')
+
+        # Busca do snapshot vigente em uma data (as-of)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_chain_snapshots_underlying_time
+            ON chain_snapshots (underlying, taken_at)
+        ''')
+        # Chain vigente: versões abertas por ativo
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_quote_versions_open
+            ON option_quote_versions (underlying, valid_to, expiry_date, strike)
+        ''')
+        # Chain histórica: versões iniciadas até o snapshot
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_quote_versions_from
+            ON option_quote_versions (underlying, valid_from)
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def add_listener(self, callback):
+        """
+        Registra callback(underlying, snapshot_id, chain_df) chamado após
+        cada snapshot persistido
+
+        Args:
+            callback (callable): Função chamada com a chain completa do snapshot
+        """
+        self.listeners.append(callback)
+
+    def _quote_key(self, row):
+        """Tupla comparável dos campos de cotação"""
+        return tuple(None if pd.isna(row[f]) else row[f] for f in QUOTE_FIELDS)
+
+    def record_snapshot(self, underlying, options, taken_at=None, data_source=None):
+        """
+        Persiste uma coleta como snapshot
+
+        Args:
+            underlying (str): Símbolo ativo
+            options (list | pd.DataFrame): Opções da coleta
+            taken_at (str | datetime, optional): Momento da coleta
+            data_source (str, optional): Origem dos dados
+
+        Returns:
+            int: snapshot_id criado (None em caso de erro)
+        """
+        chain = options if isinstance(options, pd.DataFrame) else pd.DataFrame(options)
+        if isinstance(taken_at, datetime):
+            taken_at = taken_at.isoformat()
+        taken_at = taken_at or datetime.now().isoformat()
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                INSERT INTO chain_snapshots (underlying, taken_at, total_quotes, data_source)
+                VALUES (?, ?, ?, ?)
+            ''', (underlying, taken_at, len(chain), data_source))
+            snapshot_id = cursor.lastrowid
+
+            # Versões vigentes (uma única consulta pelo índice de versões abertas)
+            cursor.execute(f'''
+                SELECT version_id, symbol, {', '.join(QUOTE_FIELDS)}
+                FROM option_quote_versions
+                WHERE underlying = ? AND valid_to IS NULL
+            ''', (underlying,))
+            current = {row[1]: (row[0], tuple(row[2:])) for row in cursor.fetchall()}
+
+            to_close = []
+            to_insert = []
+            seen = set()
+            for row in chain.to_dict('records'):
+                symbol = row['symbol']
+                seen.add(symbol)
+                key = self._quote_key(row)
+                existing = current.get(symbol)
+                if existing is not None and existing[1] == key:
+                    continue  # inalterada: a versão vigente continua válida
+                if existing is not None:
+                    to_close.append(existing[0])
+                to_insert.append(tuple(row[f] for f in CONTRACT_FIELDS) + key + (snapshot_id,))
+
+            # Contratos que saíram da chain deixam de ser vigentes
+            to_close.extend(vid for symbol, (vid, _) in current.items() if symbol not in seen)
+
+            cursor.executemany(
+                'UPDATE option_quote_versions SET valid_to = ? WHERE version_id = ?',
+                [(snapshot_id, vid) for vid in to_close]
+            )
+            placeholders = ', '.join(['?'] * (len(CONTRACT_FIELDS) + len(QUOTE_FIELDS) + 1))
+            cursor.executemany(f'''
+                INSERT INTO option_quote_versions ({QUOTE_COLUMNS}, valid_from)
+                VALUES ({placeholders})
+            ''', to_insert)
+
+            cursor.execute(
+                'UPDATE chain_snapshots SET changed_quotes = ? WHERE snapshot_id = ?',
+                (len(to_insert), snapshot_id)
+            )
+            cursor.execute('''
+                INSERT OR REPLACE INTO latest_chain_snapshot (underlying, snapshot_id, taken_at)
+                VALUES (?, ?, ?)
+            ''', (underlying, snapshot_id, taken_at))
+
+            conn.commit()
+            conn.close()
+
+            print(f"🗂️ Snapshot {snapshot_id} {underlying}: {len(to_insert)}/{len(chain)} cotações alteradas")
+
+        except Exception as e:
+            print(f"❌ Erro ao arquivar snapshot {underlying}: {e}")
+            return None
+
+        for callback in self.listeners:
+            try:
+                callback(underlying, snapshot_id, chain)
+            except Exception as e:
+                print(f"❌ Erro em listener de snapshot: {e}")
+
+        return snapshot_id
+
+    def get_latest_snapshot_id(self, underlying):
+        """
+        Último snapshot de um ativo (leitura direta do ponteiro)
+
+        Args:
+            underlying (str): Símbolo ativo
+
+        Returns:
+            int | None: snapshot_id
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT snapshot_id FROM latest_chain_snapshot WHERE underlying = ?',
+            (underlying,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def get_underlyings(self):
+        """
+        Ativos com ao menos um snapshot arquivado
+
+        Returns:
+            list: Símbolos dos ativos
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT underlying FROM latest_chain_snapshot ORDER BY underlying')
+        rows = cursor.fetchall()
+        conn.close()
+        return [row[0] for row in rows]
+
+    def get_snapshot_id_as_of(self, underlying, ts):
+        """
+        Snapshot vigente em uma data
+
+        Args:
+            underlying (str): Símbolo ativo
+            ts (str | datetime): Momento de referência
+
+        Returns:
+            int | None: snapshot_id
+        """
+        if isinstance(ts, datetime):
+            ts = ts.isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT snapshot_id FROM chain_snapshots
+            WHERE underlying = ? AND taken_at <= ?
+            ORDER BY taken_at DESC, snapshot_id DESC
+            LIMIT 1
+        ''', (underlying, ts))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def get_latest_chain(self, underlying):
+        """
+        Chain mais recente de um ativo, sem varrer o histórico
+
+        Args:
+            underlying (str): Símbolo ativo
+
+        Returns:
+            pd.DataFrame: Cotações vigentes; valid_from é o snapshot em que
+                cada versão começou e snapshot_id o último snapshot do ativo
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            query = f'''
+                SELECT {', '.join('v.' + c for c in CONTRACT_FIELDS + QUOTE_FIELDS)},
+                       v.valid_from, l.snapshot_id
+                FROM option_quote_versions v
+                JOIN latest_chain_snapshot l ON l.underlying = v.underlying
+                WHERE v.underlying = ? AND v.valid_to IS NULL
+                ORDER BY v.expiry_date, v.strike, v.option_type
+            '''
+            result = pd.read_sql_query(query, conn, params=(underlying,))
+            conn.close()
+            return result
+        except Exception as e:
+            print(f"❌ Erro ao buscar chain vigente {underlying}: {e}")
+            return pd.DataFrame()
+
+    def get_chain_at_snapshot(self, underlying, snapshot_id):
+        """
+        Reconstrói a chain exatamente como estava em um snapshot
+
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot de referência
+
+        Returns:
+            pd.DataFrame: Cotações válidas no snapshot, com o valid_from de
+                cada versão e o snapshot_id pedido
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            query = f'''
+                SELECT {QUOTE_COLUMNS}, valid_from, ? AS snapshot_id
+                FROM option_quote_versions
+                WHERE underlying = ? AND valid_from <= ?
+                  AND (valid_to IS NULL OR valid_to > ?)
+                ORDER BY expiry_date, strike, option_type
+            '''
+            result = pd.read_sql_query(query, conn, params=(snapshot_id, underlying, snapshot_id, snapshot_id))
+            conn.close()
+            return result
+        except Exception as e:
+            print(f"❌ Erro ao reconstruir snapshot {snapshot_id}: {e}")
+            return pd.DataFrame()
+
+    def get_chain_as_of(self, underlying, ts):
+        """
+        Chain de um ativo como estava em uma data
+
+        Args:
+            underlying (str): Símbolo ativo
+            ts (str | datetime): Momento de referência
+
+        Returns:
+            pd.DataFrame: Cotações do snapshot vigente em `ts`
+        """
+        snapshot_id = self.get_snapshot_id_as_of(underlying, ts)
+        if snapshot_id is None:
+            return pd.DataFrame()
+        return self.get_chain_at_snapshot(underlying, snapshot_id)
+
+    def get_snapshots(self, underlying, limit=50):
+        """
+        Lista snapshots de um ativo
+
+        Args:
+            underlying (str): Símbolo ativo
+            limit (int): Limite de registros
+
+        Returns:
+            pd.DataFrame: snapshot_id, taken_at, total_quotes, changed_quotes
+        """
+        conn = sqlite3.connect(self.db_path)
+        query = '''
+            SELECT snapshot_id, underlying, taken_at, total_quotes, changed_quotes, data_source
+            FROM chain_snapshots
+            WHERE underlying = ?
+            ORDER BY taken_at DESC
+            LIMIT ?
+        '''
+        result = pd.read_sql_query(query, conn, params=(underlying, limit))
+        conn.close()
+        return result
@@ -11,6 +11,21 @@ import numpy as np
 from datetime import datetime, timedelta
 import sqlite3
 from data.database import db
+from config.settings import config
+from core.american_pricing import AMERICAN_MODELS
+from core.pricing_models import get_model, price_chain
+from core.options_archive import OptionsSnapshotArchive
+from core.option_chain_store import OptionChainStore
+from core.option_leaderboards import OptionLeaderboards
+from core.chain_scanner import ChainAnomalyScanner
+from core.greeks_exposure import GreeksExposureEngine
+from core.implied_distribution import ImpliedDistributionCache, build_implied_distribution
+from core.iv_history import IVHistory
+from core.max_pain import OpenInterestProfiler
+from core.realized_volatility import VolatilityConeCache, daily_bars, rolling_realized_volatility
+from core.trading_calendar import calendar_for_symbol, get_calendar
+from core.yield_curve import get_yield_curve
+from core.monte_carlo import MonteCarloEngine
 import json
 import time
 import ssl
@@ -22,27 +37,13 @@ import warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 warnings.filterwarnings('ignore')
 
-# Simulação scipy.stats.norm para evitar dependência
-class MockNorm:
-    @staticmethod
-    def cdf(x):
-        """Aproximação CDF normal padrão"""
-        return 0.5 * (1 + math.erf(x / math.sqrt(2)))
-    
-    @staticmethod
-    def pdf(x):
-        """Aproximação PDF normal padrão"""
-        return math.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
-
-norm = MockNorm()
-
 class OptionsCollector:
     """
     Sistema completo de coleta e análise de opções
     
     Funcionalidades:
     - Geração de dados simulados realistas
-    - Cálculo de Greeks (Black-Scholes)
+    - Cálculo de Greeks (registro de modelos de precificação)
     - Análise de volatilidade implícita
     - Chain de opções completa
     - Estatísticas e rankings
@@ -52,10 +53,57 @@ class OptionsCollector:
     def __init__(self):
         """Inicializa o sistema de opções"""
         self.init_options_tables()
+        self.archive = OptionsSnapshotArchive()
+        self.store = OptionChainStore(self.archive)
+        self.leaderboards = OptionLeaderboards()
+        self.leaderboards.warm_up(self.archive)
+        self.archive.add_listener(self.leaderboards.on_snapshot)
+        self.scanner = ChainAnomalyScanner()
+        self.archive.add_listener(self.scan_snapshot)
+        self.exposure = GreeksExposureEngine(config.OPTION_CONTRACT_MULTIPLIER)
+        self.archive.add_listener(self.update_exposure)
+        self.oi_profiler = OpenInterestProfiler(config.OPTION_CONTRACT_MULTIPLIER)
+        self.archive.add_listener(self.oi_profiler.on_snapshot)
+        self.iv_history = IVHistory()
+        self.archive.add_listener(self.record_iv_history)
+        self.vol_cones = VolatilityConeCache()
+        self.implied_distributions = ImpliedDistributionCache()
         self.session = self.create_session()
-        self.risk_free_rate = 0.1075  # Selic atual ~10.75%
+        self.calendar = get_calendar('B3')
+        self.repricing_engine = None
         print("📊 Sistema de Opções v3.0.0 inicializado!")
-        print(f"💰 Taxa livre de risco: {self.risk_free_rate:.2%}")
+        print(f"💰 Curva DI ({self.yield_curve.source}): "
+              f"{float(self.yield_curve.di_rate(1 / 252)):.2%} a.a. no curto prazo")
+    
+    @property
+    def yield_curve(self):
+        """Snapshot atual da curva DI (reconstruída só quando o arquivo ou o dia mudam)"""
+        return get_yield_curve(config.DI_CURVE_FILE)
+    
+    def get_risk_free_rates(self, expiry_dates, underlying=None):
+        """
+        Taxas zero contínuas da curva DI para cada vencimento
+        
+        Args:
+            expiry_dates (array_like): Vencimentos das opções
+            underlying (str, optional): Ativo (define o calendário, o mesmo
+                usado no tempo até o vencimento)
+            
+        Returns:
+            np.ndarray: Taxa por opção (uma consulta vetorial à tabela da curva)
+        """
+        calendar = self.get_calendar(underlying)
+        return self.yield_curve.expiry_rates(calendar.expiry_ids(np.asarray(expiry_dates)), calendar)
+    
+    def attach_repricing_engine(self, engine):
+        """
+        Conecta um LiveRepricingEngine: cada chain coletada passa a ser
+        registrada no motor para acompanhar os ticks do ativo
+        
+        Args:
+            engine (LiveRepricingEngine): Motor de reprecificação
+        """
+        self.repricing_engine = engine
     
     def create_session(self):
         """Cria sessão HTTP robusta para futuras APIs"""
@@ -74,39 +122,6 @@ class OptionsCollector:
         conn = sqlite3.connect(db.db_path)
         cursor = conn.cursor()
         
-        # Tabela principal de opções
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS options_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                underlying TEXT NOT NULL,
-                option_type TEXT NOT NULL,
-                strike REAL NOT NULL,
-                expiry_date TEXT NOT NULL,
-                price REAL NOT NULL,
-                bid REAL,
-                ask REAL,
-                volume INTEGER DEFAULT 0,
-                open_interest INTEGER DEFAULT 0,
-                implied_volatility REAL,
-                delta REAL,
-                gamma REAL,
-                theta REAL,
-                vega REAL,
-                rho REAL,
-                intrinsic_value REAL,
-                time_value REAL,
-                moneyness REAL,
-                days_to_expiry INTEGER,
-                bid_ask_spread REAL,
-                mid_price REAL,
-                last_update TEXT DEFAULT CURRENT_TIMESTAMP,
-                data_source TEXT DEFAULT 'SIMULATED',
-                quality_score REAL DEFAULT 1.0,
-                UNIQUE(symbol, last_update)
-            )
-        ''')
-        
         # Tabela resumo chains por vencimento
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS options_chain (
@@ -175,144 +190,177 @@ class OptionsCollector:
             print(f"❌ Erro ao obter preço {symbol}: {e}")
             return 30.0
     
-    def calculate_time_to_expiry(self, expiry_date):
+    def get_calendar(self, underlying=None):
         """
-        Calcula tempo até vencimento em anos
+        Calendário de pregões do ativo (NYSE para ADRs, B3 para o resto)
+        
+        Args:
+            underlying (str, optional): Símbolo ativo (padrão: B3)
+            
+        Returns:
+            TradingCalendar: Calendário
+        """
+        return calendar_for_symbol(underlying) if underlying else self.calendar
+    
+    def calculate_time_to_expiry(self, expiry_date, underlying=None):
+        """
+        Calcula tempo até vencimento em anos (dias úteis / 252)
         
         Args:
             expiry_date (str): Data vencimento YYYY-MM-DD
+            underlying (str, optional): Ativo (define o calendário de pregões)
             
         Returns:
-            float: Tempo em anos
+            float: Tempo em anos (0 se vencida)
         """
         try:
-            expiry = datetime.strptime(expiry_date, '%Y-%m-%d')
-            today = datetime.now()
-            days = (expiry - today).days
-            return max(1/365, days / 365.0)  # Mínimo 1 dia
+            calendar = self.get_calendar(underlying)
+            expiry_id = calendar.expiry_ids([expiry_date])
+            return float(calendar.time_to_expiry(expiry_id)[0])
         except:
-            return 30/365  # Default 30 dias
+            return 21/252  # Default ~1 mês útil
     
-    def calculate_days_to_expiry(self, expiry_date):
+    def calculate_days_to_expiry(self, expiry_date, underlying=None):
         """
-        Calcula dias até vencimento
+        Calcula dias corridos até vencimento
         
         Args:
             expiry_date (str): Data vencimento
+            underlying (str, optional): Ativo (define o calendário de pregões)
             
         Returns:
             int: Dias até vencimento
         """
         try:
-            expiry = datetime.strptime(expiry_date, '%Y-%m-%d')
-            today = datetime.now()
-            return max(1, (expiry - today).days)
+            calendar = self.get_calendar(underlying)
+            expiry_id = calendar.expiry_ids([expiry_date])
+            return max(1, int(calendar.calendar_days_to_expiry(expiry_id)[0]))
         except:
             return 30
     
-    def black_scholes_price(self, S, K, T, r, sigma, option_type='call'):
+    def calculate_time_to_expiry_array(self, expiry_dates, now=None, underlying=None):
         """
-        Calcula preço Black-Scholes
+        Tempo até vencimento (anos úteis) para uma chain inteira
         
         Args:
-            S (float): Preço ação atual
-            K (float): Strike
-            T (float): Tempo vencimento (anos)
-            r (float): Taxa livre risco
-            sigma (float): Volatilidade
-            option_type (str): 'call' ou 'put'
+            expiry_dates (array_like): Datas de vencimento
+            now (datetime, optional): Momento de referência
+            underlying (str, optional): Ativo (define o calendário de pregões)
             
         Returns:
-            float: Preço teórico opção
+            np.ndarray: T por opção
         """
-        try:
-            if T <= 0 or sigma <= 0 or S <= 0 or K <= 0:
-                return 0.01
-            
-            d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-            d2 = d1 - sigma * math.sqrt(T)
-            
-            if option_type.lower() == 'call':
-                price = S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2)
-            else:  # put
-                price = K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
-            
-            return max(0.01, price)
-            
-        except Exception as e:
-            print(f"❌ Erro Black-Scholes: {e}")
-            return 0.01
+        calendar = self.get_calendar(underlying)
+        return calendar.time_to_expiry(calendar.expiry_ids(expiry_dates), now)
     
-    def calculate_greeks(self, S, K, T, r, sigma, option_type='call'):
+    def get_pricing_model(self, underlying):
         """
-        Calcula todos os Greeks
+        Obtém o nome do modelo de precificação configurado para o ativo
         
         Args:
-            S (float): Preço ação
-            K (float): Strike
-            T (float): Tempo vencimento
-            r (float): Taxa livre risco
-            sigma (float): Volatilidade
-            option_type (str): 'call' ou 'put'
+            underlying (str): Símbolo ativo
             
         Returns:
-            dict: Greeks calculados
+            str: Nome no registro de modelos (ex: 'bsm', 'black76', 'baw')
         """
-        try:
-            if T <= 0 or sigma <= 0:
-                return {
-                    'delta': 0.0,
-                    'gamma': 0.0,
-                    'theta': 0.0,
-                    'vega': 0.0,
-                    'rho': 0.0
-                }
-            
-            d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-            d2 = d1 - sigma * math.sqrt(T)
-            
-            # Delta
-            if option_type.lower() == 'call':
-                delta = norm.cdf(d1)
-            else:
-                delta = norm.cdf(d1) - 1
-            
-            # Gamma (igual para call e put)
-            gamma = norm.pdf(d1) / (S * sigma * math.sqrt(T))
-            
-            # Theta
-            theta_common = -(S * norm.pdf(d1) * sigma) / (2 * math.sqrt(T))
-            if option_type.lower() == 'call':
-                theta = (theta_common - r * K * math.exp(-r * T) * norm.cdf(d2)) / 365
-            else:
-                theta = (theta_common + r * K * math.exp(-r * T) * norm.cdf(-d2)) / 365
+        return config.PRICING_MODELS.get(underlying, config.DEFAULT_PRICING_MODEL)
+    
+    def get_american_model(self, underlying):
+        """
+        Obtém modelo americano configurado para o ativo
+        
+        Args:
+            underlying (str): Símbolo ativo
             
-            # Vega (igual para call e put)
-            vega = S * norm.pdf(d1) * math.sqrt(T) / 100
+        Returns:
+            str: 'crr', 'leisen_reimer' ou 'baw'
+        """
+        model = self.get_pricing_model(underlying)
+        return model if model in AMERICAN_MODELS else config.DEFAULT_AMERICAN_MODEL
+    
+    def price_chain(self, underlying, options, underlying_price=None, model=None, with_greeks=False):
+        """
+        Precifica uma chain inteira com uma única chamada do modelo do ativo
+        
+        Args:
+            underlying (str): Símbolo ativo
+            options (list | pd.DataFrame): Opções com strike, expiry_date,
+                option_type e implied_volatility
+            underlying_price (float, optional): Preço à vista (ou do futuro
+                no Black-76); padrão: preço atual
+            model (str, optional): Força um modelo do registro
+            with_greeks (bool): Calcula também os Greeks
             
-            # Rho
-            if option_type.lower() == 'call':
-                rho = K * T * math.exp(-r * T) * norm.cdf(d2) / 100
-            else:
-                rho = -K * T * math.exp(-r * T) * norm.cdf(-d2) / 100
+        Returns:
+            dict: Arrays 'price' (e Greeks) na ordem das opções
+        """
+        chain = options if isinstance(options, pd.DataFrame) else pd.DataFrame(options)
+        if chain.empty:
+            return {'price': np.array([])}
+        
+        if underlying_price is None:
+            underlying_price = self.get_current_stock_price(underlying)
+        
+        expiry_dates = chain['expiry_date'].to_numpy()
+        return price_chain(
+            get_model(model or self.get_pricing_model(underlying)),
+            underlying_price,
+            chain['strike'].to_numpy(dtype=float),
+            self.calculate_time_to_expiry_array(expiry_dates, underlying=underlying),
+            self.get_risk_free_rates(expiry_dates, underlying),
+            chain['implied_volatility'].to_numpy(dtype=float),
+            chain['option_type'].to_numpy(),
+            q=config.DIVIDEND_YIELDS.get(underlying, 0.0),
+            with_greeks=with_greeks
+        )
+    
+    def price_chain_american(self, underlying, options, spot=None, model=None):
+        """
+        Precifica uma chain inteira com exercício americano
+        
+        Args:
+            underlying (str): Símbolo ativo
+            options (list | pd.DataFrame): Opções com strike, expiry_date,
+                option_type e implied_volatility
+            spot (float, optional): Preço do ativo (padrão: preço atual)
+            model (str, optional): Força um modelo ('crr', 'leisen_reimer', 'baw')
             
-            return {
-                'delta': round(delta, 4),
-                'gamma': round(gamma, 4),
-                'theta': round(theta, 4),
-                'vega': round(vega, 4),
-                'rho': round(rho, 4)
-            }
+        Returns:
+            np.ndarray: Preços americanos na ordem das opções
+        """
+        return self.price_chain(
+            underlying, options, underlying_price=spot,
+            model=model or self.get_american_model(underlying)
+        )['price']
+    
+    def price_structure_monte_carlo(self, underlying, payoff, T, sigma=None, local_vol=None,
+                                    engine=None, spot=None):
+        """
+        Precifica estrutura path-dependent (barreira, asiática, autocallable)
+        
+        Args:
+            underlying (str): Símbolo ativo (ex: PETR4)
+            payoff (callable): Payoff de core.monte_carlo
+            T (float): Vencimento em anos
+            sigma (float, optional): Volatilidade do GBM
+            local_vol (callable, optional): sigma(S, t) para vol local
+            engine (MonteCarloEngine, optional): Motor configurado
+            spot (float, optional): Preço do ativo (padrão: preço atual)
             
-        except Exception as e:
-            print(f"❌ Erro cálculo Greeks: {e}")
-            return {
-                'delta': 0.0,
-                'gamma': 0.0,
-                'theta': 0.0,
-                'vega': 0.0,
-                'rho': 0.0
-            }
+        Returns:
+            dict: price, std_error, paths, elapsed, paths_per_second, beta
+        """
+        engine = engine or MonteCarloEngine()
+        if spot is None:
+            spot = self.get_current_stock_price(underlying)
+        
+        result = engine.price(
+            payoff, spot, T, float(self.yield_curve.zero_rate(T)),
+            sigma=sigma, q=config.DIVIDEND_YIELDS.get(underlying, 0.0), local_vol=local_vol
+        )
+        print(f"🎲 {underlying}: {result['price']:.4f} ± {result['std_error']:.4f} "
+              f"({result['paths_per_second']:,.0f} trajetórias/s)")
+        return result
     
     def calculate_intrinsic_value(self, S, K, option_type):
         """
@@ -331,36 +379,31 @@ class OptionsCollector:
         else:  # PUT
             return max(0, K - S)
     
-    def generate_realistic_iv(self, S, K, T, option_type):
+    def generate_realistic_iv(self, S, K, T):
         """
         Gera volatilidade implícita realista
         
+        O smile depende só do moneyness e do prazo, então call e put do
+        mesmo strike têm a mesma IV (como exige a paridade put-call).
+        
         Args:
             S (float): Preço ação
             K (float): Strike
             T (float): Tempo vencimento
-            option_type (str): Tipo opção
             
         Returns:
             float: Volatilidade implícita
         """
         try:
-            # Base IV entre 20-60%
-            base_iv = 0.25 + (abs(hash(f"{S}{K}")) % 35) / 100
+            # Base IV entre 25-60% por nível do ativo
+            base_iv = 0.25 + (abs(hash(f"{S}")) % 35) / 100
             
-            # Moneyness effect (smile)
-            moneyness = S / K
-            if option_type.upper() == 'PUT':
-                # Puts OTM têm IV maior (skew)
-                if moneyness > 1.0:  # OTM put
-                    base_iv *= (1.1 + 0.2 * (moneyness - 1))
-            else:  # CALL
-                # Calls OTM têm IV ligeiramente maior
-                if moneyness < 1.0:  # OTM call
-                    base_iv *= (1.05 + 0.1 * (1 - moneyness))
+            # Smile com skew: strikes baixos (puts OTM) com IV maior
+            log_moneyness = math.log(K / S)
+            base_iv *= 1.0 - 0.4 * log_moneyness + 1.5 * log_moneyness ** 2
             
             # Time effect (IV maior para vencimentos próximos)
-            if T < 0.1:  # Menos de 36 dias
+            if T < 0.1:  # Menos de ~25 pregões
                 base_iv *= 1.2
             elif T > 0.5:  # Mais de 6 meses
                 base_iv *= 0.9
@@ -414,6 +457,10 @@ class OptionsCollector:
         """
         Gera dados simulados realistas de opções
         
+        Preços e Greeks saem de uma única chamada de `price_chain`, com o
+        modelo, a curva DI e o dividend yield do ativo usados pelos
+        consumidores da chain (scanner, exposição, histórico de IV).
+        
         Args:
             underlying (str): Símbolo ação (ex: PETR4)
             
@@ -437,12 +484,11 @@ class OptionsCollector:
             options_data = []
             
             for expiry_date in expiry_dates:
-                T = self.calculate_time_to_expiry(expiry_date)
-                days_to_expiry = self.calculate_days_to_expiry(expiry_date)
+                T = self.calculate_time_to_expiry(expiry_date, underlying)
+                days_to_expiry = self.calculate_days_to_expiry(expiry_date, underlying)
                 
                 # Gera strikes ao redor do preço atual (±20%)
                 strike_range = current_price * 0.20
-                num_strikes = 15  # Mais strikes para melhor cobertura
                 
                 strikes = []
                 for i in range(-7, 8):  # 15 strikes
@@ -453,125 +499,48 @@ class OptionsCollector:
                         strikes.append(strike)
                 
                 for strike in strikes:
-                    # Gera CALL
-                    call_iv = self.generate_realistic_iv(current_price, strike, T, 'CALL')
-                    call_price = self.black_scholes_price(
-                        current_price, strike, T, self.risk_free_rate, call_iv, 'call'
-                    )
-                    
-                    # Adiciona ruído realista ao preço
-                    noise = 1 + (abs(hash(f"{underlying}{strike}{expiry_date}call")) % 20 - 10) / 100
-                    call_price *= noise
-                    call_price = max(0.01, call_price)
-                    
-                    # Bid/Ask spread realista
-                    spread_pct = 0.05 + (abs(hash(f"{strike}")) % 10) / 200  # 5-10%
-                    call_bid = call_price * (1 - spread_pct/2)
-                    call_ask = call_price * (1 + spread_pct/2)
-                    
-                    # Volume e OI
-                    call_volume = self.generate_realistic_volume(
-                        current_price, strike, T, 'CALL', call_iv
-                    )
-                    call_oi = call_volume * (2 + abs(hash(f"{strike}call")) % 5)
-                    
-                    # Greeks
-                    call_greeks = self.calculate_greeks(
-                        current_price, strike, T, self.risk_free_rate, call_iv, 'call'
-                    )
-                    
-                    # Valores derivados
-                    intrinsic = self.calculate_intrinsic_value(current_price, strike, 'CALL')
-                    time_value = call_price - intrinsic
-                    moneyness = current_price / strike
-                    bid_ask_spread = (call_ask - call_bid) / call_price if call_price > 0 else 0
-                    mid_price = (call_bid + call_ask) / 2
-                    
-                    call_data = {
-                        'symbol': f"{underlying}C{int(strike*100)}{expiry_date.replace('-', '')}",
-                        'underlying': underlying,
-                        'option_type': 'CALL',
-                        'strike': round(strike, 2),
-                        'expiry_date': expiry_date,
-                        'price': round(call_price, 2),
-                        'bid': round(call_bid, 2),
-                        'ask': round(call_ask, 2),
-                        'volume': call_volume,
-                        'open_interest': call_oi,
-                        'implied_volatility': round(call_iv, 4),
-                        'delta': call_greeks['delta'],
-                        'gamma': call_greeks['gamma'],
-                        'theta': call_greeks['theta'],
-                        'vega': call_greeks['vega'],
-                        'rho': call_greeks['rho'],
-                        'intrinsic_value': round(intrinsic, 2),
-                        'time_value': round(time_value, 2),
-                        'moneyness': round(moneyness, 4),
-                        'days_to_expiry': days_to_expiry,
-                        'bid_ask_spread': round(bid_ask_spread, 4),
-                        'mid_price': round(mid_price, 2)
-                    }
-                    options_data.append(call_data)
-                    
-                    # Gera PUT
-                    put_iv = self.generate_realistic_iv(current_price, strike, T, 'PUT')
-                    put_price = self.black_scholes_price(
-                        current_price, strike, T, self.risk_free_rate, put_iv, 'put'
-                    )
-                    
-                    # Adiciona ruído realista
-                    noise = 1 + (abs(hash(f"{underlying}{strike}{expiry_date}put")) % 20 - 10) / 100
-                    put_price *= noise
-                    put_price = max(0.01, put_price)
-                    
-                    # Bid/Ask spread
-                    spread_pct = 0.05 + (abs(hash(f"{strike}put")) % 10) / 200
-                    put_bid = put_price * (1 - spread_pct/2)
-                    put_ask = put_price * (1 + spread_pct/2)
-                    
-                    # Volume e OI
-                    put_volume = self.generate_realistic_volume(
-                        current_price, strike, T, 'PUT', put_iv
-                    )
-                    put_oi = put_volume * (2 + abs(hash(f"{strike}put")) % 5)
-                    
-                    # Greeks
-                    put_greeks = self.calculate_greeks(
-                        current_price, strike, T, self.risk_free_rate, put_iv, 'put'
-                    )
-                    
-                    # Valores derivados
-                    intrinsic = self.calculate_intrinsic_value(current_price, strike, 'PUT')
-                    time_value = put_price - intrinsic
-                    moneyness = current_price / strike
-                    bid_ask_spread = (put_ask - put_bid) / put_price if put_price > 0 else 0
-                    mid_price = (put_bid + put_ask) / 2
-                    
-                    put_data = {
-                        'symbol': f"{underlying}P{int(strike*100)}{expiry_date.replace('-', '')}",
-                        'underlying': underlying,
-                        'option_type': 'PUT',
-                        'strike': round(strike, 2),
-                        'expiry_date': expiry_date,
-                        'price': round(put_price, 2),
-                        'bid': round(put_bid, 2),
-                        'ask': round(put_ask, 2),
-                        'volume': put_volume,
-                        'open_interest': put_oi,
-                        'implied_volatility': round(put_iv, 4),
-                        'delta': put_greeks['delta'],
-                        'gamma': put_greeks['gamma'],
-                        'theta': put_greeks['theta'],
-                        'vega': put_greeks['vega'],
-                        'rho': put_greeks['rho'],
-                        'intrinsic_value': round(intrinsic, 2),
-                        'time_value': round(time_value, 2),
-                        'moneyness': round(moneyness, 4),
-                        'days_to_expiry': days_to_expiry,
-                        'bid_ask_spread': round(bid_ask_spread, 4),
-                        'mid_price': round(mid_price, 2)
-                    }
-                    options_data.append(put_data)
+                    iv = self.generate_realistic_iv(current_price, strike, T)
+                    for option_type in ('CALL', 'PUT'):
+                        volume = self.generate_realistic_volume(current_price, strike, T, option_type, iv)
+                        options_data.append({
+                            'symbol': f"{underlying}{option_type[0]}{int(strike*100)}{expiry_date.replace('-', '')}",
+                            'underlying': underlying,
+                            'option_type': option_type,
+                            'strike': round(strike, 2),
+                            'expiry_date': expiry_date,
+                            'volume': volume,
+                            'open_interest': volume * (2 + abs(hash(f"{strike}{option_type.lower()}")) % 5),
+                            'implied_volatility': round(iv, 4),
+                            'days_to_expiry': days_to_expiry
+                        })
+            
+            # Toda a chain precificada de uma vez pelo modelo do ativo
+            priced = self.price_chain(underlying, options_data, underlying_price=current_price, with_greeks=True)
+            
+            for i, option in enumerate(options_data):
+                price = max(0.01, float(priced['price'][i]))
+                
+                # Bid/Ask spread realista (5-10%) em torno do teórico, com ao menos um tick
+                spread_pct = 0.05 + (abs(hash(f"{option['strike']}{option['option_type']}")) % 10) / 200
+                bid = round(price * (1 - spread_pct/2), 2)
+                ask = max(round(price * (1 + spread_pct/2), 2), bid + 0.01)
+                
+                intrinsic = self.calculate_intrinsic_value(current_price, option['strike'], option['option_type'])
+                option.update({
+                    'price': round(price, 2),
+                    'bid': bid,
+                    'ask': round(ask, 2),
+                    'delta': round(float(priced['delta'][i]), 4),
+                    'gamma': round(float(priced['gamma'][i]), 4),
+                    'theta': round(float(priced['theta'][i]), 4),
+                    'vega': round(float(priced['vega'][i]), 4),
+                    'rho': round(float(priced['rho'][i]), 4),
+                    'intrinsic_value': round(intrinsic, 2),
+                    'time_value': round(price - intrinsic, 2),
+                    'moneyness': round(current_price / option['strike'], 4),
+                    'bid_ask_spread': round((ask - bid) / price, 4),
+                    'mid_price': round((bid + ask) / 2, 2)
+                })
             
             print(f"🎭 {len(options_data)} opções realistas geradas para {underlying}")
             return options_data
@@ -620,6 +589,9 @@ class OptionsCollector:
         """
         Salva dados de opções no banco
         
+        As cotações vão só para o arquivo versionado (`self.archive`), que
+        cresce com as mudanças de cotação e não com tamanho da chain x coletas.
+        
         Args:
             options_data (dict): Dados opções para salvar
             
@@ -627,43 +599,19 @@ class OptionsCollector:
             int: Número de opções salvas
         """
         try:
-            conn = sqlite3.connect(db.db_path)
-            cursor = conn.cursor()
-            
-            saved_count = 0
             all_options = options_data['calls'] + options_data['puts']
             
-            for option in all_options:
-                try:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO options_data 
-                        (symbol, underlying, option_type, strike, expiry_date, price, bid, ask, 
-                         volume, open_interest, implied_volatility, delta, gamma, theta, vega, rho,
-                         intrinsic_value, time_value, moneyness, days_to_expiry, bid_ask_spread, mid_price,
-                         data_source, quality_score)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        option['symbol'], option['underlying'], option['option_type'], 
-                        option['strike'], option['expiry_date'], option['price'], 
-                        option['bid'], option['ask'], option['volume'], option['open_interest'],
-                        option['implied_volatility'], option['delta'], option['gamma'], 
-                        option['theta'], option['vega'], option['rho'],
-                        option['intrinsic_value'], option['time_value'], option['moneyness'],
-                        option['days_to_expiry'], option['bid_ask_spread'], option['mid_price'],
-                        'SIMULATED_V3', 1.0
-                    ))
-                    saved_count += 1
-                except Exception as e:
-                    print(f"❌ Erro ao salvar {option['symbol']}: {e}")
-            
             # Salva resumo das chains
             self.save_chain_summaries_advanced(options_data)
             
-            conn.commit()
-            conn.close()
+            # Arquiva o snapshot (só cotações alteradas geram novas versões)
+            snapshot_id = self.archive.record_snapshot(options_data['underlying'], all_options,
+                                                       data_source='SIMULATED_V3')
+            if snapshot_id is None:
+                return 0
             
-            print(f"💾 {saved_count} opções salvas para {options_data['underlying']}")
-            return saved_count
+            print(f"💾 {len(all_options)} opções salvas para {options_data['underlying']}")
+            return len(all_options)
             
         except Exception as e:
             print(f"❌ Erro ao salvar dados: {e}")
@@ -779,35 +727,40 @@ class OptionsCollector:
                 saved = self.save_options_data(options_data)
                 total_collected += saved
                 print(f"✅ {symbol}: {saved} opções salvas")
+                
+                if self.repricing_engine is not None:
+                    chain = options_data['calls'] + options_data['puts']
+                    self.repricing_engine.register_chain(
+                        symbol,
+                        chain,
+                        self.get_current_stock_price(symbol),
+                        self.get_risk_free_rates([opt['expiry_date'] for opt in chain], symbol),
+                        config.DIVIDEND_YIELDS.get(symbol, 0.0)
+                    )
             else:
                 print(f"❌ Falha na coleta de {symbol}")
         
         print(f"\n🎉 Coleta concluída! {total_collected} opções coletadas.")
         return total_collected
     
-    def get_options_by_underlying(self, underlying, limit=100):
+    def get_options_by_underlying(self, underlying, limit=None):
         """
-        Obtém opções de um ativo específico
+        Obtém a chain mais recente de um ativo específico
         
         Args:
             underlying (str): Símbolo ativo
-            limit (int): Limite registros
+            limit (int, optional): Limite registros (None = chain completa)
             
         Returns:
-            pd.DataFrame: Opções encontradas
+            pd.DataFrame: Opções do último snapshot
         """
         try:
-            conn = sqlite3.connect(db.db_path)
+            result = self.archive.get_latest_chain(underlying)
+            result = result.sort_values(['expiry_date', 'option_type', 'strike'], ignore_index=True)
             
-            query = '''
-                SELECT * FROM options_data 
-                WHERE underlying = ? 
-                ORDER BY expiry_date, option_type, strike 
-                LIMIT ?
-            '''
-            
-            result = pd.read_sql_query(query, conn, params=(underlying, limit))
-            conn.close()
+            if limit is not None and len(result) > limit:
+                print(f"⚠️ Chain {underlying} truncada: {limit} de {len(result)} opções")
+                result = result.head(limit)
             
             return result
             
@@ -815,6 +768,28 @@ class OptionsCollector:
             print(f"❌ Erro ao buscar opções {underlying}: {e}")
             return pd.DataFrame()
     
+    def query_options(self, underlying, expiries=None, strike_range=None, delta_range=None, types=None):
+        """
+        Consulta filtrada da chain vigente (cache LRU em memória)
+        
+        Args:
+            underlying (str): Símbolo ativo
+            expiries (list, optional): Vencimentos 'YYYY-MM-DD'
+            strike_range (tuple, optional): (strike_min, strike_max)
+            delta_range (tuple, optional): (delta_min, delta_max)
+            types (list, optional): ['CALL'], ['PUT'] ou ambos
+            
+        Returns:
+            pd.DataFrame: Opções filtradas (somente leitura)
+        """
+        return self.store.query(
+            underlying,
+            expiries=expiries,
+            strike_range=strike_range,
+            delta_range=delta_range,
+            types=types
+        )
+    
     def get_chain_summary(self, underlying=None):
         """
         Obtém resumo das chains
@@ -851,7 +826,7 @@ class OptionsCollector:
     
     def get_top_volume_options(self, limit=10):
         """
-        Obtém opções com maior volume
+        Obtém opções com maior volume (chains vigentes de todos os ativos)
         
         Args:
             limit (int): Limite de registros
@@ -859,25 +834,24 @@ class OptionsCollector:
         Returns:
             pd.DataFrame: Top volume opções
         """
-        try:
-            conn = sqlite3.connect(db.db_path)
-            
-            query = '''
-                SELECT symbol, underlying, option_type, strike, expiry_date, 
-                       price, volume, open_interest, implied_volatility
-                FROM options_data 
-                WHERE volume > 0
-                ORDER BY volume DESC 
-                LIMIT ?
-            '''
-            
-            result = pd.read_sql_query(query, conn, params=(limit,))
-            conn.close()
-            
-            return result
+        return self.get_leaderboard('volume', limit=limit)
+    
+    def get_leaderboard(self, metric, underlying=None, limit=10):
+        """
+        Obtém ranking mantido incrementalmente a cada snapshot
+        
+        Args:
+            metric (str): 'volume', 'open_interest', 'iv_change' ou 'volume_oi_ratio'
+            underlying (str, optional): Filtrar por ativo (None = mercado)
+            limit (int): Limite de registros
             
+        Returns:
+            pd.DataFrame: Opções ranqueadas (coluna 'value' com a métrica)
+        """
+        try:
+            return self.leaderboards.get_top(metric, underlying=underlying, n=limit)
         except Exception as e:
-            print(f"❌ Erro ao buscar top volume: {e}")
+            print(f"❌ Erro ao buscar ranking {metric}: {e}")
             return pd.DataFrame()
     
     def get_options_analysis(self, underlying):
@@ -891,7 +865,7 @@ class OptionsCollector:
             dict: Análise completa
         """
         try:
-            options_df = self.get_options_by_underlying(underlying, limit=1000)
+            options_df = self.get_options_by_underlying(underlying)
             
             if options_df.empty:
                 return {}
@@ -910,6 +884,12 @@ class OptionsCollector:
             max_volume_idx = options_df['volume'].idxmax()
             max_volume_option = options_df.loc[max_volume_idx]
             
+            if underlying not in self.exposure.summaries:
+                self.refresh_exposure([underlying])
+            exposure = self.exposure.get_summary(underlying)
+            iv_stats = self.iv_history.get_stats(underlying).get('atm_iv', {})
+            realized_vol = self.get_realized_volatility(underlying)
+            
             return {
                 'total_options': total_options,
                 'total_calls': total_calls,
@@ -922,12 +902,322 @@ class OptionsCollector:
                     'type': max_volume_option['option_type'],
                     'strike': max_volume_option['strike'],
                     'volume': max_volume_option['volume']
-                }
+                },
+                'gamma_exposure': exposure.get('total_gex'),
+                'delta_exposure': exposure.get('total_dex'),
+                'vanna_exposure': exposure.get('total_vex'),
+                'zero_gamma': exposure.get('zero_gamma'),
+                'call_wall': exposure.get('call_wall'),
+                'put_wall': exposure.get('put_wall'),
+                'atm_iv': iv_stats.get('value'),
+                'iv_rank': iv_stats.get('rank'),
+                'iv_percentile': iv_stats.get('percentile'),
+                'realized_vol': realized_vol,
+                'iv_rv_spread': (iv_stats['value'] - realized_vol
+                                 if iv_stats.get('value') is not None and realized_vol is not None else None)
             }
             
         except Exception as e:
             print(f"❌ Erro na análise {underlying}: {e}")
             return {}
+    
+    def scan_snapshot(self, underlying, snapshot_id, chain):
+        """
+        Listener do arquivo: roda o scanner de anomalias em cada snapshot
+        
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot persistido
+            chain (pd.DataFrame): Chain completa
+        """
+        findings = self.scanner.scan(
+            underlying,
+            chain,
+            self.get_current_stock_price(underlying),
+            self.get_risk_free_rates(chain['expiry_date'].to_numpy(), underlying),
+            config.DIVIDEND_YIELDS.get(underlying, 0.0)
+        )
+        if not findings.empty:
+            print(f"🔎 {underlying}: {len(findings)} anomalias detectadas na chain")
+    
+    def update_exposure(self, underlying, snapshot_id, chain):
+        """
+        Listener do arquivo: recalcula a exposição de Greeks do ativo
+        
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot persistido
+            chain (pd.DataFrame): Chain completa
+        """
+        self.exposure.update(
+            underlying,
+            chain,
+            self.get_current_stock_price(underlying),
+            self.get_risk_free_rates(chain['expiry_date'].to_numpy(), underlying),
+            config.DIVIDEND_YIELDS.get(underlying, 0.0),
+            snapshot_id=snapshot_id
+        )
+    
+    def refresh_exposure(self, underlyings=None):
+        """
+        Recalcula a exposição do universo a partir das últimas chains do arquivo
+        
+        Args:
+            underlyings (list, optional): Ativos (padrão: todos do arquivo)
+            
+        Returns:
+            pd.DataFrame: Resumo do universo
+        """
+        for underlying in underlyings or self.archive.get_underlyings():
+            chain = self.archive.get_latest_chain(underlying)
+            if not chain.empty:
+                self.update_exposure(underlying, self.archive.get_latest_snapshot_id(underlying), chain)
+        return self.exposure.get_summary()
+    
+    def get_greeks_exposure(self, underlying, by='strike'):
+        """
+        Exposição de gamma/delta/vanna do ativo agregada por strike ou vencimento
+        
+        Args:
+            underlying (str): Símbolo ativo
+            by (str): 'strike' ou 'expiry'
+            
+        Returns:
+            pd.DataFrame: Perfil de exposição
+        """
+        if underlying not in self.exposure.summaries:
+            self.refresh_exposure([underlying])
+        return self.exposure.get_profile(underlying, by)
+    
+    def record_iv_history(self, underlying, snapshot_id, chain):
+        """
+        Listener do arquivo: grava IV ATM e estrutura a termo do snapshot
+        
+        Args:
+            underlying (str): Símbolo ativo
+            snapshot_id (int): Snapshot persistido
+            chain (pd.DataFrame): Chain completa
+        """
+        self.iv_history.record(
+            underlying,
+            snapshot_id,
+            chain,
+            self.get_current_stock_price(underlying),
+            self.get_risk_free_rates(chain['expiry_date'].to_numpy(), underlying),
+            config.DIVIDEND_YIELDS.get(underlying, 0.0)
+        )
+    
+    def get_iv_stats(self, underlying):
+        """
+        IV ATM e de maturidade constante com IV rank e IV percentil (janela de 1 ano)
+        
+        Args:
+            underlying (str): Símbolo ativo
+            
+        Returns:
+            dict: série ('atm_iv', 'iv_30d', ...) -> value, rank, percentile,
+                low, high, observations
+        """
+        return self.iv_history.get_stats(underlying)
+    
+    def get_daily_bars(self, underlying, days=400):
+        """
+        Barras OHLC diárias do ativo a partir das cotações gravadas
+        
+        Args:
+            underlying (str): Símbolo ativo (ex: PETR4)
+            days (int): Histórico em dias corridos
+            
+        Returns:
+            pd.DataFrame: open, high, low, close por dia
+        """
+        return daily_bars(db.get_price_history(f'{underlying}.SA', days=days))
+    
+    def get_realized_volatility(self, underlying, window=21, estimator='yang_zhang'):
+        """
+        Volatilidade realizada anualizada da última janela
+        
+        Args:
+            underlying (str): Símbolo ativo
+            window (int): Pregões na janela
+            estimator (str): 'close_to_close', 'parkinson', 'garman_klass',
+                'rogers_satchell' ou 'yang_zhang'
+            
+        Returns:
+            float | None: Volatilidade (None sem histórico suficiente)
+        """
+        bars = self.get_daily_bars(underlying, days=window * 2 + 30)
+        if len(bars) <= window:
+            return None
+        rv = rolling_realized_volatility(
+            bars['open'].to_numpy(), bars['high'].to_numpy(), bars['low'].to_numpy(),
+            bars['close'].to_numpy(), window, (estimator,)
+        )[estimator][-1]
+        return float(rv) if np.isfinite(rv) else None
+    
+    def get_volatility_cone(self, underlying, estimator='close_to_close'):
+        """
+        Cone de volatilidade realizada (percentis por horizonte), cacheado por barra
+        
+        Args:
+            underlying (str): Símbolo ativo
+            estimator (str): Estimador de volatilidade
+            
+        Returns:
+            pd.DataFrame: Percentis e valor atual por horizonte
+        """
+        return self.vol_cones.get(underlying, self.get_daily_bars(underlying), estimator)
+    
+    def get_implied_distribution(self, underlying):
+        """
+        Distribuição neutra ao risco implícita do último snapshot (cacheada)
+        
+        Args:
+            underlying (str): Símbolo ativo
+            
+        Returns:
+            ImpliedDistribution | None: Densidades por vencimento
+        """
+        def build():
+            chain = self.archive.get_latest_chain(underlying)
+            if chain.empty:
+                return None
+            return build_implied_distribution(
+                chain,
+                self.get_current_stock_price(underlying),
+                self.get_risk_free_rates(chain['expiry_date'].to_numpy(), underlying),
+                config.DIVIDEND_YIELDS.get(underlying, 0.0),
+                self.get_calendar(underlying)
+            )
+        
+        return self.implied_distributions.get(underlying, self.archive.get_latest_snapshot_id(underlying), build)
+    
+    def get_implied_probabilities(self, underlying, thresholds):
+        """
+        Probabilidades implícitas de terminar acima/abaixo e de tocar cada nível
+        
+        Args:
+            underlying (str): Símbolo ativo
+            thresholds (list): Níveis de preço
+            
+        Returns:
+            pd.DataFrame: expiry_date, threshold, finish_above, finish_below, touch
+        """
+        distribution = self.get_implied_distribution(underlying)
+        if distribution is None:
+            return pd.DataFrame(columns=['expiry_date', 'threshold', 'finish_above', 'finish_below', 'touch'])
+        
+        levels = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        spot = self.get_current_stock_price(underlying)
+        n_exp = len(distribution.expiries)
+        return pd.DataFrame({
+            'expiry_date': np.repeat(distribution.expiries, len(levels)),
+            'threshold': np.tile(levels, n_exp),
+            'finish_above': distribution.probability_above(levels).ravel(),
+            'finish_below': distribution.probability_below(levels).ravel(),
+            'touch': distribution.probability_touch(levels, spot).ravel()
+        })
+    
+    def get_probability_cone(self, underlying):
+        """
+        Cone de probabilidade implícito (quantis 5/16/50/84/95% de S_T por vencimento)
+        
+        Args:
+            underlying (str): Símbolo ativo
+            
+        Returns:
+            pd.DataFrame: Quantis por vencimento
+        """
+        distribution = self.get_implied_distribution(underlying)
+        if distribution is None:
+            return pd.DataFrame()
+        return distribution.quantiles()
+    
+    def get_open_interest_analysis(self, underlying):
+        """
+        Max pain, curva de pagamento e perfil de OI do último snapshot (cacheado)
+        
+        Args:
+            underlying (str): Símbolo ativo
+            
+        Returns:
+            dict: 'max_pain', 'payout_curve' e 'profile'
+        """
+        return self.oi_profiler.compute(
+            underlying,
+            self.archive.get_latest_snapshot_id(underlying),
+            lambda: self.archive.get_latest_chain(underlying)
+        )
+    
+    def get_max_pain(self, underlying, expiry_date=None):
+        """
+        Max pain por vencimento
+        
+        Args:
+            underlying (str): Símbolo ativo
+            expiry_date (str, optional): Vencimento específico
+            
+        Returns:
+            pd.DataFrame: expiry_date, max_pain, total_payout, OI de calls/puts
+        """
+        result = self.get_open_interest_analysis(underlying)['max_pain']
+        if expiry_date is not None:
+            result = result[result['expiry_date'] == expiry_date]
+        return result
+    
+    def get_oi_profile(self, underlying, expiry_date=None):
+        """
+        Open interest e volume por strike (calls e puts lado a lado)
+        
+        Args:
+            underlying (str): Símbolo ativo
+            expiry_date (str, optional): Vencimento específico
+            
+        Returns:
+            pd.DataFrame: Perfil por vencimento e strike
+        """
+        result = self.get_open_interest_analysis(underlying)['profile']
+        if expiry_date is not None:
+            result = result[result['expiry_date'] == expiry_date]
+        return result
+    
+    def get_anomalies(self, underlying=None, limit=20):
+        """
+        Anomalias e violações de arbitragem do último snapshot
+        
+        Args:
+            underlying (str, optional): Filtrar por ativo (None = todos)
+            limit (int): Limite de registros
+            
+        Returns:
+            pd.DataFrame: Achados ranqueados por score
+        """
+        return self.scanner.get_findings(underlying, limit)
+    
+    def get_chain_as_of(self, underlying, ts):
+        """
+        Chain de um ativo como estava em uma data
+        
+        Args:
+            underlying (str): Símbolo ativo
+            ts (str | datetime): Momento de referência
+            
+        Returns:
+            pd.DataFrame: Opções do snapshot vigente em `ts`
+        """
+        return self.archive.get_chain_as_of(underlying, ts)
+    
+    def get_latest_chain(self, underlying):
+        """
+        Chain mais recente de um ativo
+        
+        Args:
+            underlying (str): Símbolo ativo
+            
+        Returns:
+            pd.DataFrame: Opções do último snapshot
+        """
+        return self.archive.get_latest_chain(underlying)
 
 # Instância global
 options_collector = OptionsCollector()
\ No newline at end of file
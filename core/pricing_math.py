@@ -0,0 +1,166 @@
+"""
+ProTrading Engine - Funções Vetorizadas de Precificação
+Distribuição normal e Black-Scholes-Merton sobre arrays NumPy
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR
+
+SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+# Limites usados para evitar divisões por zero em opções vencidas/sem vol
+MIN_TIME = 1e-8
+MIN_VOL = 1e-8
+
+
+def norm_cdf(x):
+    """
+    CDF normal padrão vetorizada (sem scipy)
+
+    Usa a aproximação de Chebyshev para erfc (erro relativo < 1.2e-7),
+    suficiente para precificação e Greeks.
+
+    Args:
+        x (array_like): Valores
+
+    Returns:
+        np.ndarray: N(x)
+    """
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    erfc = t * np.exp(
+        -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 +
+        t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 +
+        t * (-0.82215223 + t * 0.17087277))))))))
+    )
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def norm_pdf(x):
+    """
+    PDF normal padrão vetorizada
+
+    Args:
+        x (array_like): Valores
+
+    Returns:
+        np.ndarray: n(x)
+    """
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def is_call_array(option_type):
+    """
+    Converte tipos de opção ('call'/'CALL'/'put'/'PUT') para máscara booleana
+
+    Args:
+        option_type (str | array_like): Tipo(s) da opção
+
+    Returns:
+        np.ndarray: True para calls
+    """
+    types = np.asarray(option_type)
+    if types.dtype == bool:
+        return types
+    return np.char.upper(types.astype(str)) == 'CALL'
+
+
+def _d1_d2(S, K, T, r, q, sigma):
+    """Calcula d1/d2 do modelo Black-Scholes-Merton"""
+    T = np.maximum(T, MIN_TIME)
+    sigma = np.maximum(sigma, MIN_VOL)
+    sqrt_t = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+    return d1, d1 - sigma * sqrt_t, sqrt_t
+
+
+def bsm_price(S, K, T, r, sigma, option_type='call', q=0.0):
+    """
+    Preço Black-Scholes-Merton (europeu) com dividend yield contínuo
+
+    Todos os argumentos aceitam escalares ou arrays (broadcast NumPy).
+
+    Args:
+        S (array_like): Preço do ativo
+        K (array_like): Strike
+        T (array_like): Tempo até vencimento (anos)
+        r (array_like): Taxa livre de risco (contínua)
+        sigma (array_like): Volatilidade
+        option_type (str | array_like): 'call'/'put' ou máscara booleana de calls
+        q (array_like): Dividend yield contínuo
+
+    Returns:
+        np.ndarray: Preços teóricos
+    """
+    S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (S, K, T, r, sigma, q)))
+    calls = np.broadcast_to(is_call_array(option_type), S.shape)
+
+    d1, d2, _ = _d1_d2(S, K, T, r, q, sigma)
+    disc_q = np.exp(-q * T)
+    disc_r = np.exp(-r * T)
+
+    call = S * disc_q * norm_cdf(d1) - K * disc_r * norm_cdf(d2)
+    put = K * disc_r * norm_cdf(-d2) - S * disc_q * norm_cdf(-d1)
+    price = np.where(calls, call, put)
+
+    # Opções vencidas valem o intrínseco
+    intrinsic = np.where(calls, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    return np.where(T > 0, price, intrinsic)
+
+
+def bsm_greeks(S, K, T, r, sigma, option_type='call', q=0.0):
+    """
+    Greeks Black-Scholes-Merton vetorizados
+
+    T em anos úteis (dias úteis / 252, ver trading_calendar): theta por dia
+    útil, vega e rho por 1 ponto percentual. Inclui vanna (dDelta/dSigma)
+    e volga (dVega/dSigma) por unidade de volatilidade.
+
+    Args:
+        S, K, T, r, sigma, q (array_like): Parâmetros do modelo
+        option_type (str | array_like): 'call'/'put' ou máscara booleana de calls
+
+    Returns:
+        dict: Arrays 'delta', 'gamma', 'theta', 'vega', 'rho', 'vanna', 'volga'
+    """
+    S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (S, K, T, r, sigma, q)))
+    calls = np.broadcast_to(is_call_array(option_type), S.shape)
+
+    d1, d2, sqrt_t = _d1_d2(S, K, T, r, q, sigma)
+    sigma_eff = np.maximum(sigma, MIN_VOL)
+    T_eff = np.maximum(T, MIN_TIME)
+    disc_q = np.exp(-q * T_eff)
+    disc_r = np.exp(-r * T_eff)
+    pdf_d1 = norm_pdf(d1)
+    cdf_d1 = norm_cdf(d1)
+    cdf_d2 = norm_cdf(d2)
+
+    delta = np.where(calls, disc_q * cdf_d1, disc_q * (cdf_d1 - 1.0))
+    gamma = disc_q * pdf_d1 / (S * sigma_eff * sqrt_t)
+
+    theta_common = -(S * disc_q * pdf_d1 * sigma_eff) / (2.0 * sqrt_t)
+    theta_call = theta_common - r * K * disc_r * cdf_d2 + q * S * disc_q * cdf_d1
+    theta_put = theta_common + r * K * disc_r * (1.0 - cdf_d2) - q * S * disc_q * (1.0 - cdf_d1)
+    theta = np.where(calls, theta_call, theta_put) / BUSINESS_DAYS_PER_YEAR
+
+    vega_unit = S * disc_q * pdf_d1 * sqrt_t
+    rho = np.where(calls, K * T_eff * disc_r * cdf_d2, -K * T_eff * disc_r * (1.0 - cdf_d2)) / 100.0
+
+    vanna = -disc_q * pdf_d1 * d2 / sigma_eff
+    volga = vega_unit * d1 * d2 / sigma_eff
+
+    expired = T <= 0
+    zero = np.zeros_like(S)
+    return {
+        'delta': np.where(expired, zero, delta),
+        'gamma': np.where(expired, zero, gamma),
+        'theta': np.where(expired, zero, theta),
+        'vega': np.where(expired, zero, vega_unit / 100.0),
+        'rho': np.where(expired, zero, rho),
+        'vanna': np.where(expired, zero, vanna),
+        'volga': np.where(expired, zero, volga),
+    }
@@ -0,0 +1,184 @@
+"""
+ProTrading Engine - Registro de Modelos de Precificação
+Black-Scholes-Merton com dividend yield, Black-76 (IBOV/DI futuro) e
+modelos americanos atrás de uma única interface vetorizada
+Desenvolvido por: Deverson
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from config.settings import config
+from core.american_pricing import DEFAULT_STEPS, price_american_chain
+from core.pricing_math import bsm_greeks, bsm_price, is_call_array
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR
+
+GREEK_NAMES = ('delta', 'gamma', 'theta', 'vega', 'rho', 'vanna')
+
+
+class PricingModel(ABC):
+    """
+    Interface comum dos modelos
+
+    `underlying_price` é o preço à vista para modelos de ações e o preço
+    do futuro para o Black-76. Todos os argumentos são arrays (broadcast
+    NumPy) e uma chain inteira é precificada em uma chamada.
+    """
+
+    name = 'base'
+    exercise = 'european'
+
+    @abstractmethod
+    def price(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        """Preços teóricos da chain"""
+
+    def greeks(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        """
+        Greeks por diferenças finitas centrais (toda a chain por chamada)
+
+        Mesmas convenções de `bsm_greeks`: theta por dia útil (T em dias
+        úteis / 252), vega e rho por 1 ponto percentual, vanna por unidade
+        de vol. Opções vencidas (T = 0) têm theta zero.
+        """
+        S = np.asarray(underlying_price, dtype=float)
+        T = np.asarray(T, dtype=float)
+        sigma = np.asarray(sigma, dtype=float)
+        r = np.asarray(r, dtype=float)
+        dS = np.maximum(S * 0.01, 1e-4)
+        dv, dr = 0.01, 0.0001
+        one_day = 1.0 / BUSINESS_DAYS_PER_YEAR
+        dt = np.minimum(one_day, T * 0.5)
+
+        base = self.price(S, K, T, r, sigma, option_type, q)
+        up = self.price(S + dS, K, T, r, sigma, option_type, q)
+        down = self.price(S - dS, K, T, r, sigma, option_type, q)
+        vol_up = self.price(S, K, T, r, sigma + dv, option_type, q)
+        vol_down = self.price(S, K, T, r, np.maximum(sigma - dv, 1e-4), option_type, q)
+        rate_up = self.price(S, K, T, r + dr, sigma, option_type, q)
+        rate_down = self.price(S, K, T, r - dr, sigma, option_type, q)
+        shorter = self.price(S, K, T - dt, r, sigma, option_type, q)
+        up_vol_up = self.price(S + dS, K, T, r, sigma + dv, option_type, q)
+        up_vol_down = self.price(S + dS, K, T, r, np.maximum(sigma - dv, 1e-4), option_type, q)
+        down_vol_up = self.price(S - dS, K, T, r, sigma + dv, option_type, q)
+        down_vol_down = self.price(S - dS, K, T, r, np.maximum(sigma - dv, 1e-4), option_type, q)
+
+        return {
+            'delta': (up - down) / (2 * dS),
+            'gamma': (up - 2 * base + down) / (dS * dS),
+            'theta': np.divide((shorter - base) * one_day, dt, out=np.zeros(np.shape(base)), where=dt > 0),
+            'vega': (vol_up - vol_down) / 2.0,   # por 1 ponto de vol
+            'rho': (rate_up - rate_down) / (2 * dr) / 100.0,  # por 1 p.p. de taxa
+            'vanna': (up_vol_up - up_vol_down - down_vol_up + down_vol_down) / (4 * dS * dv),
+        }
+
+
+class BlackScholesMertonModel(PricingModel):
+    """Europeia com dividend yield contínuo q"""
+
+    name = 'bsm'
+
+    def price(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        return bsm_price(underlying_price, K, T, r, sigma, option_type, q)
+
+    def greeks(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        greeks = bsm_greeks(underlying_price, K, T, r, sigma, option_type, q)
+        return {name: greeks[name] for name in GREEK_NAMES}
+
+
+class Black76Model(PricingModel):
+    """
+    Black-76 sobre o preço do futuro (opções de IBOV futuro e DI)
+
+    Equivale ao BSM com S = F e q = r; `q` é ignorado.
+    """
+
+    name = 'black76'
+
+    def price(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        return bsm_price(underlying_price, K, T, r, sigma, option_type, q=r)
+
+    def greeks(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        greeks = bsm_greeks(underlying_price, K, T, r, sigma, option_type, q=r)
+        # Rho do Black-76 é apenas o desconto do prêmio: -T * preço
+        price = self.price(underlying_price, K, T, r, sigma, option_type)
+        result = {name: greeks[name] for name in GREEK_NAMES}
+        result['rho'] = -np.asarray(T, dtype=float) * price / 100.0
+        return result
+
+
+class AmericanModel(PricingModel):
+    """Modelos americanos de core.american_pricing ('crr', 'leisen_reimer', 'baw')"""
+
+    exercise = 'american'
+
+    def __init__(self, method, steps=DEFAULT_STEPS):
+        self.name = method
+        self.method = method
+        self.steps = steps
+
+    def price(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        return price_american_chain(underlying_price, K, T, r, sigma, option_type, q,
+                                    model=self.method, steps=self.steps)
+
+
+MODEL_REGISTRY = {}
+
+
+def register_model(model, name=None):
+    """
+    Registra um modelo de precificação
+
+    Args:
+        model (PricingModel): Instância do modelo
+        name (str, optional): Nome no registro (padrão: model.name)
+    """
+    MODEL_REGISTRY[name or model.name] = model
+
+
+def get_model(name):
+    """
+    Obtém um modelo registrado
+
+    Args:
+        name (str): Nome do modelo
+
+    Returns:
+        PricingModel: Modelo
+    """
+    if name not in MODEL_REGISTRY:
+        raise ValueError(f"Modelo de precificação não registrado: {name}")
+    return MODEL_REGISTRY[name]
+
+
+def available_models():
+    """Nomes dos modelos registrados"""
+    return sorted(MODEL_REGISTRY)
+
+
+def price_chain(model, underlying_price, K, T, r, sigma, option_type, q=0.0, with_greeks=False):
+    """
+    Precifica uma chain inteira em uma única chamada do modelo
+
+    Args:
+        model (str | PricingModel): Modelo ou nome registrado
+        underlying_price, K, T, r, sigma, q (array_like): Parâmetros
+        option_type (str | array_like): 'call'/'put' ou máscara de calls
+        with_greeks (bool): Calcula também os Greeks
+
+    Returns:
+        dict: 'price' e, opcionalmente, os Greeks
+    """
+    if isinstance(model, str):
+        model = get_model(model)
+    calls = is_call_array(option_type)
+    result = {'price': model.price(underlying_price, K, T, r, sigma, calls, q)}
+    if with_greeks:
+        result.update(model.greeks(underlying_price, K, T, r, sigma, calls, q))
+    return result
+
+
+register_model(BlackScholesMertonModel())
+register_model(Black76Model())
+for _method in ('crr', 'leisen_reimer', 'baw'):
+    register_model(AmericanModel(_method, steps=config.BINOMIAL_STEPS))
@@ -0,0 +1,289 @@
+"""
+ProTrading Engine - Volatilidade Realizada
+Estimadores close-to-close, Parkinson, Garman-Klass, Rogers-Satchell e
+Yang-Zhang em janelas móveis sobre barras OHLC (vários ativos de uma vez
+em arrays 2D), atualização incremental da última janela e cones de
+volatilidade cacheados
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+
+ANNUALIZATION = 252
+
+ESTIMATORS = ('close_to_close', 'parkinson', 'garman_klass', 'rogers_satchell', 'yang_zhang')
+
+CONE_HORIZONS = (10, 21, 42, 63, 126, 252)
+CONE_PERCENTILES = (0, 10, 25, 50, 75, 90, 100)
+
+# Termos por barra cujas somas móveis alimentam todos os estimadores
+_TERMS = ('ret', 'ret2', 'overnight', 'overnight2', 'intraday', 'intraday2', 'parkinson', 'garman_klass',
+          'rogers_satchell')
+_LN2 = np.log(2.0)
+
+
+def _bar_terms(open_, high, low, close, prev_close):
+    """
+    Termos de cada barra (arrays com o tempo no último eixo)
+
+    Returns:
+        np.ndarray: (termos, ...) na ordem de _TERMS
+    """
+    o, h, l, c = (np.asarray(v, dtype=float) for v in (open_, high, low, close))
+    prev = np.asarray(prev_close, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret = np.log(c / prev)
+        overnight = np.log(o / prev)
+        up = np.log(h / o)
+        down = np.log(l / o)
+        intraday = np.log(c / o)
+    hl = up - down
+    return np.stack([
+        ret, ret * ret,
+        overnight, overnight * overnight,
+        intraday, intraday * intraday,
+        hl * hl / (4.0 * _LN2),
+        0.5 * hl * hl - (2.0 * _LN2 - 1.0) * intraday * intraday,
+        up * (up - intraday) + down * (down - intraday),
+    ])
+
+
+def _variances(sums, n):
+    """Variâncias por barra de cada estimador a partir das somas da janela"""
+    n = np.asarray(n, dtype=float)
+    dof = np.where(n > 1, n - 1.0, np.nan)
+    s = dict(zip(_TERMS, sums))
+    var_ret = (s['ret2'] - s['ret'] ** 2 / n) / dof
+    var_overnight = (s['overnight2'] - s['overnight'] ** 2 / n) / dof
+    var_intraday = (s['intraday2'] - s['intraday'] ** 2 / n) / dof
+    rs = s['rogers_satchell'] / n
+    k = 0.34 / (1.34 + (n + 1.0) / dof)
+    return {
+        'close_to_close': var_ret,
+        'parkinson': s['parkinson'] / n,
+        'garman_klass': s['garman_klass'] / n,
+        'rogers_satchell': rs,
+        'yang_zhang': var_overnight + k * var_intraday + (1.0 - k) * rs,
+    }
+
+
+def _annualize(variance, annualization):
+    return np.sqrt(np.maximum(variance, 0.0) * annualization)
+
+
+def _previous_close(close):
+    """Fechamento anterior alinhado (NaN na primeira barra)"""
+    close = np.asarray(close, dtype=float)
+    prev = np.full_like(close, np.nan)
+    prev[..., 1:] = close[..., :-1]
+    return prev
+
+
+def rolling_realized_volatility(open_, high, low, close, window=21, estimators=ESTIMATORS,
+                                annualization=ANNUALIZATION):
+    """
+    Volatilidade realizada anualizada em janelas móveis
+
+    Aceita arrays 1D (uma série) ou 2D (ativos x barras). Cada estimador é
+    uma combinação de somas móveis (cumsum) dos termos por barra; janelas
+    com barras faltantes (NaN) ficam NaN.
+
+    Args:
+        open_, high, low, close (array_like): Barras OHLC
+        window (int): Barras por janela
+        estimators (iterable): Estimadores desejados
+        annualization (int): Barras por ano
+
+    Returns:
+        dict: estimador -> array com o formato de `close` (NaN até a 1ª janela completa)
+    """
+    close = np.asarray(close, dtype=float)
+    terms = _bar_terms(open_, high, low, close, _previous_close(close))
+
+    # A janela de retornos começa na barra seguinte à primeira, então todos
+    # os termos exigem `window` barras com fechamento anterior válido
+    valid = np.isfinite(terms).all(axis=0)
+    filled = np.where(valid, terms, 0.0)
+
+    def rolling(x):
+        c = np.cumsum(x, axis=-1)
+        out = c.copy()
+        out[..., window:] -= c[..., :-window]
+        return out
+
+    sums = rolling(filled)
+    counts = rolling(valid.astype(float))
+    variances = _variances(sums, window)
+    complete = counts >= window
+
+    return {name: np.where(complete, _annualize(variances[name], annualization), np.nan)
+            for name in estimators}
+
+
+class RealizedVolTracker:
+    """
+    Última janela de volatilidade realizada de vários ativos, incremental
+
+    Mantém um buffer circular (janela x termos x ativos) e as somas da
+    janela; cada barra nova soma seus termos e subtrai os da barra que sai,
+    então atualizar o universo custa O(ativos) por barra.
+    """
+
+    def __init__(self, symbols, window=21, annualization=ANNUALIZATION):
+        """
+        Inicializa o rastreador
+
+        Args:
+            symbols (list): Ativos (ordem das colunas dos arrays de update)
+            window (int): Barras por janela
+            annualization (int): Barras por ano
+        """
+        self.symbols = list(symbols)
+        self.window = window
+        self.annualization = annualization
+        n = len(self.symbols)
+        self.buffer = np.zeros((window, len(_TERMS), n))
+        self.valid = np.zeros((window, n), dtype=bool)
+        self.sums = np.zeros((len(_TERMS), n))
+        self.counts = np.zeros(n)
+        self.prev_close = np.full(n, np.nan)
+        self.position = 0
+
+    def update(self, open_, high, low, close):
+        """
+        Adiciona uma barra para todos os ativos
+
+        Args:
+            open_, high, low, close (array_like): Barra de cada ativo (NaN = sem barra)
+
+        Returns:
+            dict: estimador -> volatilidade anualizada por ativo
+        """
+        close = np.asarray(close, dtype=float)
+        terms = _bar_terms(open_, high, low, close, self.prev_close)
+        valid = np.isfinite(terms).all(axis=0)
+        terms = np.where(valid, terms, 0.0)
+
+        slot = self.position % self.window
+        self.sums += terms - self.buffer[slot]
+        self.counts += valid.astype(float) - self.valid[slot]
+        self.buffer[slot] = terms
+        self.valid[slot] = valid
+        self.position += 1
+        self.prev_close = np.where(np.isfinite(close), close, self.prev_close)
+        return self.current()
+
+    def seed(self, open_, high, low, close):
+        """
+        Carrega o histórico (ativos x barras) de uma vez: só a última janela
+        de termos vai para o buffer
+        """
+        close = np.asarray(close, dtype=float)
+        terms = _bar_terms(open_, high, low, close, _previous_close(close))[..., -self.window:]
+        valid = np.isfinite(terms).all(axis=0)
+        terms = np.where(valid, terms, 0.0)
+
+        n_bars = terms.shape[-1]
+        self.buffer[:] = 0.0
+        self.valid[:] = False
+        self.buffer[:n_bars] = np.moveaxis(terms, -1, 0)
+        self.valid[:n_bars] = valid.T
+        self.sums = self.buffer.sum(axis=0)
+        self.counts = self.valid.sum(axis=0).astype(float)
+        self.position = n_bars
+        last = np.where(np.isfinite(close), close, np.nan)
+        self.prev_close = pd.DataFrame(last.T).ffill().to_numpy()[-1] if last.shape[-1] else self.prev_close
+        return self.current()
+
+    def current(self):
+        """Volatilidade da janela atual (NaN para janelas incompletas)"""
+        variances = _variances(self.sums, self.window)
+        complete = self.counts >= self.window
+        return {name: np.where(complete, _annualize(variances[name], self.annualization), np.nan)
+                for name in ESTIMATORS}
+
+
+def volatility_cone(open_, high, low, close, horizons=CONE_HORIZONS, percentiles=CONE_PERCENTILES,
+                    estimator='close_to_close', annualization=ANNUALIZATION):
+    """
+    Cone de volatilidade de uma série
+
+    Args:
+        open_, high, low, close (array_like): Barras OHLC 1D
+        horizons (iterable): Janelas em barras
+        percentiles (iterable): Percentis do cone
+        estimator (str): Estimador de volatilidade
+        annualization (int): Barras por ano
+
+    Returns:
+        pd.DataFrame: Linha por horizonte com os percentis, o valor atual e
+            o número de janelas usadas
+    """
+    rows = []
+    for horizon in horizons:
+        rv = rolling_realized_volatility(open_, high, low, close, horizon, (estimator,), annualization)[estimator]
+        rv = rv[np.isfinite(rv)]
+        row = {'horizon': horizon, 'observations': rv.size,
+               'current': float(rv[-1]) if rv.size else np.nan}
+        values = np.percentile(rv, percentiles) if rv.size else np.full(len(percentiles), np.nan)
+        row.update({f'p{p}': float(v) for p, v in zip(percentiles, values)})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def daily_bars(prices):
+    """
+    Barras OHLC diárias a partir das cotações gravadas (tabela prices)
+
+    Args:
+        prices (pd.DataFrame): Colunas timestamp e price
+
+    Returns:
+        pd.DataFrame: Índice diário e colunas open, high, low, close
+    """
+    if prices.empty:
+        return pd.DataFrame(columns=['open', 'high', 'low', 'close'])
+    series = prices.set_index(pd.to_datetime(prices['timestamp']))['price'].astype(float)
+    return series.resample('1D').ohlc().dropna()
+
+
+class VolatilityConeCache:
+    """
+    Cones por ativo cacheados pela última barra
+
+    O cone só é recalculado quando entra uma barra nova para o ativo ou
+    quando a barra do dia é atualizada no intraday (OHLC diferente).
+    """
+
+    def __init__(self, horizons=CONE_HORIZONS, percentiles=CONE_PERCENTILES):
+        self.horizons = tuple(horizons)
+        self.percentiles = tuple(percentiles)
+        self.cache = {}  # (symbol, estimator) -> (versão das barras, cone)
+
+    def get(self, symbol, bars, estimator='close_to_close'):
+        """
+        Cone de volatilidade de um ativo
+
+        Args:
+            symbol (str): Ativo
+            bars (pd.DataFrame): Barras OHLC com índice temporal
+            estimator (str): Estimador
+
+        Returns:
+            pd.DataFrame: Cone (ver `volatility_cone`)
+        """
+        version = None
+        if len(bars):
+            last = bars.iloc[-1]
+            version = (bars.index[-1], len(bars),
+                       tuple(float(last[column]) for column in ('open', 'high', 'low', 'close')))
+        key = (symbol, estimator)
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        cone = volatility_cone(bars['open'].to_numpy(), bars['high'].to_numpy(), bars['low'].to_numpy(),
+                               bars['close'].to_numpy(), self.horizons, self.percentiles, estimator)
+        self.cache[key] = (version, cone)
+        return cone
@@ -0,0 +1,119 @@
+"""
+ProTrading Engine - Preços em Memória Compartilhada
+Arrays de preços copiados uma vez para memória compartilhada e pool de
+processos cujos trabalhadores os mapeiam na inicialização; usado pelo
+otimizador de parâmetros e pelo walk-forward
+Desenvolvido por: Deverson
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.backtester import VectorizedBacktester
+
+PRICE_FIELDS = ('close', 'high', 'low', 'open')
+
+
+class SharedPriceArrays:
+    """
+    Arrays de preços (ativos x tempo) copiados uma vez para memória compartilhada
+
+    Os processos recebem só os descritores (nome, formato, dtype) e mapeiam
+    os mesmos blocos. Use como context manager para liberar a memória.
+    """
+
+    def __init__(self, arrays):
+        """
+        Args:
+            arrays (dict): campo -> array (close obrigatório)
+        """
+        self.blocks = []
+        self.descriptors = {}
+        for field, values in arrays.items():
+            if values is None:
+                continue
+            values = np.ascontiguousarray(values, dtype=float)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+            self.blocks.append(block)
+            self.descriptors[field] = (block.name, values.shape, values.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def release(self):
+        """Fecha e remove os blocos compartilhados"""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    @staticmethod
+    def attach(descriptors):
+        """
+        Mapeia os blocos de um processo trabalhador
+
+        Returns:
+            tuple: (arrays por campo, blocos abertos - manter referência)
+        """
+        arrays, blocks = {}, []
+        for field, (name, shape, dtype) in descriptors.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            arrays[field] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return arrays, blocks
+
+
+# Estado de cada processo trabalhador (preenchido pelo initializer do pool)
+_WORKER = {}
+
+
+def init_worker(descriptors, backtester_options):
+    """
+    Initializer do pool: anexa os preços compartilhados uma vez por processo
+
+    Args:
+        descriptors (dict): SharedPriceArrays.descriptors
+        backtester_options (dict): Argumentos do VectorizedBacktester
+    """
+    arrays, blocks = SharedPriceArrays.attach(descriptors)
+    _WORKER.update(arrays=arrays, blocks=blocks, cache={},
+                   backtester=VectorizedBacktester(**backtester_options))
+
+
+def worker_context():
+    """
+    Estado do processo trabalhador atual
+
+    Returns:
+        tuple: (arrays por campo, backtester, cache de indicadores do processo)
+    """
+    return _WORKER['arrays'], _WORKER['backtester'], _WORKER['cache']
+
+
+@contextmanager
+def shared_price_pool(arrays, workers, backtester_options=None):
+    """
+    Pool de processos com os preços em memória compartilhada
+
+    As tarefas submetidas obtêm preços, backtester e cache com
+    `worker_context()`. A memória é liberada ao sair do bloco.
+
+    Args:
+        arrays (dict): campo -> array (close obrigatório)
+        workers (int): Processos
+        backtester_options (dict, optional): Argumentos do VectorizedBacktester
+
+    Yields:
+        ProcessPoolExecutor: Pool pronto para receber tarefas
+    """
+    with SharedPriceArrays(arrays) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(shared.descriptors, backtester_options or {})) as pool:
+            yield pool
@@ -0,0 +1,195 @@
+"""
+ProTrading Engine - Otimizador de Parâmetros de Estratégias
+Busca em grade e aleatória sobre os parâmetros da estratégia SMA + RSI
+distribuída em um pool de processos, com os arrays de preços em memória
+compartilhada (sem cópia nem pickle por tarefa) e ranking incremental
+Desenvolvido por: Deverson
+"""
+
+import itertools
+import os
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from core.backtester import VectorizedBacktester, sma_rsi_signals
+from core.shared_prices import PRICE_FIELDS, shared_price_pool, worker_context
+
+# Grade padrão em torno das regras fixas de TradingStrategies
+SMA_RSI_GRID = {
+    'fast_period': [3, 5, 8, 10],
+    'slow_period': [15, 20, 30, 50],
+    'rsi_period': [9, 14, 21],
+    'rsi_overbought': [65.0, 70.0, 75.0],
+    'rsi_oversold': [25.0, 30.0, 35.0],
+    'cross_threshold': [1.0, 2.0, 3.0],
+    'target_pct': [0.03, 0.05, 0.08],
+    'stop_pct': [0.02, 0.03, 0.05],
+}
+
+
+def parameter_grid(grid):
+    """
+    Todas as combinações de uma grade
+
+    Args:
+        grid (dict): parâmetro -> lista de valores
+
+    Returns:
+        list: Combinações (dicts)
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def random_parameters(space, n_iter, seed=None):
+    """
+    Combinações aleatórias de um espaço de parâmetros
+
+    Args:
+        space (dict): parâmetro -> lista (sorteio entre valores) ou tupla
+            (mínimo, máximo) - inteira se os dois limites forem inteiros
+        n_iter (int): Número de combinações
+        seed (int, optional): Semente
+
+    Returns:
+        list: Combinações (dicts)
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                columns[name] = rng.integers(low, high + 1, n_iter).tolist()
+            else:
+                columns[name] = rng.uniform(low, high, n_iter).tolist()
+        else:
+            columns[name] = [values[i] for i in rng.integers(0, len(values), n_iter)]
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def _evaluate(arrays, backtester, cache, params):
+    """Backtest de uma combinação reaproveitando indicadores já calculados"""
+    close = arrays['close']
+    signal, strength = sma_rsi_signals(close, params, cache)
+    result = backtester.simulate(close, signal, strength, arrays.get('high'), arrays.get('low'), arrays.get('open'),
+                                 params.get('target_pct', 0.05), params.get('stop_pct', 0.03))
+    return result.stats
+
+
+def _evaluate_chunk(chunk):
+    """Avalia um lote de combinações no processo trabalhador"""
+    arrays, backtester, cache = worker_context()
+    return [(index, params, _evaluate(arrays, backtester, cache, params)) for index, params in chunk]
+
+
+class ParameterOptimizer:
+    """
+    Otimizador de parâmetros por busca em grade ou aleatória
+
+    Combinações vão para o pool em lotes; cada processo mantém um cache de
+    indicadores (SMA/RSI por período), então combinações que diferem só em
+    limiares, alvo ou stop não recalculam indicadores. Resultados entram no
+    ranking conforme os lotes terminam.
+    """
+
+    def __init__(self, workers=None, chunk_size=16, metric='sharpe', min_trades=0, backtester_options=None):
+        """
+        Inicializa o otimizador
+
+        Args:
+            workers (int, optional): Processos (padrão: núcleos disponíveis;
+                1 = execução no processo atual)
+            chunk_size (int): Combinações por tarefa
+            metric (str): Estatística de ranking (maior = melhor)
+            min_trades (int): Mínimo de trades para entrar no ranking
+            backtester_options (dict, optional): Argumentos do VectorizedBacktester
+        """
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.chunk_size = max(1, int(chunk_size))
+        self.metric = metric
+        self.min_trades = min_trades
+        self.backtester_options = backtester_options or {}
+        self.results = []
+        self.elapsed = 0.0
+
+    def grid_search(self, bars, grid=None, on_result=None):
+        """
+        Busca em grade
+
+        Args:
+            bars (dict): Arrays de preços (close e opcionalmente high, low, open)
+            grid (dict, optional): Grade (padrão: SMA_RSI_GRID)
+            on_result (callable, optional): Chamado com cada linha nova
+
+        Returns:
+            pd.DataFrame: Ranking
+        """
+        return self.run(bars, parameter_grid(grid or SMA_RSI_GRID), on_result)
+
+    def random_search(self, bars, space=None, n_iter=100, seed=None, on_result=None):
+        """Busca aleatória (ver random_parameters)"""
+        return self.run(bars, random_parameters(space or SMA_RSI_GRID, n_iter, seed), on_result)
+
+    def run(self, bars, combinations, on_result=None):
+        """
+        Avalia uma lista de combinações
+
+        Args:
+            bars (dict): Arrays de preços
+            combinations (list): Combinações de parâmetros
+            on_result (callable, optional): Chamado com cada linha nova
+
+        Returns:
+            pd.DataFrame: Ranking
+        """
+        start = time.perf_counter()
+        self.results = []
+        indexed = list(enumerate(combinations))
+        chunks = [indexed[i:i + self.chunk_size] for i in range(0, len(indexed), self.chunk_size)]
+        arrays = {field: bars.get(field) for field in PRICE_FIELDS}
+        arrays['close'] = np.atleast_2d(np.asarray(arrays['close'], dtype=float))
+
+        if self.workers == 1:
+            backtester = VectorizedBacktester(**self.backtester_options)
+            cache = {}
+            for chunk in chunks:
+                self._collect([(i, p, _evaluate(arrays, backtester, cache, p)) for i, p in chunk], on_result)
+        else:
+            with shared_price_pool(arrays, self.workers, self.backtester_options) as pool:
+                futures = [pool.submit(_evaluate_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    self._collect(future.result(), on_result)
+
+        self.elapsed = time.perf_counter() - start
+        return self.ranking()
+
+    def _collect(self, rows, on_result):
+        """Acrescenta os resultados de um lote"""
+        for index, params, stats in rows:
+            row = {'combination': index, **params, **stats}
+            self.results.append(row)
+            if on_result is not None:
+                on_result(row)
+
+    def ranking(self, top=None):
+        """
+        Ranking atual pelo critério configurado
+
+        Args:
+            top (int, optional): Limita às melhores combinações
+
+        Returns:
+            pd.DataFrame: Combinações ordenadas (rank 1 = melhor)
+        """
+        table = pd.DataFrame(self.results)
+        if table.empty:
+            return table
+        table = table[table['trades'] >= self.min_trades]
+        table = table.sort_values([self.metric, 'combination'], ascending=[False, True], na_position='last')
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+        table = table.reset_index(drop=True)
+        return table.head(top) if top else table
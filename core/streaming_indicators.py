@@ -0,0 +1,352 @@
+"""
+ProTrading Engine - Indicadores Incrementais
+Estados de indicadores atualizados em O(1) por preço (SMA por soma em
+anel, EMA, RSI de Wilder, variância móvel de Welford e máximo/mínimo
+móveis por deque monotônica), serializáveis e persistidos no SQLite
+Desenvolvido por: Deverson
+"""
+
+import json
+import math
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+
+from data.database import db
+
+
+class StreamingIndicator(ABC):
+    """
+    Base dos indicadores incrementais
+
+    `update(x)` consome um preço e devolve o valor atual (None até haver
+    dados suficientes). `to_dict`/`from_dict` levam o estado completo para
+    JSON e de volta, sem reprocessar histórico.
+
+    `warmup` é o número de preços consumidos antes do primeiro valor nos
+    indicadores cujo valor depende só de uma janela fixa; None nos que
+    carregam todo o histórico visto (EMA, RSI).
+    """
+
+    kind = 'base'
+    registry = {}
+    warmup = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        StreamingIndicator.registry[cls.kind] = cls
+
+    @abstractmethod
+    def update(self, x):
+        """Consome um preço e devolve o valor atual"""
+
+    @property
+    @abstractmethod
+    def value(self):
+        """Valor atual (None até haver dados suficientes)"""
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def to_dict(self):
+        return {'kind': self.kind, **self.__dict__}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        indicator_cls = StreamingIndicator.registry[data.pop('kind')]
+        indicator = indicator_cls.__new__(indicator_cls)
+        indicator.__dict__.update(indicator_cls._restore(data))
+        return indicator
+
+    @staticmethod
+    def _restore(data):
+        """Converte campos do JSON de volta aos tipos internos"""
+        return data
+
+
+class RunningSMA(StreamingIndicator):
+    """Média móvel simples por soma em buffer circular"""
+
+    kind = 'sma'
+
+    def __init__(self, period):
+        self.period = period
+        self.buffer = []
+        self.position = 0
+        self.total = 0.0
+
+    @property
+    def warmup(self):
+        return self.period - 1
+
+    def update(self, x):
+        x = float(x)
+        if len(self.buffer) < self.period:
+            self.buffer.append(x)
+            self.total += x
+        else:
+            self.total += x - self.buffer[self.position]
+            self.buffer[self.position] = x
+            self.position = (self.position + 1) % self.period
+            if self.position == 0:
+                # Recalcula a soma a cada volta do anel para não acumular erro
+                self.total = math.fsum(self.buffer)
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.period if len(self.buffer) == self.period else None
+
+
+class StreamingEMA(StreamingIndicator):
+    """EMA semeada pela SMA dos primeiros valores (igual a indicators.ema)"""
+
+    kind = 'ema'
+
+    def __init__(self, period, alpha=None):
+        self.period = period
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1.0)
+        self.count = 0
+        self.seed_total = 0.0
+        self.state = None
+
+    def update(self, x):
+        x = float(x)
+        self.count += 1
+        if self.state is None:
+            self.seed_total += x
+            if self.count == self.period:
+                self.state = self.seed_total / self.period
+        else:
+            self.state += self.alpha * (x - self.state)
+        return self.state
+
+    @property
+    def value(self):
+        return self.state
+
+
+class StreamingRSI(StreamingIndicator):
+    """RSI de Wilder (igual a indicators.rsi)"""
+
+    kind = 'rsi'
+
+    def __init__(self, period=14):
+        self.period = period
+        self.previous = None
+        self.avg_gain = StreamingEMA(period, alpha=1.0 / period)
+        self.avg_loss = StreamingEMA(period, alpha=1.0 / period)
+
+    @staticmethod
+    def _restore(data):
+        data['avg_gain'] = StreamingIndicator.from_dict(data['avg_gain'])
+        data['avg_loss'] = StreamingIndicator.from_dict(data['avg_loss'])
+        return data
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['avg_gain'] = self.avg_gain.to_dict()
+        data['avg_loss'] = self.avg_loss.to_dict()
+        return data
+
+    def update(self, x):
+        x = float(x)
+        if self.previous is not None:
+            delta = x - self.previous
+            self.avg_gain.update(max(delta, 0.0))
+            self.avg_loss.update(max(-delta, 0.0))
+        self.previous = x
+        return self.value
+
+    @property
+    def value(self):
+        gain, loss = self.avg_gain.value, self.avg_loss.value
+        if gain is None or loss is None:
+            return None
+        if loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+class RollingVariance(StreamingIndicator):
+    """Média e variância móveis (Welford com remoção do valor que sai da janela)"""
+
+    kind = 'variance'
+
+    def __init__(self, period, ddof=1):
+        self.period = period
+        self.ddof = ddof
+        self.window = []
+        self.position = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def warmup(self):
+        return max(self.period, self.ddof + 1) - 1
+
+    def update(self, x):
+        x = float(x)
+        if len(self.window) < self.period:
+            self.window.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.window[self.position]
+            self.window[self.position] = x
+            self.position = (self.position + 1) % self.period
+            new_mean = self.mean + (x - old) / self.period
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+        return self.value
+
+    @property
+    def value(self):
+        n = len(self.window)
+        if n < self.period or n <= self.ddof:
+            return None
+        return max(self.m2, 0.0) / (n - self.ddof)
+
+    @property
+    def std(self):
+        variance = self.value
+        return math.sqrt(variance) if variance is not None else None
+
+
+class RollingExtreme(StreamingIndicator):
+    """Máximo ou mínimo móvel por deque monotônica (O(1) amortizado)"""
+
+    kind = 'extreme'
+
+    def __init__(self, period, mode='max'):
+        if mode not in ('max', 'min'):
+            raise ValueError(f"Modo desconhecido: {mode}")
+        self.period = period
+        self.mode = mode
+        self.count = 0
+        self.candidates = deque()  # (índice, valor) monotônico
+
+    @property
+    def warmup(self):
+        return self.period - 1
+
+    @staticmethod
+    def _restore(data):
+        data['candidates'] = deque(tuple(c) for c in data['candidates'])
+        return data
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['candidates'] = [list(c) for c in self.candidates]
+        return data
+
+    def update(self, x):
+        x = float(x)
+        dominated = (lambda v: v <= x) if self.mode == 'max' else (lambda v: v >= x)
+        while self.candidates and dominated(self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.count, x))
+        if self.candidates[0][0] <= self.count - self.period:
+            self.candidates.popleft()
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.candidates[0][1] if self.count >= self.period else None
+
+
+class IndicatorSet:
+    """
+    Conjunto de indicadores incrementais de um símbolo
+
+    Guarda o timestamp do último preço consumido para que, após um
+    restart, só os preços posteriores precisem ser reaplicados.
+    """
+
+    def __init__(self, indicators, last_timestamp=None):
+        self.indicators = indicators
+        self.last_timestamp = last_timestamp
+        self.updates = 0
+
+    @classmethod
+    def default(cls):
+        """SMA5, SMA20 e RSI14 usados pela estratégia SMA + RSI"""
+        return cls({'sma_5': RunningSMA(5), 'sma_20': RunningSMA(20), 'rsi': StreamingRSI(14)})
+
+    def update(self, price, timestamp=None):
+        """Consome um preço em todos os indicadores - O(1)"""
+        for indicator in self.indicators.values():
+            indicator.update(price)
+        self.last_timestamp = timestamp or datetime.now().isoformat()
+        self.updates += 1
+        return self.values()
+
+    def values(self):
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+
+    def to_json(self):
+        return json.dumps({
+            'last_timestamp': self.last_timestamp,
+            'indicators': {name: ind.to_dict() for name, ind in self.indicators.items()}
+        })
+
+    @classmethod
+    def from_json(cls, payload):
+        data = json.loads(payload)
+        indicators = {name: StreamingIndicator.from_dict(d) for name, d in data['indicators'].items()}
+        return cls(indicators, data.get('last_timestamp'))
+
+
+class IndicatorStateStore:
+    """Persistência dos conjuntos de indicadores (tabela indicator_state)"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or db.db_path
+        self.init_state_table()
+
+    def init_state_table(self):
+        """Cria a tabela de estados"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS indicator_state (
+                symbol TEXT NOT NULL,
+                name TEXT NOT NULL,
+                state TEXT NOT NULL,
+                last_timestamp TEXT,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (symbol, name)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def save(self, symbol, indicator_set, name='default'):
+        """Grava (ou substitui) o estado de um símbolo"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('''
+                INSERT OR REPLACE INTO indicator_state (symbol, name, state, last_timestamp, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (symbol, name, indicator_set.to_json(), indicator_set.last_timestamp, datetime.now().isoformat()))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"❌ Erro ao salvar estado de indicadores {symbol}: {e}")
+
+    def load(self, symbol, name='default'):
+        """Carrega o estado de um símbolo (None se não houver)"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute(
+                'SELECT state FROM indicator_state WHERE symbol = ? AND name = ?', (symbol, name)
+            ).fetchone()
+            conn.close()
+            return IndicatorSet.from_json(row[0]) if row else None
+        except Exception as e:
+            print(f"❌ Erro ao carregar estado de indicadores {symbol}: {e}")
+            return None
@@ -0,0 +1,341 @@
+"""
+ProTrading Engine - Calendário de Pregões
+Feriados e sessões da B3 e da NYSE (ADRs), dias úteis e frações de ano
+pré-calculadas para os vencimentos listados (convenção de 252 dias úteis)
+Desenvolvido por: Deverson
+"""
+
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
+
+BUSINESS_DAYS_PER_YEAR = 252
+MIN_YEAR_FRACTION = 1.0 / (BUSINESS_DAYS_PER_YEAR * 24)  # ~1 hora de pregão
+
+# ADRs brasileiros listados nos EUA -> mercado; todo o resto negocia na B3
+ADR_MARKETS = {
+    'PBR': 'NYSE', 'PBR.A': 'NYSE', 'VALE': 'NYSE', 'ITUB': 'NYSE', 'BBD': 'NYSE', 'BBDC': 'NYSE',
+    'BBDO': 'NYSE', 'ABEV': 'NYSE', 'BSBR': 'NYSE', 'GGB': 'NYSE', 'SID': 'NYSE', 'ERJ': 'NYSE',
+    'SBS': 'NYSE', 'CIG': 'NYSE', 'ELP': 'NYSE', 'UGP': 'NYSE', 'BAK': 'NYSE', 'BIDI': 'NYSE',
+}
+
+# Âncora para índices de dias úteis acumulados
+_EPOCH = np.datetime64('2000-01-01', 'D')
+
+
+def easter_sunday(year):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-ésimo dia da semana do mês (n = -1 para o último)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Regra de feriado observado da NYSE (sábado -> sexta, domingo -> segunda)"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def b3_holidays(year):
+    """
+    Feriados de pregão da B3
+
+    Args:
+        year (int): Ano
+
+    Returns:
+        list: Datas sem pregão (dias úteis)
+    """
+    easter = easter_sunday(year)
+    holidays = [
+        date(year, 1, 1),                 # Confraternização Universal
+        easter - timedelta(days=48),      # Carnaval (segunda)
+        easter - timedelta(days=47),      # Carnaval (terça)
+        easter - timedelta(days=2),       # Sexta-feira Santa
+        date(year, 4, 21),                # Tiradentes
+        date(year, 5, 1),                 # Dia do Trabalho
+        easter + timedelta(days=60),      # Corpus Christi
+        date(year, 9, 7),                 # Independência
+        date(year, 10, 12),               # Nossa Senhora Aparecida
+        date(year, 11, 2),                # Finados
+        date(year, 11, 15),               # Proclamação da República
+        date(year, 12, 24),               # Véspera de Natal
+        date(year, 12, 25),               # Natal
+        date(year, 12, 31),               # Último dia do ano
+    ]
+    if year >= 2024:
+        holidays.append(date(year, 11, 20))  # Consciência Negra (nacional)
+    return holidays
+
+
+def nyse_holidays(year):
+    """
+    Feriados de pregão da NYSE
+
+    Args:
+        year (int): Ano
+
+    Returns:
+        list: Datas sem pregão
+    """
+    holidays = [
+        _nth_weekday(year, 1, 0, 3),                      # Martin Luther King Jr.
+        _nth_weekday(year, 2, 0, 3),                      # Presidents' Day
+        easter_sunday(year) - timedelta(days=2),          # Good Friday
+        _nth_weekday(year, 5, 0, -1),                     # Memorial Day
+        _observed(date(year, 7, 4)),                      # Independence Day
+        _nth_weekday(year, 9, 0, 1),                      # Labor Day
+        _nth_weekday(year, 11, 3, 4),                     # Thanksgiving
+        _observed(date(year, 12, 25)),                    # Christmas
+    ]
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # Sábado não gera feriado em 31/12
+        holidays.append(_observed(new_year))
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))     # Juneteenth
+    return holidays
+
+
+MARKETS = {
+    'B3': {'holidays': b3_holidays, 'open': dtime(10, 0), 'close': dtime(17, 0)},
+    'NYSE': {'holidays': nyse_holidays, 'open': dtime(9, 30), 'close': dtime(16, 0)},
+}
+
+
+class TradingCalendar:
+    """
+    Calendário de pregões de uma bolsa
+
+    Vencimentos são registrados uma vez e recebem um id inteiro; para cada
+    id ficam pré-calculados o índice acumulado de dias úteis até o fim do
+    pregão do vencimento e o número ordinal da data. `time_to_expiry`
+    então é uma subtração de arrays, sem parsing de datas por opção.
+    """
+
+    def __init__(self, market='B3', first_year=2000, last_year=2060):
+        """
+        Inicializa o calendário
+
+        Args:
+            market (str): 'B3' ou 'NYSE'
+            first_year (int): Primeiro ano coberto
+            last_year (int): Último ano coberto
+        """
+        if market not in MARKETS:
+            raise ValueError(f"Mercado desconhecido: {market}")
+
+        spec = MARKETS[market]
+        self.market = market
+        self.session_open = spec['open']
+        self.session_close = spec['close']
+        holidays = [d for year in range(first_year, last_year + 1) for d in spec['holidays'](year)]
+        self.holidays = np.array(sorted(set(holidays)), dtype='datetime64[D]')
+        self.busdaycal = np.busdaycalendar(weekmask='1111100', holidays=self.holidays)
+
+        self._expiry_index = {}
+        self._expiry_dates = []
+        self._expiry_business_index = np.array([], dtype=float)
+        self._expiry_ordinal = np.array([], dtype=float)
+        self._day_cache = {}
+
+    # ========== DIAS ÚTEIS ==========
+
+    def is_business_day(self, day):
+        """Verifica se há pregão na data"""
+        return bool(np.is_busday(np.datetime64(day, 'D'), busdaycal=self.busdaycal))
+
+    def business_days_between(self, start, end):
+        """
+        Dias úteis em [start, end) - vetorizado
+
+        Args:
+            start, end (array_like): Datas
+
+        Returns:
+            np.ndarray | int: Contagem de dias úteis
+        """
+        return np.busday_count(np.asarray(start, dtype='datetime64[D]'),
+                               np.asarray(end, dtype='datetime64[D]'),
+                               busdaycal=self.busdaycal)
+
+    def add_business_days(self, day, n):
+        """Desloca `n` dias úteis a partir de `day` (rola para frente se não útil)"""
+        return np.busday_offset(np.datetime64(day, 'D'), n, roll='forward', busdaycal=self.busdaycal)
+
+    def session_fraction_elapsed(self, now):
+        """
+        Fração do pregão de hoje já decorrida (0 fora de dia útil ou antes da abertura)
+
+        Args:
+            now (datetime): Momento no horário local da bolsa
+
+        Returns:
+            float: Entre 0 e 1
+        """
+        if not self.is_business_day(now.date()):
+            return 0.0
+        open_dt = datetime.combine(now.date(), self.session_open)
+        close_dt = datetime.combine(now.date(), self.session_close)
+        elapsed = (now - open_dt).total_seconds() / (close_dt - open_dt).total_seconds()
+        return min(1.0, max(0.0, elapsed))
+
+    def is_open(self, now=None):
+        """Verifica se o pregão está aberto"""
+        now = now or datetime.now()
+        return self.is_business_day(now.date()) and self.session_open <= now.time() < self.session_close
+
+    # ========== VENCIMENTOS ==========
+
+    def register_expiries(self, expiry_dates):
+        """
+        Registra vencimentos e pré-calcula suas tabelas
+
+        Args:
+            expiry_dates (iterable): Datas 'YYYY-MM-DD', date ou datetime64
+
+        Returns:
+            np.ndarray: Ids dos vencimentos na ordem recebida
+        """
+        days = np.asarray(expiry_dates, dtype='datetime64[D]').ravel()
+        unique, inverse = np.unique(days, return_inverse=True)
+
+        new = [d for d in unique if d not in self._expiry_index]
+        if new:
+            new_days = np.array(new, dtype='datetime64[D]')
+            # Índice de dias úteis até o FIM do pregão do vencimento
+            business = np.busday_count(_EPOCH, new_days + 1, busdaycal=self.busdaycal).astype(float)
+            ordinal = (new_days - _EPOCH).astype(float)
+            for d in new:
+                self._expiry_index[d] = len(self._expiry_dates)
+                self._expiry_dates.append(d)
+            self._expiry_business_index = np.concatenate([self._expiry_business_index, business])
+            self._expiry_ordinal = np.concatenate([self._expiry_ordinal, ordinal])
+
+        ids = np.array([self._expiry_index[d] for d in unique], dtype=int)
+        return ids[inverse.ravel()]
+
+    @property
+    def expiry_business_index(self):
+        """Índice de dias úteis (fim do pregão) de cada vencimento registrado, por id"""
+        return self._expiry_business_index
+
+    def expiry_ids(self, expiry_dates):
+        """Alias de `register_expiries` (registra apenas vencimentos novos)"""
+        return self.register_expiries(expiry_dates)
+
+    def _today_index(self, now):
+        """Índice de dias úteis de hoje e fração decorrida (cache por minuto)"""
+        key = (now.date(), now.hour, now.minute)
+        cached = self._day_cache.get(key)
+        if cached is None:
+            today = np.datetime64(now.date(), 'D')
+            index = float(np.busday_count(_EPOCH, today, busdaycal=self.busdaycal))
+            ordinal = float((today - _EPOCH).astype(int))
+            cached = (index + self.session_fraction_elapsed(now), ordinal)
+            if len(self._day_cache) > 1024:
+                self._day_cache.clear()
+            self._day_cache[key] = cached
+        return cached
+
+    def business_days_to_expiry(self, expiry_ids, now=None):
+        """
+        Dias úteis de pregão restantes até o fim do vencimento
+
+        Args:
+            expiry_ids (array_like): Ids de `register_expiries`
+            now (datetime, optional): Momento de referência
+
+        Returns:
+            np.ndarray: Dias úteis (fracionários dentro do pregão)
+        """
+        now = now or datetime.now()
+        today_index, _ = self._today_index(now)
+        ids = np.asarray(expiry_ids, dtype=int)
+        return np.maximum(self._expiry_business_index[ids] - today_index, 0.0)
+
+    def time_to_expiry(self, expiry_ids, now=None):
+        """
+        Fração de ano em dias úteis/252 - vetorizado
+
+        Args:
+            expiry_ids (array_like): Ids de `register_expiries`
+            now (datetime, optional): Momento de referência
+
+        Returns:
+            np.ndarray: T em anos (mínimo de ~1 hora de pregão até o fim do
+                vencimento; 0 para contratos vencidos, que valem o intrínseco)
+        """
+        days = self.business_days_to_expiry(expiry_ids, now)
+        return np.where(days > 0, np.maximum(days / BUSINESS_DAYS_PER_YEAR, MIN_YEAR_FRACTION), 0.0)
+
+    def calendar_days_to_expiry(self, expiry_ids, now=None):
+        """
+        Dias corridos até o vencimento - vetorizado
+
+        Args:
+            expiry_ids (array_like): Ids de `register_expiries`
+            now (datetime, optional): Momento de referência
+
+        Returns:
+            np.ndarray: Dias corridos (inteiros)
+        """
+        now = now or datetime.now()
+        _, today_ordinal = self._today_index(now)
+        ids = np.asarray(expiry_ids, dtype=int)
+        return (self._expiry_ordinal[ids] - today_ordinal).astype(int)
+
+
+_calendars = {}
+
+
+def get_calendar(market='B3'):
+    """
+    Instância compartilhada do calendário de um mercado
+
+    Args:
+        market (str): 'B3' ou 'NYSE'
+
+    Returns:
+        TradingCalendar: Calendário
+    """
+    if market not in _calendars:
+        _calendars[market] = TradingCalendar(market)
+    return _calendars[market]
+
+
+def market_for_symbol(symbol):
+    """Mercado de negociação de um símbolo (ADRs de ADR_MARKETS -> NYSE, demais -> B3)"""
+    return ADR_MARKETS.get(str(symbol).strip().upper(), 'B3')
+
+
+def calendar_for_symbol(symbol):
+    """
+    Calendário do mercado em que o símbolo negocia (B3 ou NYSE para ADRs)
+
+    Args:
+        symbol (str): Ativo ou opção (PETR4, PETR4.SA, PBR)
+
+    Returns:
+        TradingCalendar: Calendário compartilhado
+    """
+    return get_calendar(market_for_symbol(symbol))
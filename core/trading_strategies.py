@@ -6,11 +6,22 @@ import numpy as np
 from datetime import datetime
 import sqlite3
 from data.database import db
+from config.settings import config
+from core import indicators
+from core.indicators import last_valid
+from core.indicator_cache import indicator_cache
+from core.streaming_indicators import IndicatorSet, IndicatorStateStore
+from strategies import SIGNAL_LABELS, bars_from_frame, load_strategies
 
 class TradingStrategies:
     def __init__(self):
         """Inicializa sistema de estratégias"""
         self.init_signals_table()
+        self.state_store = IndicatorStateStore()
+        self.live_states = {}  # symbol -> IndicatorSet incremental
+        self.warmup_prices = 50
+        self.strategies = load_strategies(config.STRATEGIES)
+        self.indicator_cache = indicator_cache
         print("💡 Sistema de Estratégias inicializado!")
     
     def init_signals_table(self):
@@ -41,39 +52,32 @@ class TradingStrategies:
         """Calcula Média Móvel Simples"""
         if len(prices) < period:
             return None
-        return sum(prices[-period:]) / period
+        return last_valid(indicators.sma(prices, period))
     
     def calculate_rsi(self, prices, period=14):
-        """Calcula RSI (Relative Strength Index)"""
+        """Calcula RSI (Relative Strength Index) com suavização de Wilder"""
         if len(prices) < period + 1:
             return 50  # Neutro se não há dados suficientes
         
-        # Calcula mudanças de preço
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        
-        # Separa ganhos e perdas
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        # Média dos últimos 'period' dias
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        rsi = last_valid(indicators.rsi(prices, period))
+        return 50 if rsi is None else rsi
     
     def analyze_symbol(self, symbol):
         """Análise completa de um símbolo"""
         try:
-            # Pega histórico de preços
-            history = db.get_price_history(symbol, limit=50)
+            # Sem preço novo desde a última análise os indicadores saem do cache
+            last_timestamp = db.get_latest_timestamps([symbol]).get(symbol)
+            history = None
+
+            def load_history():
+                nonlocal history
+                if history is None:
+                    history = db.get_price_histories([symbol], limit=config.STRATEGY_LOOKBACK)
+                return history['timestamp'], history['price']
+
+            sma_5_series = self.indicator_cache.series(symbol, 'sma', {'period': 5}, last_timestamp, load_history)
             
-            if history.empty or len(history) < 5:
+            if len(sma_5_series) < 5:
                 return {
                     'symbol': symbol,
                     'signal': 'NEUTRO',
@@ -90,51 +94,21 @@ class TradingStrategies:
                     }
                 }
             
-            # Converte para lista de preços
-            prices = history['price'].tolist()
-            prices.reverse()  # Ordem cronológica
-            
-            current_price = float(prices[-1])
-            
-            # Calcula indicadores
-            sma_5 = self.calculate_sma(prices, 5)
-            sma_20 = self.calculate_sma(prices, 20)
-            rsi = self.calculate_rsi(prices)
+            sma_20_series = self.indicator_cache.series(symbol, 'sma', {'period': 20}, last_timestamp, load_history)
+            rsi_series = self.indicator_cache.series(symbol, 'rsi', {'period': 14}, last_timestamp, load_history)
             
-            # Análise de tendência
-            trend_signal = self.analyze_trend(current_price, sma_5, sma_20)
-            
-            # Análise RSI
-            rsi_signal = self.analyze_rsi(rsi)
-            
-            # Combina sinais
-            final_signal = self.combine_signals(trend_signal, rsi_signal)
-            
-            # Calcula preços alvo
-            target_price, stop_loss = self.calculate_targets(current_price, final_signal['signal'])
-            
-            indicators = {
-                'sma_5': round(sma_5, 2) if sma_5 else None,
-                'sma_20': round(sma_20, 2) if sma_20 else None,
-                'rsi': round(rsi, 2),
-                'current_price': round(current_price, 2)
-            }
-            
-            result = {
-                'symbol': symbol,
-                'signal': final_signal['signal'],
-                'strength': final_signal['strength'],
-                'current_price': round(current_price, 2),
-                'target_price': round(target_price, 2) if target_price else None,
-                'stop_loss': round(stop_loss, 2) if stop_loss else None,
-                'reasoning': final_signal['reasoning'],
-                'indicators': indicators
-            }
+            current_price = self.indicator_cache.last_price(symbol, 'sma', {'period': 5})
+            sma_5 = last_valid(sma_5_series)
+            sma_20 = last_valid(sma_20_series)
+            rsi = last_valid(rsi_series)
+            rsi = 50 if rsi is None else rsi
             
+            result = self.build_result(symbol, current_price, sma_5, sma_20, rsi)
+
             # Salva no banco se for sinal forte
-            if final_signal['strength'] >= 7:
+            if result['strength'] >= 7:
                 self.save_signal(result)
-            
+
             return result
             
         except Exception as e:
@@ -150,6 +124,107 @@ class TradingStrategies:
                 'indicators': {}
             }
     
+    def build_result(self, symbol, current_price, sma_5, sma_20, rsi):
+        """Combina tendência e RSI no resultado da estratégia SMA + RSI"""
+        # Análise de tendência
+        trend_signal = self.analyze_trend(current_price, sma_5, sma_20)
+
+        # Análise RSI
+        rsi_signal = self.analyze_rsi(rsi)
+
+        # Combina sinais
+        final_signal = self.combine_signals(trend_signal, rsi_signal)
+
+        # Calcula preços alvo
+        target_price, stop_loss = self.calculate_targets(current_price, final_signal['signal'])
+
+        indicators = {
+            'sma_5': round(sma_5, 2) if sma_5 else None,
+            'sma_20': round(sma_20, 2) if sma_20 else None,
+            'rsi': round(rsi, 2),
+            'current_price': round(current_price, 2)
+        }
+
+        return {
+            'symbol': symbol,
+            'signal': final_signal['signal'],
+            'strength': final_signal['strength'],
+            'current_price': round(current_price, 2),
+            'target_price': round(target_price, 2) if target_price else None,
+            'stop_loss': round(stop_loss, 2) if stop_loss else None,
+            'reasoning': final_signal['reasoning'],
+            'indicators': indicators
+        }
+
+    def get_live_state(self, symbol, before=None):
+        """
+        Estado incremental de um símbolo
+
+        Restaura o estado persistido; sem estado salvo, aquece os
+        indicadores com os últimos preços gravados antes de `before`.
+
+        Args:
+            symbol (str): Símbolo
+            before (str, optional): Timestamp ISO limite do aquecimento
+
+        Returns:
+            IndicatorSet: Estado do símbolo
+        """
+        state = self.live_states.get(symbol)
+        if state is not None:
+            return state
+
+        state = self.state_store.load(symbol)
+        if state is None:
+            state = IndicatorSet.default()
+            try:
+                conn = sqlite3.connect(db.db_path)
+                rows = conn.execute('''
+                    SELECT price, timestamp FROM prices
+                    WHERE symbol = ? AND timestamp < ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                ''', (symbol, before or datetime.now().isoformat(), self.warmup_prices)).fetchall()
+                conn.close()
+                for price, timestamp in reversed(rows):
+                    state.update(price, timestamp)
+            except Exception as e:
+                print(f"❌ Erro ao aquecer indicadores de {symbol}: {e}")
+
+        self.live_states[symbol] = state
+        return state
+
+    def on_price(self, symbol, price, timestamp=None):
+        """
+        Atualiza os indicadores de um símbolo com um preço novo em O(1)
+
+        Compatível com DataCollector.add_price_listener. Preços com
+        timestamp não posterior ao último consumido são ignorados.
+
+        Args:
+            symbol (str): Símbolo
+            price (float): Preço
+            timestamp (str, optional): Timestamp ISO do preço
+
+        Returns:
+            dict: Resultado no formato de analyze_symbol
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        state = self.get_live_state(symbol, before=timestamp)
+        is_new = state.last_timestamp is None or timestamp > state.last_timestamp
+        if is_new:
+            state.update(price, timestamp)
+            self.state_store.save(symbol, state)
+
+        values = state.values()
+        rsi = values['rsi'] if values['rsi'] is not None else 50
+        result = self.build_result(symbol, float(price), values['sma_5'], values['sma_20'], rsi)
+
+        if is_new and result['strength'] >= 7:
+            self.save_signal(result)
+
+        return result
+
     def analyze_trend(self, current_price, sma_5, sma_20):
         """Análise de tendência com médias móveis"""
         if not sma_5 or not sma_20:
@@ -243,59 +318,163 @@ class TradingStrategies:
         
         return target_price, stop_loss
     
-    def save_signal(self, signal_data):
+    def save_signal(self, signal_data, strategy_name='SMA + RSI'):
         """Salva sinal no banco"""
+        if self.save_signals([(signal_data, strategy_name)]):
+            print(f"💾 Sinal salvo: {signal_data['symbol']} {signal_data['signal']} (força: {signal_data['strength']})")
+    
+    def save_signals(self, signals):
+        """
+        Salva vários sinais em uma única transação
+        
+        Args:
+            signals (list): Pares (resultado da análise, nome da estratégia)
+        
+        Returns:
+            int: Sinais gravados
+        """
+        if not signals:
+            return 0
         try:
             conn = sqlite3.connect(db.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            conn.executemany('''
                 INSERT INTO trading_signals 
                 (symbol, signal_type, signal_strength, current_price, target_price, 
                  stop_loss, strategy_name, indicators, reasoning)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            ''', [(
                 signal_data['symbol'],
                 signal_data['signal'],
                 signal_data['strength'],
                 signal_data['current_price'],
                 signal_data['target_price'],
                 signal_data['stop_loss'],
-                'SMA + RSI',
+                strategy_name,
                 str(signal_data['indicators']),
                 signal_data['reasoning']
-            ))
-            
+            ) for signal_data, strategy_name in signals])
             conn.commit()
             conn.close()
-            
-            print(f"💾 Sinal salvo: {signal_data['symbol']} {signal_data['signal']} (força: {signal_data['strength']})")
+            return len(signals)
         except Exception as e:
             print(f"❌ Erro ao salvar sinal: {e}")
+            return 0
     
-    def analyze_all_symbols(self):
-        """Analisa todos os símbolos"""
-        symbols = ['PETR4.SA', 'VALE3.SA']
+    def evaluate_strategies(self, bars):
+        """
+        Executa todas as estratégias configuradas sobre o universo
+
+        Cada estratégia avalia a matriz inteira de uma vez; só a última
+        coluna de cada saída é convertida em resultados por ativo.
+
+        Args:
+            bars (dict): Matriz de preços (ver strategies.bars_from_histories)
+
+        Returns:
+            dict: símbolo -> {nome da estratégia: resultado no formato de analyze_symbol}
+        """
+        symbols = bars['symbols']
+        close = bars['close']
+        current = close[:, -1] if close.size else np.full(len(symbols), np.nan)
+        observations = bars.get('observations', np.full(len(symbols), close.shape[-1]))
+        results = {symbol: {} for symbol in symbols}
+
+        for strategy in self.strategies:
+            output = strategy.evaluate(bars)
+            signal = output['signal'][:, -1]
+            strength = output['strength'][:, -1]
+            last_values = {name: values[:, -1] for name, values in output['indicators'].items()}
+            target, stop = strategy.targets(current, signal)
+
+            for row, symbol in enumerate(symbols):
+                if observations[row] < 5 or not np.isfinite(current[row]):
+                    results[symbol][strategy.name] = {
+                        'symbol': symbol, 'signal': 'NEUTRO', 'strength': 5, 'current_price': 0.0,
+                        'target_price': None, 'stop_loss': None, 'strategy': strategy.display_name,
+                        'reasoning': 'Dados insuficientes para análise', 'indicators': {}
+                    }
+                    continue
+                values = {name: float(v[row]) for name, v in last_values.items()}
+                results[symbol][strategy.name] = {
+                    'symbol': symbol,
+                    'signal': SIGNAL_LABELS[int(signal[row])],
+                    'strength': int(strength[row]),
+                    'current_price': round(float(current[row]), 2),
+                    'target_price': round(float(target[row]), 2) if np.isfinite(target[row]) else None,
+                    'stop_loss': round(float(stop[row]), 2) if np.isfinite(stop[row]) else None,
+                    'strategy': strategy.display_name,
+                    'reasoning': strategy.explain(values, signal[row], strength[row]),
+                    'indicators': {name: round(v, 2) if np.isfinite(v) else None for name, v in values.items()}
+                }
+        return results
+
+    def analyze_all_symbols(self, symbols=None):
+        """
+        Analisa o universo com todas as estratégias configuradas
+
+        Os históricos vêm em uma única consulta, a matriz de preços é
+        montada sem laço por ativo, cada estratégia avalia o universo de uma
+        vez e os sinais fortes são gravados em lote. Ativos sem preço novo
+        desde a última análise reaproveitam os resultados do cache de
+        indicadores; só os demais são carregados, avaliados e têm seus
+        sinais fortes gravados.
+
+        Args:
+            symbols (list, optional): Símbolos (padrão: config.UNIVERSE)
+
+        Returns:
+            dict: símbolo -> resultado mais forte entre as estratégias, com
+                os resultados de cada uma em 'by_strategy'
+        """
+        symbols = list(symbols or config.UNIVERSE)
+        print(f"🔍 Analisando {len(symbols)} símbolos...")
+
+        watermarks = db.get_latest_timestamps(symbols)
+        evaluated = {}
+        for symbol in symbols:
+            cached = {strategy.name: self.indicator_cache.get(symbol, f"strategy:{strategy.name}",
+                                                              strategy.params, watermarks.get(symbol))
+                      for strategy in self.strategies}
+            if all(result is not None for result in cached.values()):
+                evaluated[symbol] = cached
+
+        stale = [symbol for symbol in symbols if symbol not in evaluated]
+        if stale:
+            histories = db.get_price_histories(stale, limit=config.STRATEGY_LOOKBACK)
+            bars = bars_from_frame(histories, stale, config.STRATEGY_LOOKBACK)
+            evaluated.update(self.evaluate_strategies(bars))
+            for symbol in stale:
+                if symbol not in watermarks:
+                    continue
+                for strategy in self.strategies:
+                    self.indicator_cache.put(symbol, f"strategy:{strategy.name}", strategy.params,
+                                             watermarks[symbol], evaluated[symbol][strategy.name])
+
+        signal_emoji = {
+            'COMPRA': '🟢',
+            'VENDA': '🔴',
+            'NEUTRO': '🟡',
+            'ERRO': '❌'
+        }
         results = {}
-        
-        print("🔍 Analisando símbolos...")
-        
+        strong = []
+        fresh = set(stale)
         for symbol in symbols:
-            print(f"  📊 Analisando {symbol}...")
-            analysis = self.analyze_symbol(symbol)
-            results[symbol] = analysis
-            
-            # Log do resultado
-            signal_emoji = {
-                'COMPRA': '🟢',
-                'VENDA': '🔴',
-                'NEUTRO': '🟡',
-                'ERRO': '❌'
-            }
-            
+            by_strategy = evaluated[symbol]
+            # Sinais vindos do cache já foram gravados na análise que os calculou
+            if symbol in fresh:
+                strong.extend((analysis, analysis['strategy']) for analysis in by_strategy.values()
+                              if analysis['strength'] >= 7)
+            best = max(by_strategy.values(), key=lambda a: (a['signal'] != 'NEUTRO', a['strength']))
+            results[symbol] = {**best, 'by_strategy': by_strategy}
+
+        saved = self.save_signals(strong)
+        for analysis, strategy_name in strong:
             emoji = signal_emoji.get(analysis['signal'], '⚪')
-            print(f"    {emoji} {analysis['signal']} (força: {analysis['strength']}/10)")
-        
+            print(f"  {emoji} {analysis['symbol']}: {analysis['signal']} (força: {analysis['strength']}/10) - {strategy_name}")
+        print(f"✅ {len(symbols)} símbolos analisados ({len(symbols) - len(stale)} do cache), "
+              f"{saved} sinais fortes salvos")
+
         return results
     
     def get_signals_history(self, limit=10):
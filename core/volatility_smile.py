@@ -0,0 +1,93 @@
+"""
+ProTrading Engine - Ajuste de Smile de Volatilidade
+Ajuste quadrático da IV em log-moneyness, resolvido para todos os
+vencimentos de uma chain de uma só vez (equações normais agrupadas)
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+
+SMILE_DEGREE = 2
+RIDGE = 1e-8
+
+
+def fit_smile(log_moneyness, iv, group_ids, n_groups=None, weights=None):
+    """
+    Ajusta iv = a + b*x + c*x² por grupo (normalmente por vencimento)
+
+    Todos os grupos são resolvidos em um único `np.linalg.solve` sobre
+    matrizes 3x3 empilhadas; grupos com menos de 3 pontos degradam para
+    um ajuste com regularização mínima.
+
+    Args:
+        log_moneyness (array_like): x = ln(K / F)
+        iv (array_like): Volatilidades implícitas
+        group_ids (array_like): Índice inteiro do grupo de cada ponto
+        n_groups (int, optional): Número de grupos
+        weights (array_like, optional): Pesos dos pontos
+
+    Returns:
+        np.ndarray: Coeficientes (n_groups, 3) em ordem [a, b, c]
+    """
+    x = np.asarray(log_moneyness, dtype=float)
+    y = np.asarray(iv, dtype=float)
+    g = np.asarray(group_ids, dtype=int)
+    w = np.ones_like(x) if weights is None else np.asarray(weights, dtype=float)
+    if n_groups is None:
+        n_groups = int(g.max()) + 1 if g.size else 0
+
+    valid = np.isfinite(x) & np.isfinite(y) & np.isfinite(w)
+    x, y, g, w = x[valid], y[valid], g[valid], w[valid]
+
+    powers = np.arange(2 * SMILE_DEGREE + 1)
+    x_pow = x[:, None] ** powers  # (n, 5)
+    moments = np.stack([np.bincount(g, weights=w * x_pow[:, k], minlength=n_groups) for k in powers], axis=1)
+    rhs = np.stack([np.bincount(g, weights=w * x_pow[:, k] * y, minlength=n_groups)
+                    for k in range(SMILE_DEGREE + 1)], axis=1)
+
+    idx = np.arange(SMILE_DEGREE + 1)
+    normal = moments[:, idx[:, None] + idx[None, :]]  # (n_groups, 3, 3)
+
+    # Regularização mais forte nos termos de curvatura para grupos pequenos
+    counts = moments[:, 0]
+    scale = np.maximum(counts, 1.0)[:, None]
+    penalty = np.where(counts[:, None] >= SMILE_DEGREE + 1, RIDGE, 1e-2) * scale
+    penalty = penalty * np.array([0.0, 1.0, 1.0])
+    penalty[:, 0] += RIDGE
+    normal = normal + penalty[:, :, None] * np.eye(SMILE_DEGREE + 1)[None, :, :]
+
+    return np.linalg.solve(normal, rhs[:, :, None])[:, :, 0]
+
+
+def evaluate_smile(coefficients, group_ids, log_moneyness):
+    """
+    Avalia o smile ajustado
+
+    Args:
+        coefficients (np.ndarray): Saída de `fit_smile`
+        group_ids (array_like): Grupo de cada ponto
+        log_moneyness (array_like): x = ln(K / F)
+
+    Returns:
+        np.ndarray: IV ajustada
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    g = np.asarray(group_ids, dtype=int)
+    x = np.asarray(log_moneyness, dtype=float)
+    c = coefficients[g]
+    return c[..., 0] + c[..., 1] * x + c[..., 2] * x * x
+
+
+def forward_log_moneyness(strikes, spot, T, r, q=0.0):
+    """
+    Log-moneyness em relação ao forward
+
+    Args:
+        strikes, T, r, q (array_like): Parâmetros
+        spot (float): Preço do ativo
+
+    Returns:
+        np.ndarray: ln(K / F)
+    """
+    forward = spot * np.exp((np.asarray(r, dtype=float) - q) * np.asarray(T, dtype=float))
+    return np.log(np.asarray(strikes, dtype=float) / forward)
@@ -0,0 +1,265 @@
+"""
+ProTrading Engine - Walk-Forward e Validação Cruzada de Estratégias
+Janelas móveis (ou ancoradas) de otimização in-sample e avaliação
+out-of-sample, k-fold purgado com embargo e métricas agregadas de
+robustez, reaproveitando indicadores e sinais entre as janelas
+Desenvolvido por: Deverson
+"""
+
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from core.backtester import VectorizedBacktester, performance_stats, sma_rsi_signals
+from core.shared_prices import PRICE_FIELDS, shared_price_pool, worker_context
+
+
+def walk_forward_windows(n_bars, train_size, test_size, step=None, anchored=False, purge=0):
+    """
+    Janelas de walk-forward
+
+    Args:
+        n_bars (int): Barras da série
+        train_size (int): Barras in-sample
+        test_size (int): Barras out-of-sample
+        step (int, optional): Avanço entre janelas (padrão: test_size)
+        anchored (bool): In-sample sempre a partir da primeira barra
+        purge (int): Barras removidas do fim do in-sample antes do teste
+
+    Returns:
+        list: dicts fold, train e test (listas de segmentos (início, fim))
+    """
+    step = step or test_size
+    windows = []
+    test_start = train_size
+    while test_start + test_size <= n_bars:
+        train_start = 0 if anchored else test_start - train_size
+        train_end = test_start - purge
+        if train_end > train_start:
+            windows.append({'fold': len(windows), 'train': [(train_start, train_end)],
+                            'test': [(test_start, test_start + test_size)]})
+        test_start += step
+    return windows
+
+
+def purged_kfold_windows(n_bars, n_splits=5, purge=0, embargo=0):
+    """
+    K-fold em blocos contíguos com purga e embargo
+
+    O in-sample de cada dobra é tudo fora do bloco de teste, menos `purge`
+    barras antes do teste (sinais cuja janela invade o teste) e `embargo`
+    barras depois dele (operações abertas no teste ainda em curso).
+
+    Returns:
+        list: dicts fold, train e test (listas de segmentos (início, fim))
+    """
+    bounds = np.linspace(0, n_bars, n_splits + 1).astype(int).tolist()
+    windows = []
+    for fold, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        train = [(0, max(0, start - purge)), (min(n_bars, end + embargo), n_bars)]
+        windows.append({'fold': fold, 'train': [(a, b) for a, b in train if b > a], 'test': [(start, end)]})
+    return windows
+
+
+def _slice(array, start, end):
+    return None if array is None else array[:, start:end]
+
+
+def window_backtest(backtester, arrays, signal, strength, segments, target_pct, stop_pct):
+    """
+    Backtest de uma janela (um ou mais segmentos contíguos)
+
+    Os sinais já vêm calculados sobre a série inteira; cada segmento é
+    simulado começando sem posição e os retornos são concatenados.
+
+    Returns:
+        tuple: (estatísticas, retornos da carteira por barra)
+    """
+    returns, trades, exposure, bars = [], [], 0.0, 0
+    for start, end in segments:
+        result = backtester.simulate(
+            arrays['close'][:, start:end], signal[:, start:end], strength[:, start:end],
+            _slice(arrays.get('high'), start, end), _slice(arrays.get('low'), start, end),
+            _slice(arrays.get('open'), start, end), target_pct, stop_pct)
+        returns.append(result.returns)
+        trades.append(result.trades)
+        exposure += (result.positions != 0).mean() * (end - start)
+        bars += end - start
+
+    returns = np.concatenate(returns)
+    equity = backtester.initial_capital * np.concatenate([[1.0], np.cumprod(1 + returns)])
+    trades = pd.concat(trades, ignore_index=True)
+    stats = performance_stats(equity, returns, trades, exposure / max(bars, 1), backtester.periods_per_year)
+    return stats, returns
+
+
+def _evaluate_windows(arrays, backtester, cache, params, windows, metric):
+    """Sinais uma vez na série inteira, métricas de cada janela in/out-of-sample"""
+    signal, strength = sma_rsi_signals(arrays['close'], params, cache)
+    target, stop = params.get('target_pct', 0.05), params.get('stop_pct', 0.03)
+    rows = []
+    for window in windows:
+        for sample in ('train', 'test'):
+            stats, _ = window_backtest(backtester, arrays, signal, strength, window[sample], target, stop)
+            rows.append((window['fold'], sample, stats[metric], stats['trades'], stats['total_return_pct']))
+    return rows
+
+
+def _evaluate_windows_chunk(task):
+    """Avalia um lote de combinações em todas as janelas (processo trabalhador)"""
+    chunk, windows, metric = task
+    arrays, backtester, cache = worker_context()
+    return [(index, params, _evaluate_windows(arrays, backtester, cache, params, windows, metric))
+            for index, params in chunk]
+
+
+class WalkForwardResult:
+    """Resultado de uma análise walk-forward / k-fold"""
+
+    def __init__(self, folds, scores, oos_returns, summary, initial_capital):
+        self.folds = folds
+        self.scores = scores
+        self.oos_returns = oos_returns
+        self.summary = summary
+        self.initial_capital = initial_capital
+
+    def oos_equity(self):
+        """Curva out-of-sample encadeada (parâmetros escolhidos em cada dobra)"""
+        return self.initial_capital * np.cumprod(1 + self.oos_returns)
+
+
+class WalkForwardAnalyzer:
+    """
+    Walk-forward / validação cruzada de parâmetros
+
+    Cada combinação tem indicadores e sinais calculados uma única vez na
+    série completa (indicadores são causais, então a fatia de uma janela é
+    idêntica a recalculá-la com aquecimento) e o cache de SMA/RSI por
+    período é compartilhado entre combinações. As janelas só repetem a
+    simulação de posições. Combinações vão para o pool em lotes com os
+    preços em memória compartilhada, como no ParameterOptimizer.
+    """
+
+    def __init__(self, metric='sharpe', min_trades=10, workers=1, chunk_size=8, backtester_options=None):
+        """
+        Inicializa a análise
+
+        Args:
+            metric (str): Estatística otimizada in-sample (maior = melhor)
+            min_trades (int): Trades mínimos in-sample para uma combinação ser elegível
+            workers (int): Processos (1 = execução no processo atual)
+            chunk_size (int): Combinações por tarefa
+            backtester_options (dict, optional): Argumentos do VectorizedBacktester
+        """
+        self.metric = metric
+        self.min_trades = min_trades
+        self.workers = max(1, int(workers))
+        self.chunk_size = max(1, int(chunk_size))
+        self.backtester_options = backtester_options or {}
+        self.elapsed = 0.0
+
+    def run(self, bars, combinations, windows):
+        """
+        Executa a análise
+
+        Args:
+            bars (dict): Arrays de preços (close e opcionalmente high, low, open)
+            combinations (list): Combinações de parâmetros candidatas
+            windows (list): Janelas (walk_forward_windows ou purged_kfold_windows)
+
+        Returns:
+            WalkForwardResult: Dobras, matriz de scores, curva OOS e resumo
+        """
+        start = time.perf_counter()
+        arrays = {field: bars.get(field) for field in PRICE_FIELDS}
+        arrays['close'] = np.atleast_2d(np.asarray(arrays['close'], dtype=float))
+        backtester = VectorizedBacktester(**self.backtester_options)
+        cache = {}
+
+        indexed = list(enumerate(combinations))
+        chunks = [indexed[i:i + self.chunk_size] for i in range(0, len(indexed), self.chunk_size)]
+        evaluated = []
+        if self.workers == 1:
+            for chunk in chunks:
+                evaluated.extend((i, p, _evaluate_windows(arrays, backtester, cache, p, windows, self.metric))
+                                 for i, p in chunk)
+        else:
+            with shared_price_pool(arrays, self.workers, self.backtester_options) as pool:
+                futures = [pool.submit(_evaluate_windows_chunk, (chunk, windows, self.metric))
+                           for chunk in chunks]
+                for future in as_completed(futures):
+                    evaluated.extend(future.result())
+
+        scores = pd.DataFrame(
+            [(index, fold, sample, value, trades, total) for index, _, rows in evaluated
+             for fold, sample, value, trades, total in rows],
+            columns=['combination', 'fold', 'sample', 'metric', 'trades', 'total_return_pct'])
+        params_by_index = {index: params for index, params, _ in evaluated}
+
+        folds, oos_returns = self._select(scores, params_by_index, windows, arrays, backtester, cache)
+        summary = self._summary(scores, folds)
+        self.elapsed = time.perf_counter() - start
+        return WalkForwardResult(folds, scores, oos_returns, summary, backtester.initial_capital)
+
+    def _select(self, scores, params_by_index, windows, arrays, backtester, cache):
+        """Melhor combinação in-sample de cada dobra e sua janela out-of-sample"""
+        train = scores[scores['sample'] == 'train']
+        test = scores[scores['sample'] == 'test'].set_index(['fold', 'combination'])
+        rows, oos_returns = [], []
+        for window in windows:
+            candidates = train[(train['fold'] == window['fold']) & (train['trades'] >= self.min_trades)]
+            candidates = candidates.dropna(subset=['metric'])
+            if candidates.empty:
+                continue
+            best = candidates.sort_values(['metric', 'combination'], ascending=[False, True]).iloc[0]
+            index = int(best['combination'])
+            params = params_by_index[index]
+
+            signal, strength = sma_rsi_signals(arrays['close'], params, cache)
+            _, returns = window_backtest(backtester, arrays, signal, strength, window['test'],
+                                         params.get('target_pct', 0.05), params.get('stop_pct', 0.03))
+            oos_returns.append(returns)
+            oos = test.loc[(window['fold'], index)]
+            rows.append({
+                'fold': window['fold'],
+                'train_bars': sum(b - a for a, b in window['train']),
+                'test_start': window['test'][0][0],
+                'test_end': window['test'][-1][1],
+                'combination': index,
+                'is_metric': best['metric'],
+                'oos_metric': oos['metric'],
+                'oos_return_pct': oos['total_return_pct'],
+                'oos_trades': int(oos['trades']),
+                **params,
+            })
+        returns = np.concatenate(oos_returns) if oos_returns else np.array([])
+        return pd.DataFrame(rows), returns
+
+    def _summary(self, scores, folds):
+        """Métricas agregadas de robustez"""
+        if folds.empty:
+            return {'folds': 0}
+        oos_growth = np.prod(1 + folds['oos_return_pct'].to_numpy() / 100)
+        mean_is = folds['is_metric'].mean()
+        mean_oos = folds['oos_metric'].mean()
+
+        # Correlação de postos IS x OOS entre as combinações de cada dobra
+        pivot = scores.pivot_table(index=['fold', 'combination'], columns='sample', values='metric')
+        correlations = [group['train'].rank().corr(group['test'].rank())
+                        for _, group in pivot.dropna().groupby(level='fold') if len(group) > 2]
+        correlations = [c for c in correlations if np.isfinite(c)]
+
+        modal = folds['combination'].mode()
+        return {
+            'folds': len(folds),
+            'oos_total_return_pct': round(float((oos_growth - 1) * 100), 2),
+            'mean_is_metric': round(float(mean_is), 3),
+            'mean_oos_metric': round(float(mean_oos), 3) if np.isfinite(mean_oos) else None,
+            # Eficiência walk-forward: fração do desempenho IS mantida fora da amostra
+            'efficiency': round(float(mean_oos / mean_is), 3) if mean_is > 0 and np.isfinite(mean_oos) else None,
+            'profitable_folds_pct': round(float((folds['oos_return_pct'] > 0).mean() * 100), 1),
+            'parameter_stability': round(float((folds['combination'] == modal.iloc[0]).mean()), 3),
+            'is_oos_rank_corr': round(float(np.mean(correlations)), 3) if correlations else None,
+        }
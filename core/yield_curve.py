@@ -0,0 +1,263 @@
+"""
+ProTrading Engine - Curva de Juros DI
+Curva pré construída a partir dos futuros de DI1 (arquivo local ou
+fonte simulada), interpolação flat-forward em dias úteis e tabela de
+taxas por vencimento cacheada por snapshot da curva
+Desenvolvido por: Deverson
+"""
+
+import os
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR, get_calendar
+
+# Vértices simulados (dias úteis -> taxa DI anual base 252) quando não há arquivo
+STUB_DI_VERTICES = {
+    1: 0.1065,
+    21: 0.1068,
+    63: 0.1075,
+    126: 0.1090,
+    252: 0.1115,
+    504: 0.1160,
+    756: 0.1185,
+    1260: 0.1210,
+}
+
+DI_NOTIONAL = 100000.0  # PU de vencimento do DI1
+
+
+class YieldCurve:
+    """
+    Curva de fatores de desconto em dias úteis
+
+    Flat-forward: o log do fator de desconto é linear em dias úteis entre
+    vértices; antes do primeiro vértice vale a taxa do primeiro e após o
+    último o forward do último trecho é estendido. Uma instância é um
+    snapshot imutável da curva - a tabela de taxas por vencimento do
+    calendário é preenchida uma vez e consultada por indexação.
+    """
+
+    def __init__(self, business_days, di_rates, reference_date=None, calendar=None, source='stub'):
+        """
+        Inicializa a curva
+
+        Args:
+            business_days (array_like): Dias úteis de cada vértice
+            di_rates (array_like): Taxas DI anuais (base 252, capitalização composta)
+            reference_date (date, optional): Data base (padrão: hoje)
+            calendar (TradingCalendar, optional): Calendário (padrão: B3)
+            source (str): Origem da curva ('stub' ou caminho do arquivo)
+        """
+        days = np.asarray(business_days, dtype=float)
+        rates = np.asarray(di_rates, dtype=float)
+        order = np.argsort(days)
+        days, rates = days[order], rates[order]
+        keep = days > 0
+        if not keep.any():
+            raise ValueError("Curva DI sem vértices válidos")
+
+        self.calendar = calendar or get_calendar('B3')
+        self.reference_date = reference_date or date.today()
+        self.source = source
+        self.business_days = days[keep]
+        self.di_rates = rates[keep]
+
+        # -ln(DF) nos vértices, com o vértice (0, 0) na frente
+        log_df = self.business_days / BUSINESS_DAYS_PER_YEAR * np.log1p(self.di_rates)
+        self._nodes = np.concatenate([[0.0], self.business_days])
+        self._log_df = np.concatenate([[0.0], log_df])
+        self._forwards = np.diff(self._log_df) / np.diff(self._nodes)  # por dia útil
+
+        self._expiry_rates = {}  # mercado -> (índice de dias úteis da data base, taxas por id)
+
+    @property
+    def snapshot_key(self):
+        """Identifica o snapshot (origem, data base e vértices)"""
+        return (self.source, self.reference_date, self.business_days.tobytes(), self.di_rates.tobytes())
+
+    def _neg_log_df(self, T):
+        """-ln(DF) flat-forward para T em anos (dias úteis / 252)"""
+        du = np.maximum(np.asarray(T, dtype=float), 0.0) * BUSINESS_DAYS_PER_YEAR
+        segment = np.clip(np.searchsorted(self._nodes, du, side='right') - 1, 0, len(self._forwards) - 1)
+        return self._log_df[segment] + self._forwards[segment] * (du - self._nodes[segment])
+
+    def discount_factor(self, T):
+        """
+        Fatores de desconto - vetorizado
+
+        Args:
+            T (array_like): Prazos em anos (dias úteis / 252)
+
+        Returns:
+            np.ndarray: DF(T)
+        """
+        return np.exp(-self._neg_log_df(T))
+
+    def zero_rate(self, T):
+        """
+        Taxas zero contínuas (DF = e^(-rT)), prontas para Black-Scholes
+
+        Args:
+            T (array_like): Prazos em anos (dias úteis / 252)
+
+        Returns:
+            np.ndarray: Taxas contínuas
+        """
+        T = np.asarray(T, dtype=float)
+        short = np.maximum(T, 1.0 / BUSINESS_DAYS_PER_YEAR)
+        return np.where(T > 0, self._neg_log_df(short) / short, self._forwards[0] * BUSINESS_DAYS_PER_YEAR)
+
+    def di_rate(self, T):
+        """Taxas no padrão DI (anual composta, base 252) - vetorizado"""
+        return np.expm1(self.zero_rate(T))
+
+    def expiry_rates(self, expiry_ids, calendar=None):
+        """
+        Taxas zero contínuas por vencimento do calendário
+
+        A tabela é indexada pelos ids de `TradingCalendar.register_expiries`
+        e só é estendida quando surgem vencimentos novos; a consulta de
+        uma chain inteira é uma única indexação. Cada calendário tem sua
+        tabela, com o prazo contado nos seus próprios dias úteis (o mesmo
+        de `time_to_expiry`).
+
+        Args:
+            expiry_ids (array_like): Ids de vencimento do calendário
+            calendar (TradingCalendar, optional): Calendário dos ids (padrão: o da curva)
+
+        Returns:
+            np.ndarray: Taxas por opção
+        """
+        calendar = calendar or self.calendar
+        ids = np.asarray(expiry_ids, dtype=int)
+        table = calendar.expiry_business_index
+        reference, rates = self._expiry_rates.get(calendar.market, (None, np.array([], dtype=float)))
+        if reference is None:
+            reference = float(np.busday_count(
+                np.datetime64('2000-01-01', 'D'), np.datetime64(self.reference_date, 'D'),
+                busdaycal=calendar.busdaycal
+            ))
+        if len(table) > len(rates):
+            new = table[len(rates):]
+            T = np.maximum(new - reference, 0.0) / BUSINESS_DAYS_PER_YEAR
+            rates = np.concatenate([rates, self.zero_rate(T)])
+        self._expiry_rates[calendar.market] = (reference, rates)
+        return rates[ids]
+
+    @classmethod
+    def from_di_futures(cls, maturities, di_rates=None, pu=None, reference_date=None,
+                        calendar=None, source='stub'):
+        """
+        Constrói a curva a partir dos contratos de DI1
+
+        Cada DI1 é um zero-cupom: DF = PU / 100.000 ou (1 + taxa)^(-du/252),
+        com du = dias úteis entre a data base e o vencimento.
+
+        Args:
+            maturities (array_like): Datas de vencimento dos contratos
+            di_rates (array_like, optional): Taxas negociadas (decimal)
+            pu (array_like, optional): Preços unitários (alternativa às taxas)
+            reference_date (date, optional): Data base (padrão: hoje)
+            calendar (TradingCalendar, optional): Calendário (padrão: B3)
+            source (str): Origem dos dados
+
+        Returns:
+            YieldCurve: Curva construída
+        """
+        calendar = calendar or get_calendar('B3')
+        reference_date = reference_date or date.today()
+        du = calendar.business_days_between(
+            np.datetime64(reference_date, 'D'), np.asarray(maturities, dtype='datetime64[D]')
+        ).astype(float)
+
+        if di_rates is None:
+            if pu is None:
+                raise ValueError("Informe as taxas ou os PUs dos contratos DI1")
+            df = np.asarray(pu, dtype=float) / DI_NOTIONAL
+            di_rates = np.power(df, -BUSINESS_DAYS_PER_YEAR / np.maximum(du, 1.0)) - 1.0
+
+        return cls(du, di_rates, reference_date=reference_date, calendar=calendar, source=source)
+
+
+def stub_di_quotes(reference_date=None, calendar=None):
+    """
+    Contratos DI1 simulados a partir de STUB_DI_VERTICES
+
+    Returns:
+        pd.DataFrame: Colunas maturity e rate
+    """
+    calendar = calendar or get_calendar('B3')
+    reference_date = reference_date or date.today()
+    maturities = [calendar.add_business_days(reference_date, du) for du in STUB_DI_VERTICES]
+    return pd.DataFrame({'maturity': maturities, 'rate': list(STUB_DI_VERTICES.values())})
+
+
+def load_di_curve(path=None, reference_date=None, calendar=None):
+    """
+    Carrega a curva DI de um CSV local ou usa a fonte simulada
+
+    O CSV deve ter a coluna `maturity` (data de vencimento do contrato) e
+    `rate` (taxa decimal, ex: 0.1075) ou `pu`.
+
+    Args:
+        path (str, optional): Caminho do arquivo
+        reference_date (date, optional): Data base (padrão: hoje)
+        calendar (TradingCalendar, optional): Calendário (padrão: B3)
+
+    Returns:
+        YieldCurve: Curva construída
+    """
+    if path and os.path.exists(path):
+        try:
+            quotes = pd.read_csv(path)
+            return YieldCurve.from_di_futures(
+                pd.to_datetime(quotes['maturity']).to_numpy(dtype='datetime64[D]'),
+                di_rates=quotes['rate'].to_numpy() if 'rate' in quotes else None,
+                pu=quotes['pu'].to_numpy() if 'pu' in quotes else None,
+                reference_date=reference_date, calendar=calendar, source=path
+            )
+        except Exception as e:
+            print(f"❌ Erro ao carregar curva DI de {path}: {e} - usando curva simulada")
+
+    quotes = stub_di_quotes(reference_date, calendar)
+    return YieldCurve.from_di_futures(
+        quotes['maturity'].to_numpy(dtype='datetime64[D]'), di_rates=quotes['rate'].to_numpy(),
+        reference_date=reference_date, calendar=calendar, source='stub'
+    )
+
+
+_curves = {}
+
+
+def get_yield_curve(path=None, reference_date=None):
+    """
+    Curva DI compartilhada, reconstruída apenas quando o snapshot muda
+
+    O snapshot é identificado pela data base e pela data de modificação
+    do arquivo; chamadas repetidas no mesmo dia devolvem a mesma instância
+    (com a tabela de taxas por vencimento já preenchida).
+
+    Args:
+        path (str, optional): CSV de contratos DI1
+        reference_date (date, optional): Data base (padrão: hoje)
+
+    Returns:
+        YieldCurve: Curva
+    """
+    reference_date = reference_date or date.today()
+    if isinstance(reference_date, datetime):
+        reference_date = reference_date.date()
+    mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+    key = (path, mtime, reference_date)
+
+    curve = _curves.get(key)
+    if curve is None:
+        curve = load_di_curve(path, reference_date)
+        # Mantém apenas o snapshot atual de cada arquivo
+        for stale in [k for k in _curves if k[0] == path]:
+            del _curves[stale]
+        _curves[key] = curve
+    return curve
@@ -242,44 +242,7 @@ if st.sidebar.button("📊 Coletar Opções", type="secondary"):
         with st.spinner("Coletando dados de opções..."):
             try:
                 symbols = ["PETR4", "VALE3"]
-                total_options = 0
-                
-                for symbol in symbols:
-                    # Gerar dados mock de opções
-                    import random
-                    from datetime import datetime, timedelta
-                    
-                    # Gerar algumas opções mock
-                    strikes = [20, 22, 24, 26, 28, 30]
-                    expiry = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
-                    
-                    conn = db._get_connection() if hasattr(db, '_get_connection') else None
-                    if not conn:
-                        import sqlite3
-                        conn = sqlite3.connect(db.db_path)
-                    
-                    cursor = conn.cursor()
-                    
-                    for strike in strikes:
-                        for option_type in ['CALL', 'PUT']:
-                            cursor.execute('''
-                                INSERT INTO options (underlying, strike, expiry_date, option_type, price, bid, ask, volume, implied_volatility)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                symbol,
-                                strike,
-                                expiry,
-                                option_type,
-                                round(random.uniform(1, 5), 2),  # price
-                                round(random.uniform(0.5, 3), 2),  # bid
-                                round(random.uniform(2, 6), 2),  # ask
-                                random.randint(100, 1000),  # volume
-                                round(random.uniform(0.2, 0.8), 3)  # IV
-                            ))
-                            total_options += 1
-                    
-                    conn.commit()
-                    conn.close()
+                total_options = options_collector.collect_all_options(symbols)
                 
                 st.success(f"✅ {total_options} opções coletadas e salvas!")
                 
@@ -433,16 +396,12 @@ with tab2:
     underlying_symbol = st.selectbox("Selecione o ativo subjacente:", ["PETR4", "VALE3"], key="options_selector")
     
     try:
-        # Buscar opções do banco
-        options_data = db.get_options_by_underlying(underlying_symbol)
+        # Buscar chain vigente (consultas indexadas com cache em memória)
+        df_options = options_collector.query_options(underlying_symbol)
         
-        if options_data:
-            # Converter para DataFrame
-            df_options = pd.DataFrame(options_data)
-            
-            # Separar calls e puts
-            calls = df_options[df_options['option_type'] == 'CALL']
-            puts = df_options[df_options['option_type'] == 'PUT']
+        if not df_options.empty:
+            calls = options_collector.query_options(underlying_symbol, types=['CALL'])
+            puts = options_collector.query_options(underlying_symbol, types=['PUT'])
             
             col1, col2 = st.columns(2)
             
@@ -484,6 +443,45 @@ with tab2:
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
+
+            # Max pain e open interest por strike (cacheados por snapshot)
+            max_pain_df = options_collector.get_max_pain(underlying_symbol)
+            if not max_pain_df.empty:
+                st.markdown("### 🎯 Max Pain e Open Interest")
+
+                expiry = st.selectbox("Vencimento:", max_pain_df['expiry_date'].tolist(), key="max_pain_expiry")
+                row = max_pain_df[max_pain_df['expiry_date'] == expiry].iloc[0]
+
+                col1, col2, col3 = st.columns(3)
+                col1.metric("🎯 Max Pain", f"R$ {row['max_pain']:.2f}")
+                col2.metric("📞 OI Calls", f"{row['call_oi']:,.0f}")
+                col3.metric("📉 OI Puts", f"{row['put_oi']:,.0f}", f"P/C {row['put_call_oi_ratio']:.2f}")
+
+                profile = options_collector.get_oi_profile(underlying_symbol, expiry)
+                fig = px.bar(
+                    profile,
+                    x='strike',
+                    y=['call_oi', 'put_oi'],
+                    barmode='group',
+                    title=f'Open Interest por Strike - {underlying_symbol} {expiry}',
+                    labels={'strike': 'Strike Price', 'value': 'Open Interest', 'variable': 'Tipo'}
+                )
+                fig.add_vline(x=row['max_pain'], line_dash="dash", annotation_text="Max Pain")
+                st.plotly_chart(fig, use_container_width=True)
+
+            # Cone de probabilidade implícito (cacheado por snapshot)
+            cone = options_collector.get_probability_cone(underlying_symbol)
+            if not cone.empty:
+                st.markdown("### 🔮 Cone de Probabilidade Implícito")
+                fig = px.line(
+                    cone,
+                    x='expiry_date',
+                    y=['q5', 'q16', 'q50', 'q84', 'q95'],
+                    markers=True,
+                    title=f'Quantis Neutros ao Risco - {underlying_symbol}',
+                    labels={'expiry_date': 'Vencimento', 'value': 'Preço', 'variable': 'Quantil'}
+                )
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.info(f"📭 Nenhuma opção encontrada para {underlying_symbol}")
             st.markdown("💡 **Dica:** Use 'Coletar Opções' na sidebar para gerar dados de exemplo")
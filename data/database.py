@@ -84,6 +84,12 @@ class TradingDatabase:
             )
         ''')
         
+        # Índice para históricos por símbolo (consultas em lote do universo)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_prices_symbol_timestamp
+            ON prices (symbol, timestamp)
+        ''')
+        
         conn.commit()
         conn.close()
         print("✅ Banco de dados inicializado!")
@@ -143,6 +149,77 @@ class TradingDatabase:
         
         return df
     
+    def get_price_histories(self, symbols, limit=None, days=None):
+        """
+        Históricos de vários símbolos em uma única consulta
+        
+        Args:
+            symbols (list): Símbolos
+            limit (int, optional): Últimos N preços de cada símbolo
+            days (int, optional): Apenas os últimos N dias
+        
+        Returns:
+            pd.DataFrame: symbol, price, volume, timestamp e source em ordem
+                cronológica dentro de cada símbolo
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return pd.DataFrame(columns=['symbol', 'price', 'volume', 'timestamp', 'source'])
+        
+        placeholders = ', '.join('?' * len(symbols))
+        date_limit = (datetime.now() - timedelta(days=days)).isoformat() if days else ''
+        params = [*symbols, date_limit]
+        position_filter = ''
+        if limit:
+            position_filter = 'WHERE position <= ?'
+            params.append(int(limit))
+        
+        # ROW_NUMBER por símbolo limita cada histórico sem uma consulta por ativo
+        query = f'''
+            SELECT symbol, price, volume, timestamp, source FROM (
+                SELECT symbol, price, volume, timestamp, source,
+                       ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY timestamp DESC) AS position
+                FROM prices
+                WHERE symbol IN ({placeholders}) AND timestamp >= ?
+            )
+            {position_filter}
+            ORDER BY symbol, timestamp ASC
+        '''
+        
+        conn = sqlite3.connect(self.db_path)
+        df = pd.read_sql_query(query, conn, params=params)
+        conn.close()
+        
+        if not df.empty:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        
+        return df
+    
+    def get_latest_timestamps(self, symbols):
+        """
+        Timestamp do último preço de cada símbolo (marca d'água dos caches)
+        
+        Args:
+            symbols (list): Símbolos
+        
+        Returns:
+            dict: símbolo -> timestamp ISO (símbolos sem preço ficam de fora)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        
+        placeholders = ', '.join('?' * len(symbols))
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(f'''
+            SELECT symbol, MAX(timestamp) FROM prices
+            WHERE symbol IN ({placeholders})
+            GROUP BY symbol
+        ''', symbols).fetchall()
+        conn.close()
+        
+        return dict(rows)
+    
     # ========== MÉTODOS DE COMPATIBILIDADE ==========
     
     def save_price(self, symbol: str, price: float, volume: int = 0):
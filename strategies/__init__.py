@@ -0,0 +1,9 @@
+"""
+ProTrading Engine - Estratégias plugáveis
+Importar o pacote registra todas as estratégias disponíveis
+"""
+
+from strategies.base import (STRATEGY_REGISTRY, SIGNAL_LABELS, Strategy, available_strategies,
+                             bars_from_frame, bars_from_histories, get_strategy, load_strategies,
+                             register_strategy)
+from strategies import sma_rsi_strategy, momentum_strategy  # noqa: F401 - registra as estratégias
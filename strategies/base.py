@@ -0,0 +1,182 @@
+"""
+ProTrading Engine - Framework de Estratégias
+Interface comum de estratégias vetorizadas sobre matrizes ativos x tempo,
+registro por nome e montagem a partir da configuração
+Desenvolvido por: Deverson
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+SIGNAL_LABELS = {1: 'COMPRA', -1: 'VENDA', 0: 'NEUTRO'}
+
+STRATEGY_REGISTRY = {}
+
+
+class Strategy(ABC):
+    """
+    Base das estratégias
+
+    `evaluate(bars)` recebe o universo inteiro de uma vez (arrays ativos x
+    tempo) e devolve arrays do mesmo formato; nenhuma estratégia itera por
+    ativo. Parâmetros padrão ficam em `default_params` e podem ser
+    sobrescritos na construção.
+    """
+
+    name = 'base'
+    display_name = 'Base'
+    default_params = {}
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.default_params)
+        if unknown:
+            raise ValueError(f"Parâmetros desconhecidos para {self.name}: {sorted(unknown)}")
+        self.params = {**self.default_params, **params}
+
+    @abstractmethod
+    def evaluate(self, bars):
+        """
+        Avalia a estratégia em todo o universo
+
+        Args:
+            bars (dict): 'close' (ativos x tempo) e opcionalmente 'open',
+                'high', 'low', 'volume', 'symbols' e 'dates'
+
+        Returns:
+            dict: 'signal' ({-1, 0, 1}), 'strength' (0-10) e 'indicators'
+                (nome -> array), todos ativos x tempo
+        """
+
+    def targets(self, price, signal):
+        """
+        Alvo e stop por ativo (mesma regra de calculate_targets)
+
+        Args:
+            price (np.ndarray): Preço de referência por ativo
+            signal (np.ndarray): Sinal por ativo
+
+        Returns:
+            tuple: (alvo, stop) - NaN para sinais neutros
+        """
+        target_pct = self.params.get('target_pct', 0.05)
+        stop_pct = self.params.get('stop_pct', 0.03)
+        direction = np.where(signal != 0, signal, np.nan)
+        return price * (1 + direction * target_pct), price * (1 - direction * stop_pct)
+
+    def explain(self, indicators, signal, strength):
+        """Texto do sinal de um ativo na última barra (valores escalares)"""
+        values = ', '.join(f"{name}={value:.2f}" for name, value in indicators.items() if np.isfinite(value))
+        return f"{self.display_name}: {SIGNAL_LABELS[int(signal)]} (força {int(strength)}) | {values}"
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.params})"
+
+
+def register_strategy(cls):
+    """
+    Registra uma classe de estratégia pelo seu `name` (usável como decorador)
+
+    Args:
+        cls (type): Subclasse de Strategy
+
+    Returns:
+        type: A própria classe
+    """
+    STRATEGY_REGISTRY[cls.name] = cls
+    return cls
+
+
+def get_strategy(name, **params):
+    """
+    Instancia uma estratégia registrada
+
+    Args:
+        name (str): Nome no registro
+        **params: Parâmetros que sobrescrevem os padrões
+
+    Returns:
+        Strategy: Estratégia
+    """
+    if name not in STRATEGY_REGISTRY:
+        raise ValueError(f"Estratégia não registrada: {name}")
+    return STRATEGY_REGISTRY[name](**params)
+
+
+def available_strategies():
+    """Nomes das estratégias registradas"""
+    return sorted(STRATEGY_REGISTRY)
+
+
+def load_strategies(settings):
+    """
+    Monta as estratégias habilitadas na configuração
+
+    Args:
+        settings (dict): nome -> parâmetros (ex: config.STRATEGIES)
+
+    Returns:
+        list: Estratégias instanciadas, na ordem da configuração
+    """
+    return [get_strategy(name, **(params or {})) for name, params in settings.items()]
+
+
+def bars_from_histories(histories, symbols, lookback):
+    """
+    Matriz de preços ativos x observações a partir dos históricos gravados
+
+    As séries são alinhadas pela última observação (coluna final = preço
+    mais recente de cada ativo); ativos com menos observações ficam com NaN
+    à esquerda, que os indicadores tratam como início da série.
+
+    Args:
+        histories (dict): símbolo -> DataFrame com price (ordem cronológica)
+        symbols (list): Ordem das linhas
+        lookback (int): Observações por ativo
+
+    Returns:
+        dict: 'close', 'symbols' e 'observations' (quantidade por ativo)
+    """
+    close = np.full((len(symbols), lookback), np.nan)
+    observations = np.zeros(len(symbols), dtype=int)
+    for row, symbol in enumerate(symbols):
+        history = histories.get(symbol)
+        if history is None or history.empty:
+            continue
+        prices = history['price'].to_numpy(dtype=float)[-lookback:]
+        close[row, lookback - len(prices):] = prices
+        observations[row] = len(prices)
+    return {'close': close, 'symbols': list(symbols), 'observations': observations}
+
+
+def bars_from_frame(frame, symbols, lookback):
+    """
+    Como bars_from_histories, a partir do resultado de db.get_price_histories
+
+    A posição de cada preço na matriz vem de um groupby/cumcount, sem laço
+    por ativo.
+
+    Args:
+        frame (pd.DataFrame): symbol e price, em ordem cronológica por símbolo
+        symbols (list): Ordem das linhas
+        lookback (int): Observações por ativo
+
+    Returns:
+        dict: 'close', 'symbols' e 'observations'
+    """
+    close = np.full((len(symbols), lookback), np.nan)
+    observations = np.zeros(len(symbols), dtype=int)
+    if frame.empty:
+        return {'close': close, 'symbols': list(symbols), 'observations': observations}
+
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    rows = frame['symbol'].map(index)
+    frame = frame[rows.notna()]
+    rows = rows[rows.notna()].to_numpy(dtype=int)
+
+    # Posição contada a partir do fim: o preço mais recente vai para a última coluna
+    from_end = frame.groupby('symbol').cumcount(ascending=False).to_numpy()
+    keep = from_end < lookback
+    close[rows[keep], lookback - 1 - from_end[keep]] = frame['price'].to_numpy(dtype=float)[keep]
+    observations[:] = np.minimum(np.bincount(rows, minlength=len(symbols)), lookback)
+    return {'close': close, 'symbols': list(symbols), 'observations': observations}
@@ -0,0 +1,344 @@
+"""
+ProTrading Engine - Estudos de Evento de Resultados
+Calendário de balanços indexado no SQLite (carregado de arquivos locais),
+estudo de evento vetorizado de retornos anormais (milhares de eventos em
+uma passada de fancy indexing) e análise de IV crush pré/pós-resultado
+cruzada com o histórico de IV dos snapshots de opções
+Desenvolvido por: Deverson
+"""
+
+import glob
+import os
+import sqlite3
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config.settings import config
+from core.iv_history import IV_SERIES
+from data.database import db
+
+EVENT_WINDOW = (-5, 10)
+ESTIMATION_WINDOW = (-120, -20)
+
+# Resultado divulgado após o fechamento (AMC) reage no pregão seguinte
+AFTER_CLOSE = 'AMC'
+
+
+def base_symbol(symbol):
+    """Ticker sem o sufixo .SA (chave comum a calendário, preços e IV)"""
+    return str(symbol).upper().replace('.SA', '')
+
+
+class EarningsCalendar:
+    """
+    Calendário de resultados (tabela earnings_calendar)
+
+    Chave primária (symbol, event_date) e índice por data, para consultas
+    por ativo ou por intervalo sem varrer a tabela.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or db.db_path
+        self.init_calendar_table()
+
+    def init_calendar_table(self):
+        """Cria a tabela e os índices"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS earnings_calendar (
+                symbol TEXT NOT NULL,
+                event_date TEXT NOT NULL,
+                timing TEXT,
+                period TEXT,
+                source TEXT,
+                loaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (symbol, event_date)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_earnings_calendar_date
+            ON earnings_calendar (event_date)
+        ''')
+        conn.commit()
+        conn.close()
+
+    def load_file(self, path):
+        """
+        Carrega um CSV de resultados
+
+        Colunas: symbol, date e opcionalmente timing (BMO/AMC) e period
+        (ex: 3T25). Linhas repetidas substituem as existentes.
+
+        Args:
+            path (str): Arquivo CSV
+
+        Returns:
+            int: Eventos gravados
+        """
+        try:
+            frame = pd.read_csv(path)
+            frame.columns = [c.strip().lower() for c in frame.columns]
+            rows = pd.DataFrame({
+                'symbol': frame['symbol'].map(base_symbol),
+                'event_date': pd.to_datetime(frame['date']).dt.date.astype(str),
+                'timing': frame['timing'].str.upper() if 'timing' in frame else None,
+                'period': frame['period'] if 'period' in frame else None,
+                'source': os.path.basename(path),
+            })
+            conn = sqlite3.connect(self.db_path)
+            conn.executemany('''
+                INSERT OR REPLACE INTO earnings_calendar (symbol, event_date, timing, period, source)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None))
+            conn.commit()
+            conn.close()
+            return len(rows)
+        except Exception as e:
+            print(f"❌ Erro ao carregar calendário de resultados {path}: {e}")
+            return 0
+
+    def load_directory(self, directory=None):
+        """Carrega todos os CSVs de uma pasta (padrão: config.EARNINGS_CALENDAR_DIR)"""
+        directory = directory or config.EARNINGS_CALENDAR_DIR
+        total = sum(self.load_file(path) for path in sorted(glob.glob(os.path.join(directory, '*.csv'))))
+        if total:
+            print(f"📅 {total} eventos de resultado carregados de {directory}")
+        return total
+
+    def events(self, symbols=None, start=None, end=None):
+        """
+        Eventos do calendário
+
+        Args:
+            symbols (list, optional): Ativos (com ou sem .SA)
+            start, end (str | datetime, optional): Intervalo de datas
+
+        Returns:
+            pd.DataFrame: symbol, event_date, timing e period
+        """
+        start = start.date().isoformat() if isinstance(start, datetime) else (start or '')
+        end = end.date().isoformat() if isinstance(end, datetime) else (end or '9999')
+        query = '''
+            SELECT symbol, event_date, timing, period FROM earnings_calendar
+            WHERE event_date >= ? AND event_date <= ?
+        '''
+        params = [start, end]
+        if symbols:
+            names = sorted({base_symbol(s) for s in symbols})
+            query += f" AND symbol IN ({', '.join('?' * len(names))})"
+            params += names
+        try:
+            conn = sqlite3.connect(self.db_path)
+            result = pd.read_sql_query(query + ' ORDER BY event_date, symbol', conn, params=params)
+            conn.close()
+            return result
+        except Exception as e:
+            print(f"❌ Erro ao buscar calendário de resultados: {e}")
+            return pd.DataFrame(columns=['symbol', 'event_date', 'timing', 'period'])
+
+    def next_events(self, symbols=None, days=30):
+        """Próximos resultados a partir de hoje"""
+        today = datetime.now().date()
+        return self.events(symbols, today.isoformat(), (today + pd.Timedelta(days=days)).isoformat())
+
+
+def locate_events(events, symbols, dates):
+    """
+    Linha (ativo) e coluna (pregão de reação) de cada evento na matriz de retornos
+
+    Eventos em dias sem pregão vão para o pregão seguinte; divulgados após o
+    fechamento (AMC) reagem no pregão seguinte ao da data.
+
+    Returns:
+        tuple: (linhas, colunas, máscara de eventos localizados)
+    """
+    index = {base_symbol(s): i for i, s in enumerate(symbols)}
+    rows = events['symbol'].map(base_symbol).map(index)
+    trading_days = pd.DatetimeIndex(pd.to_datetime(dates)).normalize().values
+    event_days = pd.to_datetime(events['event_date']).values.astype('datetime64[ns]')
+    cols = np.searchsorted(trading_days, event_days, side='left')
+    if 'timing' in events:
+        after_close = events['timing'].fillna('').str.upper().eq(AFTER_CLOSE).to_numpy()
+        on_day = cols < len(trading_days)
+        same_day = np.zeros(len(cols), dtype=bool)
+        same_day[on_day] = trading_days[cols[on_day]] == event_days[on_day]
+        cols = cols + (after_close & same_day)
+    found = rows.notna().to_numpy() & (cols < len(trading_days))
+    return rows.fillna(-1).to_numpy(dtype=int), cols, found
+
+
+def _gather(matrix, rows, cols, offsets):
+    """matrix[linha, coluna + deslocamento] para todos os eventos (NaN fora da série)"""
+    positions = cols[:, None] + offsets[None, :]
+    inside = (positions >= 0) & (positions < matrix.shape[1])
+    values = matrix[rows[:, None], np.clip(positions, 0, matrix.shape[1] - 1)]
+    return np.where(inside, values, np.nan)
+
+
+class EventStudyResult:
+    """Retornos anormais alinhados por evento e estatísticas agregadas"""
+
+    def __init__(self, events, offsets, abnormal):
+        self.events = events.reset_index(drop=True)
+        self.offsets = offsets
+        self.abnormal = abnormal
+        self.car = np.nancumsum(abnormal, axis=1)
+        self.car[np.isnan(abnormal).all(axis=1)] = np.nan
+
+    def summary(self):
+        """
+        AAR e CAAR por dia relativo ao evento
+
+        Returns:
+            pd.DataFrame: offset, events, aar, caar, t_stat (do CAR) e pct_positive
+        """
+        count = np.isfinite(self.abnormal).sum(axis=0)
+        # Dias com um evento ou nenhum ficam NaN sem aviso
+        with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            aar = np.nanmean(self.abnormal, axis=0)
+            caar = np.nanmean(self.car, axis=0)
+            car_std = np.nanstd(self.car, axis=0, ddof=1)
+            t_stat = caar / (car_std / np.sqrt(count))
+            positive = np.nanmean(np.where(np.isfinite(self.car), self.car > 0, np.nan), axis=0)
+        return pd.DataFrame({'offset': self.offsets, 'events': count, 'aar': aar, 'caar': caar, 't_stat': t_stat,
+                             'pct_positive': positive})
+
+    def event_table(self):
+        """CAR de cada evento no fim da janela"""
+        table = self.events[['symbol', 'event_date']].copy()
+        table['car'] = self.car[:, -1]
+        return table
+
+
+def event_study(returns, symbols, dates, events, window=EVENT_WINDOW, estimation=ESTIMATION_WINDOW,
+                market_returns=None, min_estimation=30):
+    """
+    Estudo de evento vetorizado
+
+    Todos os eventos são alinhados de uma vez por fancy indexing na matriz
+    de retornos (eventos x dias da janela). Com retornos de mercado, o
+    retorno normal vem do modelo de mercado (alfa e beta estimados por
+    evento na janela de estimação); sem eles, da média da janela de
+    estimação.
+
+    Args:
+        returns (np.ndarray): Retornos ativos x pregões
+        symbols (list): Ativos das linhas
+        dates (array_like): Pregões das colunas
+        events (pd.DataFrame): symbol, event_date (e opcionalmente timing)
+        window (tuple): Dias (início, fim) relativos ao evento, inclusive
+        estimation (tuple): Janela de estimação relativa ao evento
+        market_returns (array_like, optional): Retorno do índice por pregão
+        min_estimation (int): Observações mínimas para estimar o retorno normal
+
+    Returns:
+        EventStudyResult: Resultado (eventos não localizados são descartados)
+    """
+    returns = np.atleast_2d(np.asarray(returns, dtype=float))
+    rows, cols, found = locate_events(events, symbols, dates)
+    events = events[found]
+    rows, cols = rows[found], cols[found]
+
+    offsets = np.arange(window[0], window[1] + 1)
+    est_offsets = np.arange(estimation[0], estimation[1] + 1)
+    event_returns = _gather(returns, rows, cols, offsets)
+    est_returns = _gather(returns, rows, cols, est_offsets)
+    n_est = np.isfinite(est_returns).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        # Eventos sem janela de estimação ficam NaN (descartados abaixo)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if market_returns is None:
+            expected = np.nanmean(est_returns, axis=1)[:, None]
+        else:
+            market = np.atleast_2d(np.asarray(market_returns, dtype=float))
+            zeros = np.zeros(len(rows), dtype=int)
+            market_event = _gather(market, zeros, cols, offsets)
+            market_est = _gather(market, zeros, cols, est_offsets)
+            valid = np.isfinite(est_returns) & np.isfinite(market_est)
+            n_est = valid.sum(axis=1)
+            y = np.where(valid, est_returns, np.nan)
+            x = np.where(valid, market_est, np.nan)
+            x_mean, y_mean = np.nanmean(x, axis=1), np.nanmean(y, axis=1)
+            beta = (np.nanmean(x * y, axis=1) - x_mean * y_mean) / np.nanvar(x, axis=1)
+            alpha = y_mean - beta * x_mean
+            expected = alpha[:, None] + beta[:, None] * market_event
+
+    abnormal = event_returns - expected
+    abnormal[n_est < min_estimation] = np.nan
+    return EventStudyResult(events, offsets, abnormal)
+
+
+def iv_crush(events, db_path=None, series=IV_SERIES, max_gap_days=5):
+    """
+    IV antes e depois de cada resultado (snapshots de iv_history)
+
+    Uma única consulta traz o histórico de IV de todos os ativos com
+    evento; o snapshot pré é o último antes do dia do evento e o pós, o
+    primeiro após a divulgação (pregão seguinte para AMC), via merge_asof.
+
+    Args:
+        events (pd.DataFrame): symbol, event_date (e opcionalmente timing)
+        db_path (str, optional): Banco (padrão: db.db_path)
+        series (tuple): Séries de IV analisadas
+        max_gap_days (int): Distância máxima do snapshot ao evento
+
+    Returns:
+        pd.DataFrame: Evento, IV pré e pós de cada série e crush (pós/pré - 1)
+    """
+    if events.empty:
+        return pd.DataFrame()
+    events = events.copy()
+    events['underlying'] = events['symbol'].map(base_symbol)
+    event_day = pd.to_datetime(events['event_date'])
+    after_close = events['timing'].fillna('').str.upper().eq(AFTER_CLOSE) if 'timing' in events else False
+    events['pre_cutoff'] = event_day + pd.to_timedelta(np.where(after_close, 16, 0), unit='h')
+    events['post_cutoff'] = event_day + pd.to_timedelta(np.where(after_close, 24, 12), unit='h')
+
+    gap = pd.Timedelta(days=max_gap_days)
+    names = sorted(events['underlying'].unique())
+    try:
+        conn = sqlite3.connect(db_path or db.db_path)
+        history = pd.read_sql_query(f'''
+            SELECT underlying, taken_at, {', '.join(series)} FROM iv_history
+            WHERE underlying IN ({', '.join('?' * len(names))}) AND taken_at >= ? AND taken_at <= ?
+        ''', conn, params=[*names, (event_day.min() - gap).isoformat(), (event_day.max() + 2 * gap).isoformat()])
+        conn.close()
+    except Exception as e:
+        print(f"❌ Erro ao buscar IV dos eventos: {e}")
+        return pd.DataFrame()
+
+    history['taken_at'] = pd.to_datetime(history['taken_at'])
+    history = history.sort_values('taken_at')
+    pre = pd.merge_asof(events.sort_values('pre_cutoff'), history.rename(columns={'taken_at': 'pre_at'}),
+                        left_on='pre_cutoff', right_on='pre_at', by='underlying', direction='backward',
+                        tolerance=gap, allow_exact_matches=False)
+    post = pd.merge_asof(events.sort_values('post_cutoff'), history.rename(columns={'taken_at': 'post_at'}),
+                         left_on='post_cutoff', right_on='post_at', by='underlying', direction='forward',
+                         tolerance=gap)
+
+    keys = ['underlying', 'event_date']
+    result = pre[keys + ['pre_at', *series]].merge(post[keys + ['post_at', *series]], on=keys,
+                                                    suffixes=('_pre', '_post'))
+    for name in series:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[f'{name}_crush'] = result[f'{name}_post'] / result[f'{name}_pre'] - 1
+    return result.sort_values(keys).reset_index(drop=True)
+
+
+def iv_crush_summary(crush, series=IV_SERIES):
+    """Crush médio, mediano e fração de quedas por ativo"""
+    columns = [f'{name}_crush' for name in series if f'{name}_crush' in crush]
+    if crush.empty or not columns:
+        return pd.DataFrame()
+    grouped = crush.groupby('underlying')[columns]
+    summary = grouped.agg(['count', 'mean', 'median'])
+    summary.columns = [f'{a}_{b}' for a, b in summary.columns]
+    falling = grouped.apply(lambda g: (g < 0).sum() / g.notna().sum().replace(0, np.nan))
+    falling.columns = [f'{c}_pct_down' for c in columns]
+    return summary.join(falling).reset_index()
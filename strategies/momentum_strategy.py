@@ -0,0 +1,410 @@
+"""
+ProTrading Engine - Momentum Cross-Sectional
+Retornos de 1/3/6/12 meses com skip-month, scores escalados pela
+volatilidade, ranks neutros por setor e carteiras por calendário de
+rebalanceamento, tudo em operações de matriz sobre um painel ativos x
+datas mantido em memória mapeada (cada dia acrescenta uma coluna)
+Desenvolvido por: Deverson
+"""
+
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from config.settings import config
+from core import indicators
+from strategies.base import Strategy, register_strategy
+
+LOOKBACK_MONTHS = (1, 3, 6, 12)
+DAYS_PER_MONTH = 21
+VOL_WINDOW = 63
+
+
+class MomentumPanel:
+    """
+    Painel de fechamentos em np.memmap
+
+    O arquivo é gravado datas x ativos (cada dia novo é uma linha contígua)
+    com capacidade reservada nas duas dimensões; `close` expõe a visão
+    ativos x datas sem cópia. Ativos e datas ficam no JSON ao lado.
+    """
+
+    def __init__(self, directory=None, symbol_capacity=256, date_capacity=1024):
+        """
+        Abre (ou cria) o painel
+
+        Args:
+            directory (str, optional): Pasta do painel (padrão: config.MOMENTUM_PANEL_DIR)
+            symbol_capacity (int): Ativos reservados na criação
+            date_capacity (int): Datas reservadas na criação
+        """
+        self.directory = directory or config.MOMENTUM_PANEL_DIR
+        self.data_path = os.path.join(self.directory, 'close.dat')
+        self.meta_path = os.path.join(self.directory, 'panel.json')
+        os.makedirs(self.directory, exist_ok=True)
+
+        if os.path.exists(self.meta_path) and os.path.exists(self.data_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self.symbols = meta['symbols']
+            self.dates = meta['dates']
+            self._data = np.memmap(self.data_path, dtype=float, mode='r+', shape=tuple(meta['capacity']))
+        else:
+            self.symbols, self.dates = [], []
+            self._data = self._create(self.data_path, (date_capacity, symbol_capacity))
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @staticmethod
+    def _create(path, shape):
+        data = np.memmap(path, dtype=float, mode='w+', shape=shape)
+        data[:] = np.nan
+        return data
+
+    @property
+    def close(self):
+        """Fechamentos ativos x datas (visão do memmap)"""
+        return self._data[:len(self.dates), :len(self.symbols)].T
+
+    def _grow(self, n_dates, n_symbols):
+        """Dobra a capacidade que faltar, copiando o conteúdo para um arquivo novo"""
+        dates_cap, symbols_cap = self._data.shape
+        if n_dates <= dates_cap and n_symbols <= symbols_cap:
+            return
+        while dates_cap < n_dates:
+            dates_cap *= 2
+        while symbols_cap < n_symbols:
+            symbols_cap *= 2
+        temp_path = self.data_path + '.tmp'
+        grown = self._create(temp_path, (dates_cap, symbols_cap))
+        grown[:len(self.dates), :len(self.symbols)] = self._data[:len(self.dates), :len(self.symbols)]
+        grown.flush()
+        del grown
+        self._data._mmap.close()
+        os.replace(temp_path, self.data_path)
+        self._data = np.memmap(self.data_path, dtype=float, mode='r+', shape=(dates_cap, symbols_cap))
+
+    def _columns(self, symbols):
+        """Posições dos ativos no painel (cadastra os novos)"""
+        new = [s for s in dict.fromkeys(symbols) if s not in self._index]
+        if new:
+            self._grow(len(self.dates), len(self.symbols) + len(new))
+            for symbol in new:
+                self._index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+        return np.array([self._index[s] for s in symbols], dtype=int)
+
+    def append(self, date, prices):
+        """
+        Acrescenta (ou substitui, se for a última data) um dia do painel
+
+        Args:
+            date (str | datetime): Data
+            prices (dict): símbolo -> fechamento
+        """
+        date = pd.Timestamp(date).date().isoformat()
+        if self.dates and date < self.dates[-1]:
+            raise ValueError(f"Data {date} anterior ao fim do painel ({self.dates[-1]})")
+        columns = self._columns(list(prices))
+        if not self.dates or date != self.dates[-1]:
+            self._grow(len(self.dates) + 1, len(self.symbols))
+            self._data[len(self.dates)] = np.nan
+            self.dates.append(date)
+        self._data[len(self.dates) - 1, columns] = np.fromiter(prices.values(), dtype=float, count=len(prices))
+        self.flush()
+
+    def extend(self, dates, close, symbols):
+        """
+        Carrega vários dias de uma vez (ex: histórico inicial)
+
+        Args:
+            dates (array_like): Datas posteriores ao fim do painel
+            close (array_like): Fechamentos ativos x datas
+            symbols (list): Ativos das linhas de `close`
+        """
+        dates = [pd.Timestamp(d).date().isoformat() for d in dates]
+        if self.dates and dates and dates[0] <= self.dates[-1]:
+            raise ValueError(f"Datas sobrepõem o painel (fim em {self.dates[-1]})")
+        columns = self._columns(list(symbols))
+        start = len(self.dates)
+        self._grow(start + len(dates), len(self.symbols))
+        self._data[start:start + len(dates)] = np.nan
+        self._data[start:start + len(dates), columns] = np.asarray(close, dtype=float).T
+        self.dates.extend(dates)
+        self.flush()
+
+    def flush(self):
+        """Grava dados e metadados"""
+        self._data.flush()
+        with open(self.meta_path, 'w') as f:
+            json.dump({'symbols': self.symbols, 'dates': self.dates, 'capacity': list(self._data.shape)}, f)
+
+
+def momentum_returns(close, lookbacks=LOOKBACK_MONTHS, skip_months=1, days_per_month=DAYS_PER_MONTH):
+    """
+    Retornos de momentum com skip-month
+
+    O retorno de L meses na data t vai de t - skip - L até t - skip
+    (o mês mais recente fica de fora por causa da reversão de curto prazo).
+
+    Returns:
+        dict: meses -> array ativos x datas (NaN sem histórico suficiente)
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=float))
+    n = close.shape[-1]
+    skip = skip_months * days_per_month
+    out = {}
+    for months in lookbacks:
+        length = months * days_per_month
+        ret = np.full(close.shape, np.nan)
+        if n > skip + length:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ret[:, skip + length:] = close[:, length:n - skip] / close[:, :n - skip - length] - 1
+        out[months] = ret
+    return out
+
+
+def cross_sectional_zscore(values):
+    """Z-score entre ativos em cada data (ignora NaN)"""
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        # Datas sem nenhum ativo válido geram "Mean of empty slice"
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        return np.where(std > 0, (values - mean) / std, 0.0) * np.where(np.isfinite(values), 1.0, np.nan)
+
+
+def sector_neutralize(scores, sector_ids):
+    """
+    Z-score de cada ativo dentro do seu setor, em cada data
+
+    Usa somas por setor via matriz indicadora (setores x ativos), sem laço
+    por setor ou por data. Setores com um único ativo válido ficam em 0.
+
+    Args:
+        scores (np.ndarray): Scores ativos x datas
+        sector_ids (array_like): Setor (inteiro) de cada ativo
+
+    Returns:
+        np.ndarray: Scores neutros por setor
+    """
+    sector_ids = np.asarray(sector_ids, dtype=int)
+    membership = np.zeros((sector_ids.max() + 1 if sector_ids.size else 0, len(sector_ids)))
+    membership[sector_ids, np.arange(len(sector_ids))] = 1.0
+
+    valid = np.isfinite(scores)
+    filled = np.where(valid, scores, 0.0)
+    counts = membership @ valid
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = (membership @ filled) / counts
+        variances = (membership @ (filled * filled)) / counts - means * means
+    std = np.sqrt(np.maximum(variances, 0.0))[sector_ids]
+    centered = scores - means[sector_ids]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, np.where(std > 0, centered / std, 0.0), np.nan)
+
+
+def percentile_ranks(scores):
+    """Rank percentual (0-1] entre ativos em cada data"""
+    return pd.DataFrame(scores).rank(axis=0, pct=True).to_numpy()
+
+
+def rebalance_mask(dates, frequency='M'):
+    """
+    Datas de rebalanceamento: último pregão de cada período
+
+    Args:
+        dates (array_like): Datas do painel
+        frequency (str): 'W' (semanal), 'M' (mensal) ou 'Q' (trimestral)
+
+    Returns:
+        np.ndarray: Máscara booleana por data (o período corrente, ainda
+            aberto, não rebalanceia)
+    """
+    periods = pd.DatetimeIndex(pd.to_datetime(dates)).to_period(frequency)
+    mask = np.zeros(len(periods), dtype=bool)
+    if len(periods) > 1:
+        mask[:-1] = periods[:-1] != periods[1:]
+    return mask
+
+
+class MomentumEngine:
+    """
+    Ranking de momentum sobre um painel ativos x datas
+
+    score = média ponderada, entre horizontes, do z-score cross-sectional
+    do retorno com skip-month dividido pela volatilidade do período
+    (desvio diário de VOL_WINDOW pregões x raiz dos dias do horizonte).
+    """
+
+    def __init__(self, lookbacks=LOOKBACK_MONTHS, weights=None, skip_months=1, days_per_month=DAYS_PER_MONTH,
+                 vol_window=VOL_WINDOW, sectors=None):
+        """
+        Args:
+            lookbacks (tuple): Horizontes em meses
+            weights (tuple, optional): Peso de cada horizonte (padrão: iguais)
+            skip_months (int): Meses recentes ignorados
+            days_per_month (int): Pregões por mês
+            vol_window (int): Pregões da volatilidade de escala
+            sectors (dict, optional): ativo (sem .SA) -> setor (padrão: config.SECTORS)
+        """
+        self.lookbacks = tuple(lookbacks)
+        self.weights = np.asarray(weights if weights is not None else [1.0] * len(self.lookbacks), dtype=float)
+        self.skip_months = skip_months
+        self.days_per_month = days_per_month
+        self.vol_window = vol_window
+        self.sectors = sectors if sectors is not None else config.SECTORS
+
+    @property
+    def history_needed(self):
+        """Pregões necessários para o score da última data"""
+        return max(self.skip_months * self.days_per_month + max(self.lookbacks) * self.days_per_month,
+                   self.vol_window) + 1
+
+    def sector_ids(self, symbols):
+        """Setor (inteiro) de cada ativo; desconhecidos vão para 'Outros'"""
+        names = [self.sectors.get(s.replace('.SA', ''), 'Outros') for s in symbols]
+        return pd.factorize(pd.Index(names))[0]
+
+    def scores(self, close):
+        """
+        Scores compostos (ativos x datas)
+
+        Returns:
+            dict: 'returns' (meses -> array), 'score' e 'rank' (sem neutralizar setores)
+        """
+        close = np.atleast_2d(np.asarray(close, dtype=float))
+        returns = momentum_returns(close, self.lookbacks, self.skip_months, self.days_per_month)
+
+        # Volatilidade diária dos log-retornos (a primeira data não tem retorno)
+        daily_vol = np.full(close.shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.log(close[:, 1:] / close[:, :-1])
+        daily_vol[:, 1:] = indicators.rolling_std(log_returns, self.vol_window, ddof=1)
+
+        total = np.zeros(close.shape)
+        weight_sum = np.zeros(close.shape)
+        for weight, months in zip(self.weights, self.lookbacks):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scaled = returns[months] / (daily_vol * np.sqrt(months * self.days_per_month))
+            z = cross_sectional_zscore(np.where(np.isfinite(scaled), scaled, np.nan))
+            valid = np.isfinite(z)
+            total += np.where(valid, weight * z, 0.0)
+            weight_sum += np.where(valid, weight, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(weight_sum > 0, total / weight_sum, np.nan)
+        return {'returns': returns, 'score': score, 'rank': percentile_ranks(score)}
+
+    def ranks(self, close, symbols):
+        """
+        Scores e ranks neutros por setor
+
+        Returns:
+            dict: como `scores`, com 'neutral' e 'rank' calculados dentro dos setores
+        """
+        result = self.scores(close)
+        result['neutral'] = sector_neutralize(result['score'], self.sector_ids(symbols))
+        result['rank'] = percentile_ranks(result['neutral'])
+        return result
+
+    def latest(self, panel):
+        """
+        Ranks da última data do painel calculados só sobre a cauda necessária
+
+        Args:
+            panel (MomentumPanel): Painel
+
+        Returns:
+            pd.DataFrame: symbol, sector, score, neutral e rank na última data
+        """
+        close = panel.close[:, -self.history_needed:]
+        result = self.ranks(close, panel.symbols)
+        sectors = [self.sectors.get(s.replace('.SA', ''), 'Outros') for s in panel.symbols]
+        table = pd.DataFrame({
+            'symbol': panel.symbols,
+            'sector': sectors,
+            'score': result['score'][:, -1] if close.size else np.nan,
+            'neutral': result['neutral'][:, -1] if close.size else np.nan,
+            'rank': result['rank'][:, -1] if close.size else np.nan,
+        })
+        return table.sort_values('rank', ascending=False, na_position='last').reset_index(drop=True)
+
+    def portfolio_weights(self, ranks, dates, frequency='M', top=0.2, bottom=None):
+        """
+        Pesos da carteira rebalanceada (ativos x datas)
+
+        Compra em pesos iguais o quantil superior de rank em cada data de
+        rebalanceamento (e vende o inferior, se `bottom`) e mantém os pesos
+        até o próximo rebalanceamento.
+
+        Args:
+            ranks (np.ndarray): Ranks ativos x datas
+            dates (array_like): Datas
+            frequency (str): Frequência de rebalanceamento ('W', 'M', 'Q')
+            top (float): Fração comprada
+            bottom (float, optional): Fração vendida
+
+        Returns:
+            np.ndarray: Pesos
+        """
+        mask = rebalance_mask(dates, frequency)
+        longs = (ranks > 1 - top).astype(float)
+        target = longs / np.maximum(longs.sum(axis=0), 1.0)
+        if bottom:
+            shorts = (ranks <= bottom).astype(float)
+            target -= shorts / np.maximum(shorts.sum(axis=0), 1.0)
+
+        # Índice do último rebalanceamento em cada data (-1 = antes do primeiro)
+        last = np.where(mask, np.arange(len(mask)), -1)
+        last = np.maximum.accumulate(last) if len(last) else last
+        weights = target[:, np.maximum(last, 0)]
+        weights[:, last < 0] = 0.0
+        return weights
+
+
+@register_strategy
+class MomentumStrategy(Strategy):
+    """
+    Momentum cross-sectional: compra o quantil superior e vende o inferior
+
+    Opera sobre pregões diários (ex: MomentumPanel.close) com pelo menos
+    MomentumEngine.history_needed colunas; a matriz de ticks de
+    analyze_all_symbols (STRATEGY_LOOKBACK preços) não serve.
+    """
+
+    name = 'momentum'
+    display_name = 'Momentum'
+    default_params = {
+        'lookbacks': LOOKBACK_MONTHS,
+        'skip_months': 1,
+        'days_per_month': DAYS_PER_MONTH,
+        'vol_window': VOL_WINDOW,
+        'top_quantile': 0.2,
+        'bottom_quantile': 0.2,
+        'target_pct': 0.10,
+        'stop_pct': 0.05,
+    }
+
+    def evaluate(self, bars):
+        p = self.params
+        engine = MomentumEngine(p['lookbacks'], skip_months=p['skip_months'], days_per_month=p['days_per_month'],
+                                vol_window=p['vol_window'])
+        close = np.atleast_2d(np.asarray(bars['close'], dtype=float))
+        if close.shape[-1] < engine.history_needed:
+            raise ValueError(f"{self.display_name} precisa de {engine.history_needed} pregões diários por ativo "
+                             f"(recebeu {close.shape[-1]}); use o painel diário (MomentumPanel)")
+        result = engine.ranks(close, bars['symbols'])
+        rank = result['rank']
+
+        long = rank > 1 - p['top_quantile']
+        short = rank <= p['bottom_quantile'] if p['bottom_quantile'] else np.zeros(rank.shape, dtype=bool)
+        signal = long.astype(int) - short.astype(int)
+        distance = np.abs(np.nan_to_num(rank, nan=0.5) - 0.5)
+        strength = np.where(signal != 0, np.minimum(10, np.floor(5 + distance * 10)), 5).astype(int)
+        return {
+            'signal': signal,
+            'strength': strength,
+            'indicators': {'momentum_score': result['neutral'], 'momentum_rank': rank},
+        }
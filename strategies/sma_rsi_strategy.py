@@ -0,0 +1,35 @@
+"""
+ProTrading Engine - Estratégia SMA + RSI
+Cruzamento de médias móveis combinado ao RSI de Wilder, com as mesmas
+regras de TradingStrategies avaliadas sobre o universo inteiro
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+
+from core.backtester import SMA_RSI_DEFAULTS, sma_rsi_signals
+from strategies.base import Strategy, register_strategy
+
+
+@register_strategy
+class SmaRsiStrategy(Strategy):
+    """SMA rápida x lenta + RSI (sinal combinado de combine_signals)"""
+
+    name = 'sma_rsi'
+    display_name = 'SMA + RSI'
+    default_params = dict(SMA_RSI_DEFAULTS)
+
+    def evaluate(self, bars):
+        close = np.atleast_2d(np.asarray(bars['close'], dtype=float))
+        cache = {}
+        signal, strength = sma_rsi_signals(close, self.params, cache)
+        p = self.params
+        return {
+            'signal': signal,
+            'strength': strength,
+            'indicators': {
+                f"sma_{p['fast_period']}": cache[('sma', int(p['fast_period']))],
+                f"sma_{p['slow_period']}": cache[('sma', int(p['slow_period']))],
+                'rsi': cache[('rsi', int(p['rsi_period']))],
+            },
+        }
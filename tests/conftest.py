@@ -0,0 +1,16 @@
+"""
+ProTrading Engine - Configuração dos testes
+Coloca a raiz do projeto no path e roda os testes em um diretório
+temporário, para que o banco global (data/) não toque o do projeto
+Desenvolvido por: Deverson
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.chdir(tempfile.mkdtemp(prefix='protrading-tests-'))
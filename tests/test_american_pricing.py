@@ -0,0 +1,92 @@
+"""
+ProTrading Engine - Testes da Precificação Americana
+CRR, Leisen-Reimer e Barone-Adesi-Whaley contra valores de livro-texto e
+theta do BSM por dia útil
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pytest
+
+from core.american_pricing import baw_price, crr_price, leisen_reimer_price, price_american_chain
+from core.pricing_math import bsm_greeks, bsm_price
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR
+
+# Hull: put americana S = K = 50, r = 10%, sigma = 40%, 5 meses (~4.28)
+HULL_PUT = dict(S=50.0, K=50.0, T=5 / 12, r=0.10, sigma=0.40)
+HULL_PUT_VALUE = 4.284
+
+
+@pytest.mark.parametrize('pricer, tolerance', [
+    (crr_price, 0.01),
+    (leisen_reimer_price, 0.001),
+    (baw_price, 0.01),
+])
+def test_hull_american_put(pricer, tolerance):
+    value = pricer(option_type='put', **HULL_PUT)
+    assert float(value[0]) == pytest.approx(HULL_PUT_VALUE, abs=tolerance)
+    # Exercício antecipado vale algo acima do europeu (~4.08)
+    assert value[0] > bsm_price(option_type='put', **HULL_PUT) + 0.15
+
+
+def test_leisen_reimer_converges_faster_than_crr():
+    errors = {pricer: abs(float(pricer(option_type='put', steps=51, **HULL_PUT)[0]) - HULL_PUT_VALUE)
+              for pricer in (crr_price, leisen_reimer_price)}
+    assert errors[leisen_reimer_price] < errors[crr_price] / 5
+
+
+@pytest.mark.parametrize('pricer', [crr_price, leisen_reimer_price, baw_price])
+def test_call_without_dividends_is_european(pricer):
+    value = float(pricer(100.0, 100.0, 1.0, 0.05, 0.3, 'call')[0])
+    assert value == pytest.approx(float(bsm_price(100.0, 100.0, 1.0, 0.05, 0.3, 'call')), abs=0.02)
+
+
+def test_baw_call_with_dividend_yield_matches_tree():
+    """Carry negativo (q > r) torna o exercício antecipado da call relevante"""
+    baw = float(baw_price(100.0, 100.0, 0.25, 0.08, 0.2, 'call', q=0.12)[0])
+    tree = float(leisen_reimer_price(100.0, 100.0, 0.25, 0.08, 0.2, 'call', q=0.12)[0])
+    assert baw == pytest.approx(tree, abs=0.01)
+    assert baw >= float(bsm_price(100.0, 100.0, 0.25, 0.08, 0.2, 'call', q=0.12))
+
+
+@pytest.mark.parametrize('model', ['crr', 'leisen_reimer', 'baw'])
+def test_chain_pricing(model):
+    S = np.array([50.0, 50.0, 50.0, 50.0])
+    K = np.array([45.0, 55.0, 50.0, 50.0])
+    T = np.array([0.0, 0.0, 5 / 12, 5 / 12])
+    calls = np.array([True, False, False, True])
+    prices = price_american_chain(S, K, T, 0.10, 0.40, calls, model=model)
+
+    np.testing.assert_allclose(prices[:2], [5.0, 5.0])  # vencidas: intrínseco
+    assert prices[2] == pytest.approx(HULL_PUT_VALUE, abs=0.01)
+    assert prices[3] == pytest.approx(float(bsm_price(50.0, 50.0, 5 / 12, 0.10, 0.40, 'call')), abs=0.01)
+
+
+def test_bsm_reference_values():
+    """Hull: call S = 42, K = 40, r = 10%, sigma = 20%, 6 meses"""
+    assert float(bsm_price(42.0, 40.0, 0.5, 0.10, 0.2, 'call')) == pytest.approx(4.76, abs=0.005)
+    assert float(bsm_price(42.0, 40.0, 0.5, 0.10, 0.2, 'put')) == pytest.approx(0.81, abs=0.005)
+
+
+def test_bsm_greeks_per_business_day():
+    """Hull: call S = 49, K = 50, r = 5%, sigma = 20%, 20 semanas"""
+    greeks = bsm_greeks(49.0, 50.0, 0.3846, 0.05, 0.2, 'call')
+    assert float(greeks['delta']) == pytest.approx(0.522, abs=0.001)
+    assert float(greeks['gamma']) == pytest.approx(0.066, abs=0.001)
+    # Theta anual de -4.31 dividido por 252 dias úteis
+    assert float(greeks['theta']) == pytest.approx(-4.31 / BUSINESS_DAYS_PER_YEAR, rel=0.002)
+    assert float(greeks['vega']) == pytest.approx(0.121, abs=0.001)   # por 1 ponto de vol
+    assert float(greeks['rho']) == pytest.approx(0.0891, abs=0.0001)  # por 1 p.p. de taxa
+
+
+def test_theta_matches_one_business_day_of_decay():
+    args = (30.0, np.array([27.0, 30.0, 33.0]), 0.25, 0.11, 0.35)
+    for option_type in ('call', 'put'):
+        one_day = bsm_price(args[0], args[1], args[2] - 1 / BUSINESS_DAYS_PER_YEAR, *args[3:], option_type, 0.05)
+        decay = one_day - bsm_price(*args, option_type, 0.05)
+        np.testing.assert_allclose(bsm_greeks(*args, option_type, 0.05)['theta'], decay, rtol=0.02)
+
+
+def test_expired_greeks_are_zero():
+    greeks = bsm_greeks(50.0, 45.0, 0.0, 0.1, 0.3, 'call')
+    assert all(float(value) == 0.0 for value in greeks.values())
@@ -0,0 +1,79 @@
+"""
+ProTrading Engine - Testes do Backtester Vetorizado
+Execução de alvo, stop e gaps em barras montadas à mão
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pytest
+
+from core.backtester import VectorizedBacktester
+
+
+def _run(bars, side=1, commission=0.0, slippage=0.0, **kwargs):
+    """Entra em t=0 no lado pedido; bars = [(open, high, low, close), ...]"""
+    open_, high, low, close = (np.array([bar[i] for bar in bars], dtype=float) for i in range(4))
+    signal = np.zeros(len(bars), dtype=int)
+    signal[0] = side
+    strength = np.full(len(bars), 10)
+    backtester = VectorizedBacktester(commission=commission, slippage=slippage, **kwargs)
+    return backtester.simulate(close, signal, strength, high=high, low=low, open_=open_,
+                               target_pct=0.05, stop_pct=0.03)
+
+
+def _only_trade(result):
+    assert len(result.trades) == 1
+    return result.trades.iloc[0]
+
+
+@pytest.mark.parametrize('side, bar, reason, fill', [
+    (1, (100, 106, 99, 104), 'target', 105.0),
+    (1, (100, 101, 96, 98), 'stop', 97.0),
+    (1, (95, 96, 94, 95), 'stop', 95.0),        # gap abaixo do stop: abertura
+    (1, (108, 109, 107, 108), 'target', 108.0),  # gap acima do alvo: abertura
+    (1, (100, 106, 96, 100), 'stop', 97.0),      # alvo e stop na mesma barra: stop
+    (-1, (100, 101, 94, 96), 'target', 95.0),
+    (-1, (104, 105, 103, 104), 'stop', 104.0),   # gap acima do stop vendido: abertura
+])
+def test_exit_levels(side, bar, reason, fill):
+    trade = _only_trade(_run([(100, 100, 100, 100), bar, (100, 100, 100, 100)], side=side))
+    assert trade['exit_reason'] == reason
+    assert trade['exit_index'] == 1
+    assert trade['exit_price'] == pytest.approx(fill)
+    assert trade['return_pct'] == pytest.approx(side * (fill / 100 - 1) * 100)
+
+
+def test_entry_bar_does_not_trigger_exit():
+    """Máxima/mínima da barra de entrada não contam para alvo e stop"""
+    trade = _only_trade(_run([(100, 110, 90, 100), (100, 101, 99, 100)]))
+    assert trade['exit_reason'] == 'end'
+    assert trade['exit_index'] == 1
+
+
+def test_costs_and_slippage_on_both_sides():
+    result = _run([(100, 100, 100, 100), (100, 106, 99, 104)], commission=0.001, slippage=0.002)
+    trade = _only_trade(result)
+    entry = 100 * 1.002
+    exit_ = entry * 1.05 * 0.998
+    assert trade['entry_price'] == pytest.approx(entry)
+    assert trade['exit_price'] == pytest.approx(exit_)
+    assert trade['return_pct'] == pytest.approx((exit_ / entry - 1 - 0.002) * 100)
+    assert result.equity[-1] == pytest.approx(100000.0 * (100 / entry - 0.001) * (1 + exit_ / 100 - 1 - 0.001))
+
+
+def test_reversal_closes_and_flips():
+    close = np.array([100.0, 101.0, 102.0, 101.0])
+    signal = np.array([1, 0, -1, 0])
+    result = VectorizedBacktester(commission=0.0, slippage=0.0).simulate(close, signal, np.full(4, 10))
+    assert list(result.trades['exit_reason']) == ['reversal', 'end']
+    assert list(result.trades['side']) == ['COMPRA', 'VENDA']
+    np.testing.assert_array_equal(result.positions[0], [1, 1, -1, -1])
+
+
+def test_weak_and_unlisted_signals_are_ignored():
+    close = np.array([[100.0, 101.0, 102.0], [np.nan, 50.0, 51.0]])
+    signal = np.array([[1, 0, 0], [1, 0, 0]])
+    strength = np.array([[6, 6, 6], [10, 10, 10]])
+    result = VectorizedBacktester().simulate(close, signal, strength)
+    assert result.trades.empty
+    assert result.equity[-1] == pytest.approx(100000.0)
@@ -0,0 +1,93 @@
+"""
+ProTrading Engine - Testes do Estudo de Evento de Resultados
+Alinhamento de eventos AMC e em dias sem pregão, retornos anormais e
+calendário indexado
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.earnings_strategy import EarningsCalendar, event_study, locate_events
+
+# Pregões de segunda a sexta; 2026-01-02 é sexta
+DATES = pd.bdate_range('2026-01-02', periods=200)
+
+
+def _events(rows):
+    return pd.DataFrame(rows, columns=['symbol', 'event_date', 'timing'])
+
+
+def _column(day):
+    return DATES.get_loc(pd.Timestamp(day))
+
+
+def test_locate_events_alignment():
+    events = _events([
+        ('PETR4', '2026-03-04', 'BMO'),   # pregão: reage no dia
+        ('PETR4', '2026-03-04', 'AMC'),   # após o fechamento: pregão seguinte
+        ('VALE3', '2026-03-07', None),    # sábado: segunda-feira
+        ('VALE3', '2026-03-08', 'AMC'),   # domingo AMC: segunda-feira, sem pular outro dia
+        ('PETR4', '2026-03-06', 'amc'),   # sexta AMC: segunda-feira
+        ('ITUB4', '2026-03-04', 'BMO'),   # fora do universo
+        ('PETR4', '2027-01-04', 'BMO'),   # depois do último pregão
+    ])
+    rows, cols, found = locate_events(events, ['PETR4.SA', 'VALE3.SA'], DATES)
+
+    assert list(found) == [True, True, True, True, True, False, False]
+    assert list(rows[:5]) == [0, 0, 1, 1, 0]
+    monday = _column('2026-03-09')
+    assert list(cols[:5]) == [_column('2026-03-04'), _column('2026-03-05'), monday, monday, monday]
+
+
+def test_abnormal_return_lands_on_reaction_day():
+    rng = np.random.default_rng(8)
+    returns = rng.normal(0.0005, 0.01, (2, len(DATES)))
+    reaction = _column('2026-07-07')
+    returns[0, reaction] += 0.08
+    events = _events([('PETR4', '2026-07-06', 'AMC')])
+
+    result = event_study(returns, ['PETR4', 'VALE3'], DATES, events, window=(-2, 2))
+    summary = result.summary().set_index('offset')
+
+    assert summary.loc[0, 'aar'] == pytest.approx(0.08, abs=0.03)
+    assert summary['aar'].abs().idxmax() == 0
+    assert result.car[0, -1] == pytest.approx(np.nansum(result.abnormal[0]))
+
+
+def test_market_model_removes_beta():
+    rng = np.random.default_rng(9)
+    market = rng.normal(0, 0.01, len(DATES))
+    returns = (0.001 + 1.5 * market)[None, :].repeat(3, axis=0)
+    event_days = ['2026-06-01', '2026-07-01', '2026-08-03']
+    for row, day in enumerate(event_days):
+        returns[row, _column(day)] += 0.05
+    events = _events([(s, d, 'BMO') for s, d in zip(['A', 'B', 'C'], event_days)])
+
+    result = event_study(returns, ['A', 'B', 'C'], DATES, events, window=(-1, 1), market_returns=market)
+
+    np.testing.assert_allclose(result.abnormal[:, 1], 0.05, atol=1e-10)
+    np.testing.assert_allclose(result.abnormal[:, [0, 2]], 0.0, atol=1e-10)
+
+
+def test_short_estimation_is_discarded():
+    returns = np.zeros((1, len(DATES)))
+    events = _events([('PETR4', '2026-01-20', 'BMO')])
+    result = event_study(returns, ['PETR4'], DATES, events, min_estimation=30)
+    assert np.isnan(result.abnormal).all()
+    assert np.isnan(result.car).all()
+
+
+def test_calendar_file_and_queries(tmp_path):
+    path = tmp_path / 'resultados.csv'
+    path.write_text('Symbol,Date,Timing,Period\nPETR4.SA,2026-05-12,amc,1T26\nVALE3,2026-04-28,BMO,1T26\n'
+                    'PETR4,2026-05-12,BMO,1T26\n')
+    calendar = EarningsCalendar(str(tmp_path / 'calendar.db'))
+
+    assert calendar.load_file(str(path)) == 3
+    events = calendar.events()
+    assert list(events['symbol']) == ['VALE3', 'PETR4']
+    assert events.loc[events['symbol'] == 'PETR4', 'timing'].item() == 'BMO'
+    assert list(calendar.events(['PETR4.SA'], start='2026-05-01')['event_date']) == ['2026-05-12']
+    assert calendar.events(end='2026-04-01').empty
@@ -0,0 +1,92 @@
+"""
+ProTrading Engine - Testes do Cache de Indicadores
+Séries estendidas pelo cache iguais às calculadas do zero e análise
+com cache quente igual à com cache frio
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pytest
+
+from config.settings import config
+from core.indicator_cache import IndicatorCache
+from core.trading_strategies import TradingStrategies
+from data.database import db
+
+LOOKBACK = 50
+
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(13)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 90)))
+    timestamps = np.datetime64('2026-10-01T10:00') + np.arange(90) * np.timedelta64(1, 'm')
+    return timestamps, prices
+
+
+def _loader(history, end):
+    """Últimos LOOKBACK preços até `end`, como db.get_price_histories(limit=...)"""
+    timestamps, prices = history
+    start = max(0, end - LOOKBACK)
+    return lambda: (timestamps[start:end], prices[start:end])
+
+
+@pytest.mark.parametrize('indicator, params', [
+    ('sma', {'period': 5}),
+    ('sma', {'period': 20}),
+    ('ema', {'period': 12}),
+    ('rsi', {'period': 14}),
+    ('variance', {'period': 10}),
+    ('extreme', {'period': 15, 'mode': 'min'}),
+])
+def test_extended_series_equals_cold(indicator, params, history):
+    warm = IndicatorCache()
+    for end in (30, 60, 61, 90):
+        warm_values = warm.series('PETR4', indicator, params, history[0][end - 1], _loader(history, end))
+        cold_values = IndicatorCache().series('PETR4', indicator, params, history[0][end - 1],
+                                              _loader(history, end))
+        np.testing.assert_allclose(warm_values, cold_values, rtol=1e-12, equal_nan=True)
+        assert len(warm_values) == min(end, LOOKBACK)
+
+
+def test_fixed_window_series_extend_incrementally(history):
+    cache = IndicatorCache()
+    for end in (60, 70):
+        cache.series('PETR4', 'sma', {'period': 5}, history[0][end - 1], _loader(history, end))
+        cache.series('PETR4', 'rsi', {'period': 14}, history[0][end - 1], _loader(history, end))
+    assert cache.extensions == 1
+    assert cache.last_price('PETR4', 'sma', {'period': 5}) == history[1][69]
+
+
+def test_hit_skips_load(history):
+    cache = IndicatorCache()
+    first = cache.series('PETR4', 'sma', {'period': 5}, history[0][59], _loader(history, 60))
+    again = cache.series('PETR4', 'sma', {'period': 5}, history[0][59], lambda: pytest.fail('load chamado'))
+    assert again is first
+    assert cache.stats()['hits'] == 1
+
+
+def test_analyze_symbol_warm_equals_cold():
+    symbol = 'CACHE3.SA'
+    rng = np.random.default_rng(4)
+    prices = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 70)))
+    for price in prices[:60]:
+        db.save_price_data(symbol, float(price))
+
+    strategies = TradingStrategies()
+    strategies.indicator_cache = IndicatorCache()
+    strategies.analyze_symbol(symbol)
+    for price in prices[60:]:
+        db.save_price_data(symbol, float(price))
+
+    warm = strategies.analyze_symbol(symbol)
+    strategies.indicator_cache = IndicatorCache()
+    cold = strategies.analyze_symbol(symbol)
+    assert warm['indicators'] == cold['indicators']
+    assert warm['signal'] == cold['signal']
+
+    # Mesma janela (STRATEGY_LOOKBACK) da análise vetorizada do universo
+    batch = strategies.analyze_all_symbols([symbol])[symbol]['by_strategy']['sma_rsi']
+    assert config.STRATEGY_LOOKBACK == LOOKBACK
+    assert batch['indicators']['rsi'] == pytest.approx(warm['indicators']['rsi'], abs=0.01)
+    assert batch['indicators']['sma_20'] == pytest.approx(warm['indicators']['sma_20'], abs=0.01)
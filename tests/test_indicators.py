@@ -0,0 +1,80 @@
+"""
+ProTrading Engine - Testes dos Indicadores Vetorizados
+Comparação com as fórmulas de referência do pandas sobre matrizes
+ativos x tempo
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import indicators
+
+
+@pytest.fixture
+def close():
+    rng = np.random.default_rng(11)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (3, 120)), axis=1))
+
+
+def _frame(x):
+    return pd.DataFrame(x.T)
+
+
+def _assert_matches(actual, expected):
+    np.testing.assert_allclose(actual, expected.to_numpy().T, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+
+def test_sma_and_std_match_pandas(close):
+    _assert_matches(indicators.sma(close, 20), _frame(close).rolling(20).mean())
+    _assert_matches(indicators.rolling_std(close, 20), _frame(close).rolling(20).std(ddof=0))
+
+
+def test_ema_seeded_by_sma(close):
+    period = 10
+    series = close[0]
+    expected = np.full(series.shape, np.nan)
+    expected[period - 1] = series[:period].mean()
+    alpha = 2.0 / (period + 1)
+    for t in range(period, len(series)):
+        expected[t] = alpha * series[t] + (1 - alpha) * expected[t - 1]
+    np.testing.assert_allclose(indicators.ema(series, period), expected, equal_nan=True)
+
+
+def test_rsi_bounds_and_warmup(close):
+    values = indicators.rsi(close, 14)
+    assert np.isnan(values[:, :14]).all()
+    assert ((values[:, 14:] >= 0) & (values[:, 14:] <= 100)).all()
+    assert indicators.rsi(np.arange(1.0, 40.0), 14)[-1] == 100.0
+
+
+def test_rolling_extremes_match_pandas(close):
+    for period in (1, 7, 20):
+        _assert_matches(indicators.rolling_max(close, period), _frame(close).rolling(period).max())
+        _assert_matches(indicators.rolling_min(close, period), _frame(close).rolling(period).min())
+
+
+def test_left_padding_does_not_leak(close):
+    """NaN à esquerda só atrasa o início; o resto é o indicador da cauda"""
+    padded = close.copy()
+    padded[1, :40] = np.nan
+    tail = close[1, 40:]
+    checks = [
+        (indicators.sma, 20),
+        (indicators.ema, 12),
+        (indicators.wilder_smooth, 14),
+        (indicators.rsi, 14),
+        (indicators.rolling_max, 20),
+    ]
+    for fn, period in checks:
+        result = fn(padded, period)
+        np.testing.assert_allclose(result[1, 40:], fn(tail, period), equal_nan=True, err_msg=fn.__name__)
+        assert np.isnan(result[1, :40]).all()
+        np.testing.assert_array_equal(result[0], fn(close[0], period))
+
+
+def test_too_short_returns_nan():
+    assert np.isnan(indicators.sma(np.ones(3), 5)).all()
+    assert np.isnan(indicators.ema(np.ones(3), 5)).all()
+    assert indicators.last_valid(indicators.sma(np.ones(3), 5)) is None
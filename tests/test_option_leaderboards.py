@@ -0,0 +1,32 @@
+"""
+ProTrading Engine - Testes dos Rankings de Opções
+Ranking de variação de IV entre snapshots consecutivos
+Desenvolvido por: Deverson
+"""
+
+import pandas as pd
+
+from core.option_leaderboards import OptionLeaderboards
+
+
+def _chain(ivs):
+    return pd.DataFrame([
+        {'symbol': symbol, 'underlying': 'PETR4', 'option_type': 'CALL', 'strike': 30.0 + i,
+         'expiry_date': '2026-12-18', 'price': 1.0, 'volume': 100, 'open_interest': 1000,
+         'implied_volatility': iv}
+        for i, (symbol, iv) in enumerate(ivs.items())
+    ])
+
+
+def test_iv_change_ranks_only_contracts_that_moved():
+    boards = OptionLeaderboards(top_n=10)
+    boards.on_snapshot('PETR4', 1, _chain({'A': 0.30, 'B': 0.30, 'C': 0.30}))
+    assert boards.get_top('iv_change', 'PETR4').empty
+
+    boards.on_snapshot('PETR4', 2, _chain({'A': 0.30, 'B': 0.35, 'C': 0.28, 'D': 0.40}))
+    top = boards.get_top('iv_change', 'PETR4')
+
+    # A não mudou e D não tem IV anterior
+    assert list(top['symbol']) == ['B', 'C']
+    assert top['value'].round(4).tolist() == [0.05, -0.02]
+    assert list(boards.get_top('iv_change')['symbol']) == ['B', 'C']
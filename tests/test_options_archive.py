@@ -0,0 +1,100 @@
+"""
+ProTrading Engine - Testes do Arquivo de Snapshots de Opções
+Versionamento por mudança de cotação, cotações inalteradas como
+referência e reconstrução da chain em qualquer snapshot
+Desenvolvido por: Deverson
+"""
+
+import sqlite3
+
+import pytest
+
+from core.options_archive import OptionsSnapshotArchive
+
+
+def _option(symbol, strike, price, option_type='CALL'):
+    return {
+        'symbol': symbol, 'underlying': 'PETR4', 'option_type': option_type, 'strike': strike,
+        'expiry_date': '2026-12-18', 'price': price, 'bid': price - 0.01, 'ask': price + 0.01,
+        'volume': 100, 'open_interest': 1000, 'implied_volatility': 0.3, 'delta': 0.5, 'gamma': 0.05,
+        'theta': -0.01, 'vega': 0.1, 'rho': 0.02, 'intrinsic_value': 0.0, 'time_value': price,
+        'moneyness': 1.0, 'days_to_expiry': 40, 'bid_ask_spread': 0.02, 'mid_price': price,
+    }
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return OptionsSnapshotArchive(str(tmp_path / 'archive.db'))
+
+
+def _versions(archive):
+    conn = sqlite3.connect(archive.db_path)
+    count = conn.execute('SELECT COUNT(*) FROM option_quote_versions').fetchone()[0]
+    conn.close()
+    return count
+
+
+def _prices(chain):
+    return dict(zip(chain['symbol'], chain['price']))
+
+
+def test_unchanged_quotes_are_references(archive):
+    chain = [_option('PETRA30', 30.0, 2.0), _option('PETRA32', 32.0, 1.0)]
+    first = archive.record_snapshot('PETR4', chain, taken_at='2026-10-01T10:00:00')
+    second = archive.record_snapshot('PETR4', chain, taken_at='2026-10-01T10:05:00')
+
+    assert second > first
+    assert _versions(archive) == 2
+    snapshots = archive.get_snapshots('PETR4').set_index('snapshot_id')
+    assert snapshots.loc[second, 'changed_quotes'] == 0
+    assert snapshots.loc[second, 'total_quotes'] == 2
+
+    latest = archive.get_latest_chain('PETR4')
+    assert set(latest['valid_from']) == {first}
+    assert set(latest['snapshot_id']) == {second}
+
+
+def test_changed_quote_opens_new_version(archive):
+    archive.record_snapshot('PETR4', [_option('PETRA30', 30.0, 2.0), _option('PETRA32', 32.0, 1.0)],
+                            taken_at='2026-10-01T10:00:00')
+    changed = archive.record_snapshot('PETR4', [_option('PETRA30', 30.0, 2.1), _option('PETRA32', 32.0, 1.0)],
+                                      taken_at='2026-10-01T10:05:00')
+
+    assert _versions(archive) == 3
+    latest = archive.get_latest_chain('PETR4').set_index('symbol')
+    assert latest.loc['PETRA30', 'price'] == 2.1
+    assert latest.loc['PETRA30', 'valid_from'] == changed
+    assert latest.loc['PETRA32', 'valid_from'] < changed
+
+
+def test_chain_as_of_reconstructs_each_snapshot(archive):
+    history = [
+        ('2026-10-01T10:00:00', [_option('PETRA30', 30.0, 2.0), _option('PETRA32', 32.0, 1.0)]),
+        ('2026-10-01T11:00:00', [_option('PETRA30', 30.0, 2.2), _option('PETRA32', 32.0, 1.0)]),
+        # PETRA32 sai da chain e entra um put
+        ('2026-10-01T12:00:00', [_option('PETRA30', 30.0, 2.2), _option('PETRM30', 30.0, 0.8, 'PUT')]),
+    ]
+    ids = [archive.record_snapshot('PETR4', chain, taken_at=ts) for ts, chain in history]
+
+    assert _prices(archive.get_chain_as_of('PETR4', '2026-10-01T10:30:00')) == {'PETRA30': 2.0, 'PETRA32': 1.0}
+    assert _prices(archive.get_chain_as_of('PETR4', '2026-10-01T11:00:00')) == {'PETRA30': 2.2, 'PETRA32': 1.0}
+    assert _prices(archive.get_chain_as_of('PETR4', '2026-10-02')) == {'PETRA30': 2.2, 'PETRM30': 0.8}
+    assert archive.get_chain_as_of('PETR4', '2026-09-30').empty
+
+    for snapshot_id, (_, chain) in zip(ids, history):
+        rebuilt = archive.get_chain_at_snapshot('PETR4', snapshot_id)
+        assert _prices(rebuilt) == {option['symbol']: option['price'] for option in chain}
+        assert set(rebuilt['snapshot_id']) == {snapshot_id}
+
+    assert _prices(archive.get_latest_chain('PETR4')) == {'PETRA30': 2.2, 'PETRM30': 0.8}
+    assert archive.get_latest_snapshot_id('PETR4') == ids[-1]
+    assert archive.get_underlyings() == ['PETR4']
+
+
+def test_listeners_receive_full_chain(archive):
+    received = []
+    archive.add_listener(lambda underlying, snapshot_id, chain: received.append((underlying, snapshot_id, len(chain))))
+    chain = [_option('PETRA30', 30.0, 2.0)]
+    first = archive.record_snapshot('PETR4', chain)
+    second = archive.record_snapshot('PETR4', chain)
+    assert received == [('PETR4', first, 1), ('PETR4', second, 1)]
@@ -0,0 +1,119 @@
+"""
+ProTrading Engine - Testes do Registro de Modelos de Precificação
+Registro, convenção q = r do Black-76, Greeks por diferenças finitas e
+escolha do modelo por ativo na precificação da chain
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pytest
+
+from config.settings import config
+from core.pricing_math import bsm_greeks, bsm_price
+from core.pricing_models import GREEK_NAMES, PricingModel, available_models, get_model, price_chain
+
+S = 100.0
+K = np.array([80.0, 95.0, 100.0, 105.0, 120.0])
+T = np.array([0.1, 0.25, 0.5, 1.0, 2.0])
+R = 0.1065
+SIGMA = np.array([0.35, 0.3, 0.28, 0.3, 0.33])
+
+
+class _FiniteDifferenceBSM(PricingModel):
+    """BSM com os Greeks genéricos por diferenças finitas da interface"""
+
+    name = 'fd_bsm'
+
+    def price(self, underlying_price, K, T, r, sigma, option_type, q=0.0):
+        return bsm_price(underlying_price, K, T, r, sigma, option_type, q)
+
+
+@pytest.fixture(scope='module')
+def collector():
+    from core.options_collector import OptionsCollector
+    return OptionsCollector()
+
+
+def test_registry_contains_all_models():
+    assert {'bsm', 'black76', 'crr', 'leisen_reimer', 'baw'} <= set(available_models())
+    assert get_model('leisen_reimer').exercise == 'american'
+    assert get_model('black76').exercise == 'european'
+
+
+def test_unknown_model_raises():
+    with pytest.raises(ValueError):
+        get_model('heston')
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+def test_black76_is_bsm_with_carry_equal_to_rate(option_type):
+    black76 = get_model('black76')
+    expected = bsm_price(S, K, T, R, SIGMA, option_type, q=R)
+    np.testing.assert_allclose(black76.price(S, K, T, R, SIGMA, option_type), expected)
+    # q é ignorado: o carry do futuro é sempre a própria taxa
+    np.testing.assert_allclose(black76.price(S, K, T, R, SIGMA, option_type, q=0.12), expected)
+
+    greeks = black76.greeks(S, K, T, R, SIGMA, option_type, q=0.12)
+    np.testing.assert_allclose(greeks['delta'], bsm_greeks(S, K, T, R, SIGMA, option_type, q=R)['delta'])
+    np.testing.assert_allclose(greeks['rho'], -T * expected / 100.0)
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+def test_finite_difference_greeks_match_analytic(option_type):
+    numeric = _FiniteDifferenceBSM().greeks(S, K, T, R, SIGMA, option_type, q=0.04)
+    analytic = bsm_greeks(S, K, T, R, SIGMA, option_type, q=0.04)
+
+    assert set(numeric) == set(GREEK_NAMES)
+    for name in ('delta', 'vega', 'rho', 'vanna'):
+        np.testing.assert_allclose(numeric[name], analytic[name], rtol=0.02, atol=1e-4, err_msg=name)
+    np.testing.assert_allclose(numeric['gamma'], analytic['gamma'], rtol=0.01)
+    # Theta numérico é o decaimento de um pregão inteiro, não a derivada instantânea
+    np.testing.assert_allclose(numeric['theta'], analytic['theta'], rtol=0.05)
+
+
+def test_price_chain_returns_model_greeks():
+    result = price_chain('bsm', S, K, T, R, SIGMA, np.array(['CALL', 'PUT', 'CALL', 'PUT', 'CALL']),
+                         with_greeks=True)
+    calls = np.array([True, False, True, False, True])
+    expected = np.where(calls, bsm_price(S, K, T, R, SIGMA, 'call'), bsm_price(S, K, T, R, SIGMA, 'put'))
+    np.testing.assert_allclose(result['price'], expected)
+    assert set(result) == {'price', *GREEK_NAMES}
+
+
+@pytest.mark.parametrize('underlying, model', [
+    ('PETR4', 'leisen_reimer'),
+    ('IBOV', 'black76'),
+    ('ITUB4', 'bsm'),
+])
+def test_collector_prices_chain_with_underlying_model(collector, underlying, model):
+    assert collector.get_pricing_model(underlying) == model
+
+    expiry = ['2026-12-18', '2027-03-19']
+    chain = [
+        {'strike': strike, 'expiry_date': expiry_date, 'option_type': option_type, 'implied_volatility': 0.3}
+        for expiry_date in expiry for strike in (28.0, 32.0) for option_type in ('CALL', 'PUT')
+    ]
+    priced = collector.price_chain(underlying, chain, underlying_price=30.0)
+
+    expiry_dates = np.array([option['expiry_date'] for option in chain])
+    expected = get_model(model).price(
+        30.0,
+        np.array([option['strike'] for option in chain]),
+        collector.calculate_time_to_expiry_array(expiry_dates, underlying=underlying),
+        collector.get_risk_free_rates(expiry_dates, underlying),
+        0.3,
+        np.array([option['option_type'] == 'CALL' for option in chain]),
+        config.DIVIDEND_YIELDS.get(underlying, 0.0),
+    )
+    np.testing.assert_allclose(priced['price'], expected)
+
+
+def test_mock_chain_is_priced_by_the_underlying_model(collector):
+    options = collector.generate_mock_options_data('IBOV')
+    assert options
+
+    spot = collector.get_current_stock_price('IBOV')
+    priced = collector.price_chain('IBOV', options, underlying_price=spot, with_greeks=True)
+    np.testing.assert_allclose([option['price'] for option in options],
+                               np.maximum(priced['price'], 0.01), atol=0.005)
+    np.testing.assert_allclose([option['delta'] for option in options], priced['delta'], atol=5e-5)
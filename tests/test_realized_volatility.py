@@ -0,0 +1,121 @@
+"""
+ProTrading Engine - Testes da Volatilidade Realizada
+Estimadores contra as fórmulas de referência barra a barra, valores
+fechados em barras constantes e rastreador incremental
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.realized_volatility import (ESTIMATORS, RealizedVolTracker, VolatilityConeCache,
+                                      rolling_realized_volatility, volatility_cone)
+
+WINDOW = 21
+
+
+@pytest.fixture
+def bars():
+    """Barras OHLC sintéticas (3 ativos x 120 barras) com gaps de abertura"""
+    rng = np.random.default_rng(17)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.015, (3, 120)), axis=1))
+    prev = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    open_ = prev * np.exp(rng.normal(0, 0.005, close.shape))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.008, close.shape)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.008, close.shape)))
+    return open_, high, low, close
+
+
+def _reference(o, h, l, c, n=WINDOW, annualization=252):
+    """Fórmulas textuais da última janela de uma série (sem somas móveis)"""
+    o, h, l, c, prev = o[-n:], h[-n:], l[-n:], c[-n:], c[-n - 1:-1]
+    ret = np.log(c / prev)
+    overnight = np.log(o / prev)
+    intraday = np.log(c / o)
+    rs = np.mean(np.log(h / c) * np.log(h / o) + np.log(l / c) * np.log(l / o))
+    k = 0.34 / (1.34 + (n + 1) / (n - 1))
+    variances = {
+        'close_to_close': np.var(ret, ddof=1),
+        'parkinson': np.mean(np.log(h / l) ** 2) / (4 * np.log(2)),
+        'garman_klass': np.mean(0.5 * np.log(h / l) ** 2 - (2 * np.log(2) - 1) * intraday ** 2),
+        'rogers_satchell': rs,
+        'yang_zhang': np.var(overnight, ddof=1) + k * np.var(intraday, ddof=1) + (1 - k) * rs,
+    }
+    return {name: np.sqrt(v * annualization) for name, v in variances.items()}
+
+
+def test_estimators_match_reference(bars):
+    result = rolling_realized_volatility(*bars, window=WINDOW)
+    for row in range(3):
+        for end in (WINDOW + 1, 60, 120):
+            expected = _reference(*(b[row, :end] for b in bars))
+            for name in ESTIMATORS:
+                assert result[name][row, end - 1] == pytest.approx(expected[name], rel=1e-9), (name, end)
+
+
+def test_closed_form_values():
+    """Barras sem gap, amplitude fixa e retornos alternados ±r"""
+    r, spread, n_bars = 0.01, 0.02, 60
+    close = 100 * np.exp(np.cumsum(np.where(np.arange(n_bars) % 2, -r, r)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    high = np.maximum(open_, close) * np.exp(spread / 2)
+    low = np.minimum(open_, close) * np.exp(-spread / 2)
+
+    result = rolling_realized_volatility(open_, high, low, close, window=20)
+    hl = np.log(high[-1] / low[-1])
+    # 20 retornos alternados ±r: média zero e variância amostral r² * 20/19
+    assert result['close_to_close'][-1] == pytest.approx(r * np.sqrt(20 / 19 * 252))
+    assert result['parkinson'][-1] == pytest.approx(hl / np.sqrt(4 * np.log(2)) * np.sqrt(252))
+
+
+def test_warmup_and_missing_bars(bars):
+    open_, high, low, close = (b[0].copy() for b in bars)
+    result = rolling_realized_volatility(open_, high, low, close, window=WINDOW)
+    # O primeiro retorno precisa do fechamento anterior
+    assert np.isnan(result['close_to_close'][:WINDOW]).all()
+    assert np.isfinite(result['close_to_close'][WINDOW:]).all()
+
+    close[70] = np.nan
+    gapped = rolling_realized_volatility(open_, high, low, close, window=WINDOW)['yang_zhang']
+    assert np.isnan(gapped[70:70 + WINDOW + 1]).all()
+    assert np.isfinite(gapped[70 + WINDOW + 1:]).all()
+
+
+def test_tracker_matches_rolling(bars):
+    rolling = rolling_realized_volatility(*bars, window=WINDOW)
+    tracker = RealizedVolTracker(['A', 'B', 'C'], window=WINDOW)
+    tracker.seed(*(b[:, :80] for b in bars))
+    for t in range(80, 120):
+        current = tracker.update(*(b[:, t] for b in bars))
+    for name in ESTIMATORS:
+        np.testing.assert_allclose(current[name], rolling[name][:, -1], rtol=1e-9)
+
+
+def test_volatility_cone_percentiles(bars):
+    open_, high, low, close = (b[0] for b in bars)
+    cone = volatility_cone(open_, high, low, close, horizons=(10, 21), percentiles=(0, 50, 100))
+    rv = rolling_realized_volatility(open_, high, low, close, window=21, estimators=('close_to_close',))
+    row = cone.set_index('horizon').loc[21]
+    finite = rv['close_to_close'][np.isfinite(rv['close_to_close'])]
+    assert row['observations'] == finite.size == 120 - 21
+    assert row['p0'] == pytest.approx(finite.min())
+    assert row['p100'] == pytest.approx(finite.max())
+    assert row['current'] == pytest.approx(finite[-1])
+
+
+def test_cone_cache_refreshes_on_intraday_update(bars):
+    open_, high, low, close = (b[0] for b in bars)
+    frame = pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close},
+                         index=pd.bdate_range('2026-01-02', periods=len(close)))
+    cache = VolatilityConeCache(horizons=(10,), percentiles=(50,))
+    first = cache.get('PETR4', frame)
+    assert cache.get('PETR4', frame.copy()) is first
+
+    # Barra do dia atualizada no intraday: mesmo índice e mesmo tamanho
+    updated = frame.copy()
+    updated.iloc[-1, updated.columns.get_loc('close')] *= 1.05
+    updated.iloc[-1, updated.columns.get_loc('high')] = max(updated['high'].iloc[-1], updated['close'].iloc[-1])
+    cone = cache.get('PETR4', updated)
+    assert cone is not first
+    assert cone['current'].iloc[0] != pytest.approx(first['current'].iloc[0])
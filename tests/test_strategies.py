@@ -0,0 +1,63 @@
+"""
+ProTrading Engine - Testes das Estratégias
+Matriz de preços com históricos de tamanhos diferentes e histórico
+mínimo do momentum
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import bars_from_frame, bars_from_histories, get_strategy
+
+
+def _histories(lengths, seed=7):
+    rng = np.random.default_rng(seed)
+    return {symbol: pd.DataFrame({'price': 100 + np.cumsum(rng.normal(0, 1, n))})
+            for symbol, n in lengths.items()}
+
+
+def test_short_history_matches_its_own_tail():
+    """Ativo com menos preços que o lookback é avaliado só nos seus dados"""
+    histories = _histories({'CURTO': 30, 'LONGO': 50})
+    strategy = get_strategy('sma_rsi')
+
+    padded = strategy.evaluate(bars_from_histories(histories, ['CURTO', 'LONGO'], 50))
+    alone = strategy.evaluate(bars_from_histories(histories, ['CURTO'], 30))
+
+    for name, values in padded['indicators'].items():
+        assert np.isfinite(values[0, -1]), name
+        np.testing.assert_allclose(values[0, 20:], alone['indicators'][name][0], equal_nan=True)
+    np.testing.assert_array_equal(padded['signal'][0, 20:], alone['signal'][0])
+    np.testing.assert_array_equal(padded['strength'][0, 20:], alone['strength'][0])
+
+
+def test_bars_from_frame_matches_histories():
+    histories = _histories({'A': 12, 'B': 50, 'C': 60})
+    frame = pd.concat([h.assign(symbol=s) for s, h in histories.items()], ignore_index=True)
+    symbols = ['C', 'A', 'B', 'D']
+
+    from_frame = bars_from_frame(frame, symbols, 50)
+    from_histories = bars_from_histories(histories, symbols, 50)
+
+    np.testing.assert_array_equal(from_frame['close'], from_histories['close'])
+    np.testing.assert_array_equal(from_frame['observations'], [50, 12, 50, 0])
+
+
+def test_momentum_rejects_short_history():
+    """Momentum não roda sobre a janela de ticks de analyze_all_symbols"""
+    strategy = get_strategy('momentum')
+    bars = bars_from_histories(_histories({'A': 50, 'B': 50}), ['A', 'B'], 50)
+    with pytest.raises(ValueError):
+        strategy.evaluate(bars)
+
+
+def test_momentum_on_daily_history():
+    strategy = get_strategy('momentum')
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (5, 300)), axis=1))
+    output = strategy.evaluate({'close': close, 'symbols': ['PETR4', 'VALE3', 'ITUB4', 'BBDC4', 'ABEV3']})
+
+    assert output['signal'].shape == close.shape
+    assert np.isfinite(output['indicators']['momentum_rank'][:, -1]).all()
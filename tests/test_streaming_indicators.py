@@ -0,0 +1,64 @@
+"""
+ProTrading Engine - Testes dos Indicadores Incrementais
+Equivalência tick a tick com core.indicators e persistência do estado
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pytest
+
+from core import indicators
+from core.streaming_indicators import (IndicatorSet, IndicatorStateStore, RollingExtreme, RollingVariance,
+                                       RunningSMA, StreamingEMA, StreamingIndicator, StreamingRSI)
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(5)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.015, 300)))
+
+
+def _stream(indicator, prices):
+    values = [indicator.update(price) for price in prices]
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+@pytest.mark.parametrize('make, reference', [
+    (lambda: RunningSMA(20), lambda x: indicators.sma(x, 20)),
+    (lambda: StreamingEMA(12), lambda x: indicators.ema(x, 12)),
+    (lambda: StreamingRSI(14), lambda x: indicators.rsi(x, 14)),
+    (lambda: RollingVariance(20, ddof=0), lambda x: indicators.rolling_std(x, 20) ** 2),
+    (lambda: RollingExtreme(15, 'max'), lambda x: indicators.rolling_max(x, 15)),
+    (lambda: RollingExtreme(15, 'min'), lambda x: indicators.rolling_min(x, 15)),
+], ids=['sma', 'ema', 'rsi', 'variance', 'max', 'min'])
+def test_streaming_matches_vectorized(make, reference, prices):
+    np.testing.assert_allclose(_stream(make(), prices), reference(prices), rtol=1e-9, equal_nan=True)
+
+
+def test_round_trip_resumes_exactly(prices):
+    """Estado serializado no meio da série continua igual ao não interrompido"""
+    live = IndicatorSet.default()
+    for price in prices[:150]:
+        live.update(price)
+    restored = IndicatorSet.from_json(live.to_json())
+    for price in prices[150:]:
+        expected = live.update(price)
+        assert restored.update(price) == pytest.approx(expected)
+
+
+def test_state_store_round_trip(tmp_path, prices):
+    store = IndicatorStateStore(str(tmp_path / 'state.db'))
+    state = IndicatorSet.default()
+    for price in prices[:40]:
+        state.update(price, timestamp='2026-01-02T10:00:00')
+    store.save('PETR4.SA', state)
+
+    loaded = store.load('PETR4.SA')
+    assert loaded.last_timestamp == '2026-01-02T10:00:00'
+    assert loaded.values() == state.values()
+    assert store.load('VALE3.SA') is None
+
+
+def test_base_is_abstract():
+    with pytest.raises(TypeError):
+        StreamingIndicator()
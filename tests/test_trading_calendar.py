@@ -0,0 +1,43 @@
+"""
+ProTrading Engine - Testes do Calendário de Pregões
+Mercado por símbolo, feriados da B3 e tempo útil até o vencimento
+Desenvolvido por: Deverson
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR, calendar_for_symbol, get_calendar, market_for_symbol
+
+
+@pytest.mark.parametrize('symbol, market', [
+    ('PETR4', 'B3'), ('PETR4.SA', 'B3'), ('IBOV', 'B3'), ('DI1', 'B3'), ('PETRA30', 'B3'),
+    ('PBR', 'NYSE'), ('vale', 'NYSE'), ('ITUB', 'NYSE'),
+])
+def test_market_for_symbol(symbol, market):
+    assert market_for_symbol(symbol) == market
+    assert calendar_for_symbol(symbol) is get_calendar(market)
+
+
+def test_b3_holidays():
+    calendar = get_calendar('B3')
+    assert not calendar.is_business_day('2026-04-21')   # Tiradentes
+    assert not calendar.is_business_day('2026-02-16')   # Carnaval
+    assert not calendar.is_business_day('2026-09-07')   # Independência
+    assert get_calendar('NYSE').is_business_day('2026-09-08')
+    # 4 de julho cai no sábado: NYSE fecha na sexta, B3 abre
+    assert calendar.is_business_day('2026-07-03')
+    assert not get_calendar('NYSE').is_business_day('2026-07-03')
+
+
+def test_time_to_expiry_in_business_years():
+    calendar = get_calendar('B3')
+    ids = calendar.expiry_ids(['2026-10-23', '2026-10-16', '2026-10-19'])
+    now = datetime(2026, 10, 19, 9, 0)  # antes da abertura
+    days = calendar.business_days_to_expiry(ids, now)
+    T = calendar.time_to_expiry(ids, now)
+
+    np.testing.assert_allclose(days, [5.0, 0.0, 1.0])
+    np.testing.assert_allclose(T, [5 / BUSINESS_DAYS_PER_YEAR, 0.0, 1 / BUSINESS_DAYS_PER_YEAR])
@@ -0,0 +1,76 @@
+"""
+ProTrading Engine - Testes do Walk-Forward
+Limites das janelas móveis, ancoradas e do k-fold purgado, e uma análise
+completa em série sintética
+Desenvolvido por: Deverson
+"""
+
+import numpy as np
+import pytest
+
+from core.strategy_optimizer import parameter_grid
+from core.walk_forward import WalkForwardAnalyzer, purged_kfold_windows, walk_forward_windows
+
+
+def _bars(segments):
+    return {bar for start, end in segments for bar in range(start, end)}
+
+
+def test_rolling_windows():
+    windows = walk_forward_windows(100, train_size=40, test_size=20)
+    assert [w['train'] for w in windows] == [[(0, 40)], [(20, 60)], [(40, 80)]]
+    assert [w['test'] for w in windows] == [[(40, 60)], [(60, 80)], [(80, 100)]]
+    assert [w['fold'] for w in windows] == [0, 1, 2]
+
+
+def test_anchored_windows_with_purge_and_step():
+    windows = walk_forward_windows(100, train_size=40, test_size=20, step=10, anchored=True, purge=5)
+    for window in windows:
+        (train_start, train_end), = window['train']
+        (test_start, test_end), = window['test']
+        assert train_start == 0
+        assert train_end == test_start - 5
+        assert test_end - test_start == 20
+        assert test_end <= 100
+    assert [w['test'][0][0] for w in windows] == [40, 50, 60, 70, 80]
+
+
+def test_windows_never_exceed_series():
+    assert walk_forward_windows(59, train_size=40, test_size=20) == []
+    assert walk_forward_windows(60, train_size=40, test_size=20)[-1]['test'] == [(40, 60)]
+    # Purga que consome todo o in-sample descarta a janela
+    assert walk_forward_windows(100, train_size=10, test_size=20, purge=10) == []
+
+
+@pytest.mark.parametrize('purge, embargo', [(0, 0), (3, 0), (3, 7)])
+def test_purged_kfold_bounds(purge, embargo):
+    n_bars = 103
+    windows = purged_kfold_windows(n_bars, n_splits=5, purge=purge, embargo=embargo)
+    tests = [_bars(w['test']) for w in windows]
+
+    # Blocos de teste cobrem a série uma vez, em ordem
+    assert set().union(*tests) == set(range(n_bars))
+    assert sum(len(t) for t in tests) == n_bars
+    for window, test in zip(windows, tests):
+        train = _bars(window['train'])
+        start, end = min(test), max(test) + 1
+        assert not train & test
+        assert not train & set(range(max(0, start - purge), min(n_bars, end + embargo)))
+        assert train | set(range(max(0, start - purge), min(n_bars, end + embargo))) == set(range(n_bars))
+
+
+def test_analysis_uses_only_test_bars_out_of_sample():
+    rng = np.random.default_rng(21)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (4, 260)), axis=1))
+    windows = walk_forward_windows(close.shape[1], train_size=100, test_size=40)
+    combinations = parameter_grid({'fast_period': [3, 5], 'slow_period': [10, 20], 'rsi_period': [14]})
+
+    result = WalkForwardAnalyzer(min_trades=0).run({'close': close}, combinations, windows)
+
+    assert len(result.folds) == len(windows)
+    assert len(result.oos_returns) == sum(e - s for w in windows for s, e in w['test'])
+    assert (result.folds['test_start'] >= result.folds['train_bars']).all()
+    assert set(result.scores['combination']) == set(range(len(combinations)))
+    # oos_return_pct vem arredondado a 2 casas
+    assert result.oos_equity()[-1] == pytest.approx(
+        100000.0 * np.prod(1 + result.folds['oos_return_pct'] / 100), rel=1e-3)
@@ -0,0 +1,45 @@
+"""
+ProTrading Engine - Testes da Curva DI
+Fatores de desconto nos vértices e taxas por vencimento em cada calendário
+Desenvolvido por: Deverson
+"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from core.trading_calendar import BUSINESS_DAYS_PER_YEAR, get_calendar
+from core.yield_curve import YieldCurve
+
+REFERENCE = date(2026, 10, 19)
+
+
+@pytest.fixture
+def curve():
+    return YieldCurve([21, 252, 504], [0.10, 0.11, 0.12], reference_date=REFERENCE)
+
+
+def test_vertices_reprice(curve):
+    T = np.array([21, 252, 504]) / BUSINESS_DAYS_PER_YEAR
+    np.testing.assert_allclose(curve.discount_factor(T), (1 + np.array([0.10, 0.11, 0.12])) ** -T)
+    np.testing.assert_allclose(curve.di_rate(T), [0.10, 0.11, 0.12])
+
+
+@pytest.mark.parametrize('market', ['B3', 'NYSE'])
+def test_expiry_rates_use_the_calendar_day_count(curve, market):
+    """Taxa e T de uma opção contam os mesmos dias úteis"""
+    calendar = get_calendar(market)
+    expiries = ['2026-11-20', '2026-12-18', '2027-01-15']
+    ids = calendar.expiry_ids(expiries)
+    T = calendar.time_to_expiry(ids, datetime(2026, 10, 19, 8, 0))
+    np.testing.assert_allclose(curve.expiry_rates(ids, calendar), curve.zero_rate(T))
+
+
+def test_calendar_tables_are_separate(curve):
+    b3, nyse = get_calendar('B3'), get_calendar('NYSE')
+    # 20/11 (Consciência Negra) é feriado só na B3
+    b3_rate = curve.expiry_rates(b3.expiry_ids(['2026-11-23']), b3)
+    nyse_rate = curve.expiry_rates(nyse.expiry_ids(['2026-11-23']), nyse)
+    assert b3_rate[0] != nyse_rate[0]
+    np.testing.assert_allclose(curve.expiry_rates(b3.expiry_ids(['2026-11-23'])), b3_rate)